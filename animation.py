@@ -0,0 +1,48 @@
+import time
+from typing import Iterator, Tuple
+
+# Default length of a card slide, in seconds
+SLIDE_DURATION = 0.15
+
+class FrameScheduler:
+    """Paces animation frames against a fixed per-frame time budget.
+
+    Progress is derived from the clock rather than from a frame counter, so
+    when the terminal is slow and a frame overruns its budget the missed
+    frames are dropped instead of the animation lagging behind.
+    """
+    def __init__(self, fps: int = 60, clock=time.monotonic, sleep=time.sleep):
+        self.frame_budget = 1.0 / fps
+        self.clock = clock
+        self.sleep = sleep
+        self.dropped = 0
+
+    def frames(self, duration: float) -> Iterator[float]:
+        """Yields animation progress in [0, 1], always finishing on 1.0."""
+        start = self.clock()
+        frame = 0
+        while True:
+            elapsed = self.clock() - start
+            progress = min(1.0, elapsed / duration) if duration > 0 else 1.0
+            yield progress
+            if progress >= 1.0:
+                return
+
+            frame += 1
+            behind = int((self.clock() - start) / self.frame_budget)
+            if behind >= frame:
+                # Drawing overran the budget: skip the frames we missed
+                self.dropped += behind - frame + 1
+                frame = behind + 1
+            delay = start + frame * self.frame_budget - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+def ease_out(progress: float) -> float:
+    return 1 - (1 - progress) ** 2
+
+def slide_position(start: Tuple[int, int], end: Tuple[int, int], progress: float) -> Tuple[int, int]:
+    """Screen cell (y, x) of a sliding card at the given progress."""
+    t = ease_out(progress)
+    return (round(start[0] + (end[0] - start[0]) * t),
+            round(start[1] + (end[1] - start[1]) * t))
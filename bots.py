@@ -0,0 +1,210 @@
+import random
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+from game_logic import SolitaireGame
+from solver import is_useful
+
+Move = Tuple[str, int, str, int, int]
+
+# A bot that hasn't won after this many decisions gives up
+MAX_DECISIONS = 1000
+
+class Player:
+    """Strategy interface: picks the next move for a SolitaireGame.
+
+    choose_move returns one of game.legal_moves(), or None to resign.
+    new_game is called before each deal so players can reset any state.
+    """
+    name = 'player'
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def new_game(self, game: SolitaireGame):
+        pass
+
+    def choose_move(self, game: SolitaireGame) -> Optional[Move]:
+        raise NotImplementedError
+
+class RandomPlayer(Player):
+    """Plays a random useful move, drawing only when nothing else is possible."""
+    name = 'random'
+
+    def choose_move(self, game):
+        moves = game.legal_moves()
+        useful = [m for m in moves if m[0] != 'stock' and m[2] != 'stock' and is_useful(game, m)]
+        if useful:
+            return self.rng.choice(useful)
+        return moves[0] if moves and moves[0][2] in ('waste', 'stock') else None
+
+class GreedyPlayer(Player):
+    """Foundation moves first, then reveals, then waste plays, then the stock."""
+    name = 'greedy'
+
+    def choose_move(self, game):
+        best, best_rank = None, None
+        for move in game.legal_moves():
+            src_pile, _, dst_pile, _, _ = move
+            if dst_pile == 'foundation':
+                rank = 0
+            elif src_pile == 'tableau':
+                rank = 1
+            elif src_pile == 'waste':
+                rank = 2
+            else:
+                rank = 3 # Draw or recycle
+            if (best_rank is None or rank < best_rank) and is_useful(game, move):
+                best, best_rank = move, rank
+        return best
+
+def evaluate(game: SolitaireGame) -> float:
+    """Heuristic position value: foundations and revealed cards count most."""
+    value = 0.0
+    for foundation in game.foundations:
+        value += 10 * len(foundation)
+    for i, column in enumerate(game.tableau):
+        value -= 6 * game.face_down[i]
+        if not column:
+            value += 3
+    return value
+
+class LookaheadPlayer(Player):
+    """Searches two plies of useful moves and plays the best-scoring line.
+
+    Positions already reached in this game are skipped so the bot cannot
+    oscillate between two equivalent layouts.
+    """
+    name = 'lookahead'
+
+    def __init__(self, seed: Optional[int] = None, depth: int = 2):
+        super().__init__(seed)
+        self.depth = depth
+        self.visited = set()
+
+    def new_game(self, game):
+        self.visited = {game.state_key()}
+
+    def candidates(self, game):
+        moves = [m for m in game.legal_moves() if is_useful(game, m)]
+        # Drawing is always a fallback, never a lookahead branch
+        return [m for m in moves if m[0] != 'stock' and m[2] != 'stock'], moves
+
+    def search(self, game, depth):
+        best = evaluate(game)
+        if depth == 0:
+            return best
+        moves, _ = self.candidates(game)
+        for move in moves:
+            child = game.clone()
+            child.apply_move(move, record_undo=False)
+            best = max(best, self.search(child, depth - 1))
+        return best
+
+    def choose_move(self, game):
+        moves, all_moves = self.candidates(game)
+        best, best_value = None, None
+        for move in moves:
+            child = game.clone()
+            child.apply_move(move, record_undo=False)
+            key = child.state_key()
+            if key in self.visited:
+                continue
+            value = self.search(child, self.depth - 1)
+            if best_value is None or value > best_value:
+                best, best_value, best_key = move, value, key
+
+        if best is None:
+            # Nothing new on the board: turn over the stock
+            draws = [m for m in all_moves if m[0] == 'stock' or m[2] == 'stock']
+            if not draws:
+                return None
+            best = draws[0]
+            child = game.clone()
+            child.apply_move(best, record_undo=False)
+            best_key = child.state_key()
+        self.visited.add(best_key)
+        return best
+
+BOTS = {
+    'random': RandomPlayer,
+    'greedy': GreedyPlayer,
+    'lookahead': LookaheadPlayer,
+}
+
+def play_game(player: Player, seed: int, max_decisions: int = MAX_DECISIONS) -> Dict:
+    """Plays one seeded deal to the end and returns its result.
+
+    The game ends on a win, when the player resigns, after max_decisions,
+    or when the waste is recycled into a position already seen at an
+    earlier recycle (a full stock cycle made no progress).
+    """
+    game = SolitaireGame(seed)
+    player.new_game(game)
+    decisions = 0
+    think_time = 0.0
+    cycles = set()
+
+    while not game.check_win() and decisions < max_decisions:
+        start = time.perf_counter()
+        move = player.choose_move(game)
+        think_time += time.perf_counter() - start
+        if move is None:
+            break
+        decisions += 1
+        game.apply_move(move, record_undo=False)
+
+        if move[2] == 'stock':
+            fingerprint = hash(game.state_key())
+            if fingerprint in cycles:
+                break
+            cycles.add(fingerprint)
+
+    return {
+        'seed': seed,
+        'won': game.check_win(),
+        'score': game.score,
+        'moves': game.moves,
+        'decisions': decisions,
+        'think_time': think_time,
+    }
+
+def _play_task(task):
+    bot_name, seed = task
+    result = play_game(BOTS[bot_name](seed), seed)
+    result['bot'] = bot_name
+    return result
+
+def run_tournament(bot_names: List[str], seeds: List[int], workers: Optional[int] = None) -> Dict[str, Dict]:
+    """Plays every bot on the same deals across worker processes.
+
+    Returns per-bot stats: games, win_rate, mean_score, mean_moves and
+    decisions_per_sec (decisions over time spent inside choose_move).
+    """
+    tasks = [(name, seed) for name in bot_names for seed in seeds]
+    if workers == 1:
+        results = list(map(_play_task, tasks))
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(_play_task, tasks, chunksize=max(1, len(tasks) // 64))
+
+    stats = {}
+    for name in bot_names:
+        rows = [r for r in results if r['bot'] == name]
+        games = len(rows)
+        think_time = sum(r['think_time'] for r in rows)
+        stats[name] = {
+            'games': games,
+            'win_rate': sum(r['won'] for r in rows) / games if games else 0.0,
+            'mean_score': sum(r['score'] for r in rows) / games if games else 0.0,
+            'mean_moves': sum(r['moves'] for r in rows) / games if games else 0.0,
+            'decisions_per_sec': sum(r['decisions'] for r in rows) / think_time if think_time else 0.0,
+        }
+    return stats
+
+def format_report(stats: Dict[str, Dict]) -> str:
+    lines = [f"{'Bot':<10} {'Games':>6} {'Win %':>7} {'Score':>8} {'Moves':>8} {'Decisions/s':>12}"]
+    for name, row in stats.items():
+        lines.append(f"{name:<10} {row['games']:>6} {row['win_rate'] * 100:>6.1f}% "
+                     f"{row['mean_score']:>8.1f} {row['mean_moves']:>8.1f} {row['decisions_per_sec']:>12.0f}")
+    return "\n".join(lines)
@@ -0,0 +1,300 @@
+"""Cards, decks and what every game variant has in common."""
+import random
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+class Suit(Enum):
+    HEARTS = '♥'
+    DIAMONDS = '♦'
+    CLUBS = '♣'
+    SPADES = '♠'
+
+    @property
+    def color(self):
+        return 'RED' if self in (Suit.HEARTS, Suit.DIAMONDS) else 'BLACK'
+
+class Rank(Enum):
+    ACE = 1
+    TWO = 2
+    THREE = 3
+    FOUR = 4
+    FIVE = 5
+    SIX = 6
+    SEVEN = 7
+    EIGHT = 8
+    NINE = 9
+    TEN = 10
+    JACK = 11
+    QUEEN = 12
+    KING = 13
+
+    def __str__(self):
+        if self.value == 1: return 'A'
+        if self.value == 11: return 'J'
+        if self.value == 12: return 'Q'
+        if self.value == 13: return 'K'
+        return str(self.value)
+
+class Card:
+    """One of the 52 cards. Cards are immutable and interned: Card(suit, rank)
+    always returns the same object, so they can be shared freely between
+    games, snapshots and searches. Whether a card is face up depends on
+    where it lies, so that is tracked by the game.
+
+    value (the rank's number) and red are copied out of the enums, since
+    move generation reads them in its innermost loops.
+    """
+    __slots__ = ('suit', 'rank', 'index', 'value', 'red')
+    _interned: Dict[Tuple[Suit, Rank], 'Card'] = {}
+
+    def __new__(cls, suit: Suit, rank: Rank):
+        card = cls._interned.get((suit, rank))
+        if card is None:
+            card = object.__new__(cls)
+            object.__setattr__(card, 'suit', suit)
+            object.__setattr__(card, 'rank', rank)
+            object.__setattr__(card, 'index', len(cls._interned))
+            object.__setattr__(card, 'value', rank.value)
+            object.__setattr__(card, 'red', suit.color == 'RED')
+            cls._interned[suit, rank] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __hash__(self):
+        return self.index
+
+    def __reduce__(self):
+        return Card, (self.suit, self.rank)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"{self.rank}{self.suit.value}"
+
+# All 52 cards in a fixed order; CARDS[card.index] is card
+CARDS = tuple(Card(s, r) for s in Suit for r in Rank)
+
+class Deck:
+    def __init__(self, seed: Optional[int] = None, cards: Tuple[Card, ...] = CARDS):
+        # A seed gives a reproducible deal; None shuffles randomly
+        self.rng = random.Random(seed)
+        self.base = cards
+        self.cards = list(cards)
+        self.shuffle()
+
+    def reset(self, seed: Optional[int] = None):
+        """Reshuffles the same list in place, as a fresh Deck(seed) would."""
+        self.rng.seed(seed)
+        self.cards[:] = self.base
+        self.shuffle()
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+
+    def draw(self) -> Optional[Card]:
+        return self.cards.pop() if self.cards else None
+
+def alternates(card: Card, below: Card) -> bool:
+    """card can sit on below in a Klondike/FreeCell run: one rank lower, other color."""
+    return below.value == card.value + 1 and below.red != card.red
+
+def follows_suit(card: Card, below: Card) -> bool:
+    """card continues a Spider run on below: one rank lower, same suit."""
+    return below.value == card.value + 1 and below.suit is card.suit
+
+class GameState(dict):
+    """A snapshot of a position, and a node of the undo tree.
+
+    Piles are stored as tuples, and never changed. Every pile a snapshot
+    shares with the snapshot it was taken next to is that snapshot's own
+    tuple, so a node costs about as much as the piles its action changed,
+    not a copy of every card. children are the positions played or undone
+    to from here, and active is the one redo goes back to.
+    """
+    __slots__ = ('children', 'active')
+
+    def __init__(self, fields=()):
+        super().__init__(fields)
+        self.children: Optional[List['GameState']] = None
+        self.active: Optional['GameState'] = None
+
+def _share(pile, previous):
+    """previous if it holds the same items as pile, otherwise pile as a tuple."""
+    pile = tuple(pile)
+    return previous if pile == previous else pile
+
+def _share_piles(piles, previous):
+    piles = tuple(map(tuple, piles))
+    if previous is None or len(previous) != len(piles):
+        return piles
+    if piles == previous:
+        return previous
+    return tuple(old if pile == old else pile for pile, old in zip(piles, previous))
+
+class CardGame:
+    """Pile addressing shared by the variants.
+
+    Piles are named ('stock', 'waste', 'cell', 'foundation', 'tableau') and
+    indexed. On screen, row 0 holds the piles listed in TOP_ROW (None
+    leaves a gap) and row 1 the NUM_COLUMNS tableau columns, which is also
+    how the cursor addresses them.
+    """
+    VARIANT = ''
+    NUM_COLUMNS = 7
+    TOP_ROW: Tuple[Optional[Tuple[str, int]], ...] = ()
+    # Cards the last move cleared off the board as a side effect (Spider's completed suits)
+    last_removed = 0
+
+    # What a snapshot holds: lists of piles, single piles, and plain values
+    NESTED_PILES: Tuple[str, ...] = ('tableau', 'foundations')
+    PILES: Tuple[str, ...] = ()
+    VALUES: Tuple[str, ...] = ('score', 'moves')
+    # Snapshot of the current position, if it has one (after undo or redo)
+    here: Optional[GameState] = None
+
+    def pile(self, name: str, idx: int) -> List[Card]:
+        if name == 'tableau':
+            return self.tableau[idx]
+        if name == 'foundation':
+            return self.foundations[idx]
+        if name == 'cell':
+            return self.cells[idx]
+        return getattr(self, name) # stock or waste
+
+    def pile_at(self, row: int, col: int) -> Optional[Tuple[str, int]]:
+        if row == 1:
+            return ('tableau', col) if 0 <= col < self.NUM_COLUMNS else None
+        return self.TOP_ROW[col] if 0 <= col < len(self.TOP_ROW) else None
+
+    def cursor_of(self, name: str, idx: int) -> Tuple[int, int]:
+        if name == 'tableau':
+            return 1, idx
+        return 0, self.TOP_ROW.index((name, idx))
+
+    def is_face_up(self, col_idx: int, card_idx: int) -> bool:
+        return card_idx >= self.face_down[col_idx]
+
+    # --- Undo tree ---
+    # history holds the snapshots on the way from the deal to the current
+    # position, so undo pops it. Lines that were undone stay reachable as
+    # the children of the snapshot they left from.
+
+    def snapshot(self) -> GameState:
+        """The current position as a GameState, sharing unchanged piles with
+        the snapshot it is next to. Returns the current position's own
+        snapshot if nothing has changed since it was taken."""
+        near = self.here
+        if near is None and self.history and isinstance(self.history[-1], GameState):
+            near = self.history[-1]
+        fields = [(name, _share_piles(getattr(self, name), None if near is None else near[name]))
+                  for name in self.NESTED_PILES]
+        fields += [(name, _share(getattr(self, name), None if near is None else near[name]))
+                   for name in self.PILES]
+        fields += [(name, getattr(self, name)) for name in self.VALUES]
+        state = GameState(fields)
+        if near is not None and near is self.here and near == state:
+            return near
+        return state
+
+    def restore(self, state: GameState):
+        for name in self.NESTED_PILES:
+            setattr(self, name, [list(pile) for pile in state[name]])
+        for name in self.PILES:
+            setattr(self, name, list(state[name]))
+        for name in self.VALUES:
+            setattr(self, name, state[name])
+        self.here = state
+        self.last_move = None
+
+    def _adopt(self, state: GameState, parent: Optional[GameState]) -> GameState:
+        """Makes state the active child of parent, unless parent already has
+        a child with the same position, which is returned instead."""
+        if parent is None:
+            return state
+        if parent.children is None:
+            parent.children = []
+        for child in parent.children:
+            if child is state or child == state:
+                state = child
+                break
+        else:
+            parent.children.append(state)
+        parent.active = state
+        return state
+
+    def _parent(self) -> Optional[GameState]:
+        if self.history and isinstance(self.history[-1], GameState):
+            return self.history[-1]
+        return None
+
+    def save_state(self):
+        """Records the current position before an action changes it."""
+        state = self.snapshot()
+        if state is not self.here:
+            state = self._adopt(state, self._parent())
+        self.history.append(state)
+        self.here = None
+
+    def thaw(self, state) -> GameState:
+        """A snapshot from history as a GameState (variants that pack old
+        snapshots unpack them here)."""
+        return state
+
+    def undo(self) -> bool:
+        if not self.history:
+            return False
+        leaving = self.snapshot()
+        state = self.history.pop()
+        if not isinstance(state, GameState):
+            state = self.thaw(state)
+        self._adopt(leaving, state) # Kept for redo
+        self.restore(state)
+        return True
+
+    def redo(self) -> bool:
+        """Replays the line last undone from here."""
+        here = self.here
+        if here is None or here.active is None or self.snapshot() is not here:
+            return False
+        self.history.append(here)
+        self.restore(here.active)
+        return True
+
+    def switch_branch(self) -> Optional[Tuple[int, int]]:
+        """Switches to the next line at the nearest fork, here or further
+        back: the position where it ended is restored, with the moves that
+        led there as the history. Returns (line, lines) at the fork, or
+        None if there is no other line."""
+        here = self.snapshot()
+        if here is not self.here:
+            here = self._adopt(here, self._parent())
+        path = self.history + [here]
+        for depth in range(len(path) - 1, -1, -1):
+            fork = path[depth]
+            if not isinstance(fork, GameState) or fork.children is None or len(fork.children) < 2:
+                continue
+            on = path[depth + 1] if depth + 1 < len(path) else fork.active
+            lines = fork.children
+            index = next((i for i, child in enumerate(lines) if child is on), -1)
+            index = (index + 1) % len(lines)
+            line = fork.active = lines[index]
+            del self.history[depth + 1:]
+            if depth == len(path) - 1:
+                self.history.append(fork)
+            while line.active is not None:
+                self.history.append(line)
+                line = line.active
+            self.restore(line)
+            return index + 1, len(lines)
+        return None
+
+    def compact_history(self, keep_recent: int = 20) -> int:
+        """Packs all but the newest undo snapshots and returns how many were
+        packed. Variants without a packed format leave them as they are."""
+        return 0
@@ -0,0 +1,113 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+from multiprocessing import Process
+from typing import Dict, Optional
+from game_logic import SolitaireGame
+from solver import solve
+
+DAILY_FILE = "daily_seeds.json"
+
+# Candidate seeds tried per day before giving up
+MAX_CANDIDATES = 1000
+# Search budget per candidate; deals not solved within it are skipped
+NODE_LIMIT = 5000
+
+def candidate_seeds(day: datetime.date):
+    """Seeds tried for a day, in order. The first winnable one is the daily deal."""
+    base = day.toordinal() * MAX_CANDIDATES
+    return range(base, base + MAX_CANDIDATES)
+
+def find_winnable_seed(day: datetime.date, node_limit: int = NODE_LIMIT) -> int:
+    for seed in candidate_seeds(day):
+        if solve(SolitaireGame(seed), node_limit) is not None:
+            return seed
+    raise RuntimeError(f"No winnable deal found for {day.isoformat()}")
+
+class DailyDeals:
+    """Guaranteed-winnable deal of the day, backed by a small seed cache.
+
+    The cache maps ISO dates to seeds that the solver has proven winnable,
+    so normally starting a daily game is a dictionary lookup. precompute()
+    fills in the coming days; precompute_in_background() runs it in a
+    separate process, so the search never competes with the game for the
+    GIL.
+    """
+    def __init__(self):
+        # Check for Snap environment
+        snap_data = os.environ.get('SNAP_USER_DATA')
+        if snap_data:
+            self.filename = os.path.join(snap_data, DAILY_FILE)
+        else:
+            self.filename = DAILY_FILE
+        self.seeds: Dict[str, int] = self.load()
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, int]:
+        if not os.path.exists(self.filename):
+            return {}
+        try:
+            with open(self.filename, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Writes the cache, keeping days another process saved meanwhile
+        (a day's seed is the same whoever finds it)."""
+        with self._lock:
+            seeds = {**self.load(), **self.seeds}
+        # Write to a temp file of our own first, so a crash never leaves a
+        # corrupt cache and two writers never share one
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix=DAILY_FILE, suffix='.tmp',
+                                         delete=False) as f:
+            json.dump(seeds, f, indent=0, sort_keys=True)
+        try:
+            os.replace(f.name, self.filename)
+        except OSError:
+            os.unlink(f.name)
+            raise
+
+    def seed_for(self, day: Optional[datetime.date] = None) -> int:
+        """The daily seed, searching (and caching) it only on a cache miss."""
+        day = day or datetime.date.today()
+        key = day.isoformat()
+        seed = self.seeds.get(key)
+        if seed is None:
+            seed = find_winnable_seed(day)
+            with self._lock:
+                self.seeds[key] = seed
+            self.save()
+        return seed
+
+    def precompute(self, days: int = 365, start: Optional[datetime.date] = None, progress=None) -> int:
+        """Finds and caches seeds for the given number of days. Returns how many were new."""
+        start = start or datetime.date.today()
+        added = 0
+        for offset in range(days):
+            day = start + datetime.timedelta(days=offset)
+            if day.isoformat() in self.seeds:
+                continue
+            seed = find_winnable_seed(day)
+            with self._lock:
+                self.seeds[day.isoformat()] = seed
+            added += 1
+            if progress:
+                progress(day, seed)
+            # Save as we go so an interrupted precompute keeps its work
+            self.save()
+        return added
+
+    def precompute_in_background(self, days: int = 365, start: Optional[datetime.date] = None) -> Process:
+        """precompute() in a low-priority child process, which ends with the
+        game. Its seeds reach this process only through the cache file."""
+        process = Process(target=_precompute_quietly, args=(days, start), daemon=True)
+        process.start()
+        return process
+
+def _precompute_quietly(days: int, start: Optional[datetime.date]):
+    os.nice(10) # Leave the CPU to the game
+    DailyDeals().precompute(days, start)
@@ -0,0 +1,58 @@
+import threading
+from collections import deque
+from game_logic import SolitaireGame
+from solver import find_progress
+
+WARNING = "No productive moves left - R to re-deal"
+
+class DeadEndDetector:
+    """Watches a game for stock cycles that change nothing.
+
+    observe() is called after every action but only does work when the
+    waste has just been recycled: the position is fingerprinted and checked
+    against a rolling set of fingerprints from earlier cycles. A repeat
+    means a whole pass through the stock achieved nothing, and a bounded
+    search then runs on a background thread to see whether any progress is
+    still possible. The input loop never waits on it.
+    """
+    def __init__(self, cycles: int = 4, node_limit: int = 5000):
+        self.node_limit = node_limit
+        self.fingerprints = deque(maxlen=cycles)
+        self.warning = None
+        self._last_recycle = None
+        self._thread = None
+        self._generation = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def reset(self):
+        """Forget everything, e.g. after a re-deal or an undo."""
+        self.fingerprints.clear()
+        self.warning = None
+        self._last_recycle = None
+        self._generation += 1 # Results from running searches are now stale
+
+    def observe(self, game: SolitaireGame):
+        move = game.last_move
+        if move is None or move[2] != 'stock' or move is self._last_recycle:
+            return
+        self._last_recycle = move
+
+        fingerprint = hash(game.state_key())
+        if fingerprint not in self.fingerprints:
+            # Something changed since the earlier cycles
+            self.fingerprints.append(fingerprint)
+            self.warning = None
+            return
+
+        if not self.busy and self.warning is None:
+            self._thread = threading.Thread(target=self._search,
+                                            args=(game.clone(), self._generation), daemon=True)
+            self._thread.start()
+
+    def _search(self, position: SolitaireGame, generation: int):
+        result = find_progress(position, self.node_limit)
+        if result is False and generation == self._generation:
+            self.warning = WARNING
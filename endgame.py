@@ -0,0 +1,217 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+from game_logic import SolitaireGame
+from solver import solve
+
+Move = Tuple[str, int, str, int, int]
+
+ENDGAME_FILE = "endgame.db"
+
+# Magic, number of positions, most cards left outside the foundations
+HEADER = struct.Struct('<8sII')
+MAGIC = b'SOLEND01'
+# Stored distance for positions from which the game can't be won without
+# taking cards back off the foundations; such a takeback may still win
+LOST = 0xFFFF
+
+# Positions reachable from an endgame root are all enumerated; roots with
+# bigger graphs are skipped for a later, smaller position on the same line
+GRAPH_LIMIT = 50000
+
+def cards_left(game: SolitaireGame) -> int:
+    return 52 - sum(len(foundation) for foundation in game.foundations)
+
+def position_key(game: SolitaireGame) -> int:
+    """64-bit hash of the position, the same on every run and machine.
+
+    Columns are sorted first, since which column holds what never changes
+    how far a position is from a win; foundations are left out, as they
+    hold exactly the cards that are nowhere else. Score and moves are
+    ignored.
+    """
+    columns = sorted(bytes([down]) + bytes([card.index for card in column])
+                     for down, column in zip(game.face_down, game.tableau))
+    data = b'\xff'.join(columns) + b'\xfe' + bytes([card.index for card in game.stock]) + \
+        b'\xfe' + bytes([card.index for card in game.waste])
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'little')
+
+def endgame_moves(game: SolitaireGame) -> List[Move]:
+    """Legal moves except taking cards back off the foundations, which
+    would make every position reachable from every other."""
+    return [move for move in game.legal_moves() if move[0] != 'foundation']
+
+def distances_to_win(root: SolitaireGame, limit: int = GRAPH_LIMIT) -> Optional[Dict[int, int]]:
+    """Exact distance to a win for every position reachable from root.
+
+    Every position reachable with endgame_moves is enumerated, then
+    distances are filled in breadth-first backwards from the won ones, so
+    each is the fewest such moves that win. Positions no such moves win
+    get LOST, which doesn't prove they can't be won with a foundation
+    takeback. Returns None if more than limit positions are reachable.
+    """
+    root = root.clone()
+    keys = {position_key(root): 0}
+    parents: List[List[int]] = [[]]
+    won = []
+    queue = deque([root])
+    node = 0
+    while queue:
+        position = queue.popleft()
+        if position.check_win():
+            won.append(node)
+        for move in endgame_moves(position):
+            child = position.clone()
+            child.apply_move(move, record_undo=False)
+            key = position_key(child)
+            child_node = keys.get(key)
+            if child_node is None:
+                if len(keys) >= limit:
+                    return None
+                child_node = keys[key] = len(parents)
+                parents.append([])
+                queue.append(child)
+            parents[child_node].append(node)
+        node += 1
+
+    distance = [LOST] * len(parents)
+    for node in won:
+        distance[node] = 0
+    queue = deque(won)
+    while queue:
+        node = queue.popleft()
+        for parent in parents[node]:
+            if distance[parent] == LOST:
+                distance[parent] = distance[node] + 1
+                queue.append(parent)
+    return {key: distance[node] for key, node in keys.items()}
+
+def build(path: str, seeds: Iterable[int], max_cards: int = 12, node_limit: int = 5000, progress=None) -> int:
+    """Generates an endgame table from the winning lines of seeded deals.
+
+    Each deal the solver can win is replayed until at most max_cards cards
+    are left outside the foundations, and everything reachable from there
+    is solved exactly. Returns how many positions were written.
+    """
+    table: Dict[int, int] = {}
+    for seed in seeds:
+        game = SolitaireGame(seed)
+        line = solve(game, node_limit)
+        if line is None:
+            continue
+        for move in line:
+            game.apply_move(move, record_undo=False)
+            if cards_left(game) > max_cards:
+                continue
+            if position_key(game) in table:
+                break
+            distances = distances_to_win(game)
+            if distances is not None:
+                table.update(distances)
+                break # The rest of the line is in this graph
+        if progress:
+            progress(seed, len(table))
+    write(path, table, max_cards)
+    return len(table)
+
+def write(path: str, distances: Dict[int, int], max_cards: int):
+    """Saves {position_key: distance} as a table file: the header, then
+    every key in ascending order, then the distances in the same order."""
+    keys = array('Q', sorted(distances))
+    values = array('H', [min(distances[key], LOST) for key in keys])
+    if sys.byteorder == 'big':
+        keys.byteswap()
+        values.byteswap()
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(keys), max_cards))
+        keys.tofile(f)
+        values.tofile(f)
+    os.replace(tmp, path)
+
+class EndgameTable:
+    """A memory-mapped endgame table file.
+
+    Lookups binary search the sorted keys in place, so only the few pages
+    a lookup touches are ever read from disk, and opening even a large
+    table costs nothing.
+    """
+    def __init__(self, path: str = ENDGAME_FILE):
+        if sys.byteorder == 'big':
+            raise ValueError("Endgame tables are little-endian")
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, self.max_cards = HEADER.unpack_from(self._map.read(HEADER.size).ljust(HEADER.size, b'\0'))
+        if magic != MAGIC or len(self._map) != HEADER.size + 10 * count:
+            self._map.close()
+            raise ValueError(f"Not an endgame table: {path}")
+        self._view = memoryview(self._map)
+        self.keys = self._view[HEADER.size:HEADER.size + 8 * count].cast('Q')
+        self.distances = self._view[HEADER.size + 8 * count:].cast('H')
+
+    def __getstate__(self):
+        return self.path # Each process maps the file itself
+
+    def __setstate__(self, path):
+        self.__init__(path)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def distance(self, game: SolitaireGame) -> Optional[int]:
+        """Fewest moves that win from this position, -1 if it can't be won
+        without taking cards back off the foundations, or None if it isn't
+        in the table."""
+        if cards_left(game) > self.max_cards:
+            return None
+        key = position_key(game)
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        distance = self.distances[i]
+        return -1 if distance == LOST else distance
+
+    def line(self, game: SolitaireGame) -> Optional[List[Move]]:
+        """The moves of a shortest win from a position in the table, or None
+        if it isn't in the table or is LOST."""
+        remaining = self.distance(game)
+        if remaining is None or remaining < 0:
+            return None
+        position = game.clone()
+        line = []
+        while remaining:
+            for move in endgame_moves(position):
+                child = position.clone()
+                child.apply_move(move, record_undo=False)
+                if self.distance(child) == remaining - 1:
+                    break
+            else:
+                return None # Table doesn't match the rules it was built with
+            line.append(move)
+            position = child
+            remaining -= 1
+        return line
+
+    def close(self):
+        self.keys.release()
+        self.distances.release()
+        self._view.release()
+        self._map.close()
+
+def default_path() -> str:
+    snap_data = os.environ.get('SNAP_USER_DATA')
+    return os.path.join(snap_data, ENDGAME_FILE) if snap_data else ENDGAME_FILE
+
+def open_default() -> Optional[EndgameTable]:
+    """The installed endgame table, or None if there isn't one."""
+    try:
+        return EndgameTable(default_path())
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,224 @@
+from typing import Dict, List, Optional, Tuple
+from cards import Card, CardGame, Deck, alternates
+
+Move = Tuple[str, int, str, int, int]
+
+class FreeCellGame(CardGame):
+    """A game of FreeCell: every card dealt face up into 8 columns, with 4
+    free cells and 4 foundations.
+
+    Moving several cards at once is shorthand for moving them one by one
+    through free cells and empty columns, so how many can move is limited
+    by how many of those are empty. Both counts, and the length of the
+    alternating run ending at each card, are kept up to date as cards move,
+    so move generation never rescans a column.
+    """
+    VARIANT = 'freecell'
+    NUM_COLUMNS = 8
+    TOP_ROW = tuple(('cell', i) for i in range(4)) + tuple(('foundation', i) for i in range(4))
+    NESTED_PILES = ('tableau', 'runs', 'cells', 'foundations')
+    VALUES = ('free_cells', 'empty_columns', 'score', 'moves')
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.deck = Deck(seed)
+        self.tableau: List[List[Card]] = [[] for _ in range(8)]
+        # runs[i][j]: length of the alternating run ending at tableau[i][j]
+        self.runs: List[List[int]] = [[] for _ in range(8)]
+        self.cells: List[List[Card]] = [[] for _ in range(4)]
+        self.foundations: List[List[Card]] = [[] for _ in range(4)]
+        self.face_down = [0] * 8 # Nothing is ever face down
+        self.score = 0
+        self.moves = 0
+        self.history = []
+        self.last_move: Optional[Move] = None
+        self.deal()
+
+    def reset_game(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.deck.reset(seed)
+        for column, runs in zip(self.tableau, self.runs):
+            column.clear()
+            runs.clear()
+        for pile in self.cells:
+            pile.clear()
+        for foundation in self.foundations:
+            foundation.clear()
+        self.score = 0
+        self.moves = 0
+        self.history.clear()
+        self.here = None
+        self.last_move = None
+        self.deal()
+
+    def deal(self):
+        cards = self.deck.cards
+        for i in range(len(cards)):
+            self._push(i % 8, cards[len(cards) - 1 - i])
+        self.free_cells = 4
+        self.empty_columns = 0
+
+    def _push(self, col: int, card: Card):
+        column, runs = self.tableau[col], self.runs[col]
+        runs.append(runs[-1] + 1 if column and alternates(card, column[-1]) else 1)
+        column.append(card)
+
+    def _pop(self, col: int, num_cards: int) -> List[Card]:
+        column = self.tableau[col]
+        cards = column[-num_cards:]
+        del column[-num_cards:]
+        del self.runs[col][-num_cards:]
+        if not column:
+            self.empty_columns += 1
+        return cards
+
+    def run_length(self, col_idx: int) -> int:
+        runs = self.runs[col_idx]
+        return runs[-1] if runs else 0
+
+    def capacity(self, to_empty: bool = False) -> int:
+        """Most cards that can move at once, given the free cells and empty columns."""
+        empty = self.empty_columns - (1 if to_empty else 0)
+        return (self.free_cells + 1) << max(0, empty)
+
+    def can_move_to_foundation(self, card: Card, f_idx: int) -> bool:
+        foundation = self.foundations[f_idx]
+        if not foundation:
+            return card.value == 1
+        return foundation[-1].suit is card.suit and foundation[-1].value == card.value - 1
+
+    def tableau_move_depths(self, from_col: int) -> Dict[int, int]:
+        """{to_col: num_cards} for tableau moves out of a column. Moves into
+        an empty column take as much of the run as fits."""
+        column = self.tableau[from_col]
+        run = self.run_length(from_col)
+        if not run:
+            return {}
+        depths = {}
+        limit = min(run, self.capacity())
+        for to_col, dest in enumerate(self.tableau):
+            if to_col == from_col:
+                continue
+            if not dest:
+                depths[to_col] = min(run, self.capacity(to_empty=True))
+                continue
+            # Ranks rise by one down the run, so only one depth can fit
+            depth = dest[-1].value - column[-1].value
+            if 1 <= depth <= limit and alternates(column[-depth], dest[-1]):
+                depths[to_col] = depth
+        return depths
+
+    def moves_from(self, pile: str, idx: int) -> List[Move]:
+        moves = []
+        source = self.pile(pile, idx)
+        if not source or pile == 'foundation':
+            return moves
+        card = source[-1]
+        if pile == 'tableau':
+            for to_col, num_cards in self.tableau_move_depths(idx).items():
+                moves.append(('tableau', idx, 'tableau', to_col, num_cards))
+            for c_idx, cell in enumerate(self.cells):
+                if not cell:
+                    moves.append(('tableau', idx, 'cell', c_idx, 1))
+        else:
+            for to_col, dest in enumerate(self.tableau):
+                if not dest or alternates(card, dest[-1]):
+                    moves.append(('cell', idx, 'tableau', to_col, 1))
+        for f_idx in range(4):
+            if self.can_move_to_foundation(card, f_idx):
+                moves.append((pile, idx, 'foundation', f_idx, 1))
+        return moves
+
+    def legal_moves(self) -> List[Move]:
+        """Every legal move. Only the first empty free cell is listed."""
+        moves = []
+        for c_idx, cell in enumerate(self.cells):
+            if cell:
+                moves.extend(self.moves_from('cell', c_idx))
+        first_free = next((i for i, cell in enumerate(self.cells) if not cell), None)
+        for col in range(8):
+            for move in self.moves_from('tableau', col):
+                if move[2] != 'cell' or move[3] == first_free:
+                    moves.append(move)
+        return moves
+
+    def is_legal(self, move: Move) -> bool:
+        src_pile, src_idx, dst_pile, dst_idx, num_cards = move
+        if src_pile == 'tableau' and dst_pile == 'tableau' and not self.tableau[dst_idx] and src_idx != dst_idx:
+            # An empty column takes any part of the run that fits
+            return 1 <= num_cards <= min(self.run_length(src_idx), self.capacity(to_empty=True))
+        return move in self.moves_from(src_pile, src_idx)
+
+    def apply_move(self, move: Move, record_undo=True) -> bool:
+        src_pile, src_idx, dst_pile, dst_idx, num_cards = move
+        if not self.is_legal(move):
+            return False
+        if record_undo:
+            self.save_state()
+
+        if src_pile == 'tableau':
+            cards = self._pop(src_idx, num_cards)
+        else:
+            cards = [self.cells[src_idx].pop()]
+            self.free_cells += 1
+
+        if dst_pile == 'tableau':
+            if not self.tableau[dst_idx]:
+                self.empty_columns -= 1
+            for card in cards:
+                self._push(dst_idx, card)
+        elif dst_pile == 'cell':
+            self.cells[dst_idx].append(cards[0])
+            self.free_cells -= 1
+        else:
+            self.foundations[dst_idx].append(cards[0])
+            self.score += 10
+
+        self.moves += 1
+        self.last_move = move
+        return True
+
+    def auto_move_to_foundation(self) -> bool:
+        """Moves cards to the foundations until none can go, as one undo step."""
+        self.save_state()
+        moved = False
+        progress = True
+        while progress:
+            progress = False
+            for pile, count in (('cell', 4), ('tableau', 8)):
+                for idx in range(count):
+                    for move in self.moves_from(pile, idx):
+                        if move[2] == 'foundation':
+                            self.apply_move(move, record_undo=False)
+                            moved = progress = True
+                            break
+        if not moved:
+            self.history.pop()
+        return moved
+
+    def plan_auto_complete(self):
+        return None # 'S' stacks what it can instead
+
+    def check_win(self) -> bool:
+        return all(len(f) == 13 for f in self.foundations)
+
+    def clone(self) -> 'FreeCellGame':
+        other = FreeCellGame.__new__(FreeCellGame)
+        other.seed = self.seed
+        other.deck = self.deck
+        other.tableau = [column[:] for column in self.tableau]
+        other.runs = [runs[:] for runs in self.runs]
+        other.cells = [pile[:] for pile in self.cells]
+        other.foundations = [f[:] for f in self.foundations]
+        other.face_down = self.face_down
+        other.free_cells = self.free_cells
+        other.empty_columns = self.empty_columns
+        other.score = self.score
+        other.moves = self.moves
+        other.history = []
+        other.last_move = self.last_move
+        return other
+
+    def state_key(self) -> tuple:
+        return (tuple(map(tuple, self.tableau)), tuple(map(tuple, self.cells)),
+                tuple(len(f) for f in self.foundations))
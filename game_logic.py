@@ -1,131 +1,126 @@
-import random
-import copy
-from enum import Enum
-from typing import List, Optional, Tuple
-
-class Suit(Enum):
-    HEARTS = '♥'
-    DIAMONDS = '♦'
-    CLUBS = '♣'
-    SPADES = '♠'
-
-    @property
-    def color(self):
-        return 'RED' if self in (Suit.HEARTS, Suit.DIAMONDS) else 'BLACK'
-
-class Rank(Enum):
-    ACE = 1
-    TWO = 2
-    THREE = 3
-    FOUR = 4
-    FIVE = 5
-    SIX = 6
-    SEVEN = 7
-    EIGHT = 8
-    NINE = 9
-    TEN = 10
-    JACK = 11
-    QUEEN = 12
-    KING = 13
-
-    def __str__(self):
-        if self.value == 1: return 'A'
-        if self.value == 11: return 'J'
-        if self.value == 12: return 'Q'
-        if self.value == 13: return 'K'
-        return str(self.value)
-
-class Card:
-    def __init__(self, suit: Suit, rank: Rank):
-        self.suit = suit
-        self.rank = rank
-        self.face_up = False
-
-    def flip(self):
-        self.face_up = not self.face_up
-
-    def show(self):
-        self.face_up = True
-
-    def hide(self):
-        self.face_up = False
-
-    def __repr__(self):
-        return f"{self.rank}{self.suit.value}" if self.face_up else "[?]"
-
-class Deck:
-    def __init__(self):
-        self.cards = [Card(s, r) for s in Suit for r in Rank]
-        self.shuffle()
-
-    def shuffle(self):
-        random.shuffle(self.cards)
-
-    def draw(self) -> Optional[Card]:
-        return self.cards.pop() if self.cards else None
-
-class SolitaireGame:
-    def __init__(self):
-        self.deck = Deck()
+import sys
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+from cards import CARDS, Card, CardGame, Deck, GameState, Rank, Suit
+from freecell import FreeCellGame
+from spider import SpiderGame
+
+# Two-character card codes for position notation: rank then suit, e.g. 'Th' is 10♥
+CARD_CODES = tuple('A23456789TJQK'[card.rank.value - 1] + 'hdcs'[list(Suit).index(card.suit)]
+                   for card in CARDS)
+CARD_FROM_CODE = {code: card for code, card in zip(CARD_CODES, CARDS)}
+# The same codes as native 16-bit integers, for parsing
+_CARD_PAIRS = tuple(int.from_bytes(code.encode(), sys.byteorder) for code in CARD_CODES)
+_CARD_FROM_PAIR = dict(zip(_CARD_PAIRS, CARDS))
+# A foundation's cards, and their codes as integers, by its top card's code
+_FOUNDATION_FROM_TOP = {'-': (), **{CARD_CODES[card.index]: CARDS[card.index - card.value + 1:card.index + 1]
+                                    for card in CARDS}}
+_FOUNDATION_PAIRS = {top: tuple(_CARD_PAIRS[card.index] for card in cards)
+                     for top, cards in _FOUNDATION_FROM_TOP.items()}
+# Two codes as one native 32-bit integer, for every card followed by one it can hold in a column
+_RUN_STEPS = frozenset(int.from_bytes((CARD_CODES[card.index] + CARD_CODES[below.index]).encode(), sys.byteorder)
+                       for card in CARDS for below in CARDS
+                       if below.red != card.red and below.value == card.value - 1)
+
+# The cards each card takes, by index: the next of its suit on a
+# foundation, and the two of the other color one rank down on a column
+_FOUNDATION_NEXT = tuple((CARDS[card.index + 1],) if card.value < 13 else () for card in CARDS)
+_BUILDS_ON = tuple(tuple(other for other in CARDS if other.red != card.red and other.value == card.value - 1)
+                   for card in CARDS)
+_ACES = tuple(card for card in CARDS if card.value == 1)
+_KINGS = tuple(card for card in CARDS if card.value == 13)
+
+class SolitaireGame(CardGame):
+    """A game of Klondike.
+
+    Stock cards are always face down and waste and foundation cards face
+    up. In the tableau, the first face_down[i] cards of column i are face
+    down and the rest face up.
+    """
+    VARIANT = 'klondike'
+    NUM_COLUMNS = 7
+    # Stock, waste, a gap, then the foundations above tableau 3-6
+    TOP_ROW = (('stock', 0), ('waste', 0), None) + tuple(('foundation', i) for i in range(4))
+    PILES = ('face_down', 'stock', 'waste')
+    # Stock cycle index and the (stock, waste, len(stock), len(waste)) it
+    # describes; see _stock_cycle
+    _cycle: Optional[Dict[Card, int]] = None
+    _cycle_piles: Optional[tuple] = None
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.deck = Deck(seed)
         self.tableau: List[List[Card]] = [[] for _ in range(7)]
+        self.face_down: List[int] = [0] * 7
         self.foundations: List[List[Card]] = [[] for _ in range(4)] 
         self.stock: List[Card] = []
         self.waste: List[Card] = []
         self.score = 0
         self.moves = 0
         self.history = []
+        # Last successful move as (src_pile, src_idx, dst_pile, dst_idx, num_cards)
+        self.last_move: Optional[Tuple[str, int, str, int, int]] = None
         self.deal()
 
-    def reset_game(self):
-        """Resets the game state for a new deal."""
-        self.deck = Deck()
-        self.tableau: List[List[Card]] = [[] for _ in range(7)]
-        self.foundations: List[List[Card]] = [[] for _ in range(4)]
-        self.stock: List[Card] = []
-        self.waste: List[Card] = []
+    def reset_game(self, seed: Optional[int] = None):
+        """Resets the game state for a new deal, reusing the deck and piles."""
+        self.seed = seed
+        if self.deck is None:
+            self.deck = Deck(seed) # Positions read from notation have none
+        else:
+            self.deck.reset(seed)
+        for column in self.tableau:
+            column.clear()
+        for foundation in self.foundations:
+            foundation.clear()
+        self.stock.clear()
+        self.waste.clear()
         self.score = 0
         self.moves = 0
-        self.history = []
+        self.history.clear()
+        self.here = None
+        self.last_move = None
         self.deal()
 
-    def save_state(self):
-        self.history.append({
-            'tableau': copy.deepcopy(self.tableau),
-            'foundations': copy.deepcopy(self.foundations),
-            'stock': copy.deepcopy(self.stock),
-            'waste': copy.deepcopy(self.waste),
-            'score': self.score,
-            'moves': self.moves
-        })
-
-    def undo(self) -> bool:
-        if not self.history:
-            return False
+    def thaw(self, state) -> GameState:
+        return _unpack_state(state) if isinstance(state, tuple) else state
 
-        state = self.history.pop()
-        self.tableau = state['tableau']
-        self.foundations = state['foundations']
-        self.stock = state['stock']
-        self.waste = state['waste']
-        self.score = state['score']
-        self.moves = state['moves']
-        return True
+    def compact_history(self, keep_recent: int = 20) -> int:
+        """Packs all but the newest snapshots into a few hundred bytes each.
+
+        Undo still works through packed snapshots, it just has to rebuild
+        the cards, but lines undone from a packed position are forgotten.
+        Returns how many snapshots were packed.
+        """
+        packed = 0
+        for i in range(len(self.history) - keep_recent):
+            state = self.history[i]
+            if isinstance(state, dict):
+                self.history[i] = _pack_state(state)
+                packed += 1
+        return packed
 
     def deal(self):
-        # Deal to tableau
+        self._cycle_piles = None # reset_game refills the same lists
+        # Deal from the top (end) of the deck without consuming it
+        cards = self.deck.cards
+        top = len(cards)
         for i in range(7):
             for j in range(i + 1):
-                card = self.deck.draw()
-                if j == i:
-                    card.show()
-                self.tableau[i].append(card)
+                top -= 1
+                self.tableau[i].append(cards[top])
+            self.face_down[i] = i # Only the last card is face up
         
         # Remaining to stock
-        while True:
-            card = self.deck.draw()
-            if not card:
-                break
-            self.stock.append(card)
+        while top:
+            top -= 1
+            self.stock.append(cards[top])
+
+    def _reveal(self, col_idx: int):
+        """Turns over a column's new top card if it is face down."""
+        if self.tableau[col_idx] and self.face_down[col_idx] == len(self.tableau[col_idx]):
+            self.face_down[col_idx] -= 1
+            self.score += 5
 
     def draw_from_stock(self, record_undo=True):
         if record_undo:
@@ -135,35 +130,64 @@ class SolitaireGame:
             # Recycle waste to stock
             if not self.waste:
                 return # Empty stock and waste
-            self.stock = list(reversed(self.waste))
-            self.waste = []
-            for card in self.stock:
-                card.hide()
+            self.stock.extend(reversed(self.waste))
+            self.waste.clear()
             self.score = max(0, self.score - 100)
+            self.last_move = ('waste', 0, 'stock', 0, len(self.stock))
         else:
             # Draw one card
-            card = self.stock.pop()
-            card.show()
-            self.waste.append(card)
+            self._cycle_drawn()
+            self.waste.append(self.stock.pop())
             self.moves += 1
+            self.last_move = ('stock', 0, 'waste', 0, 1)
 
     def can_move_to_tableau(self, card: Card, col_idx: int) -> bool:
         column = self.tableau[col_idx]
         if not column:
-            return card.rank == Rank.KING
+            return card.value == 13 # King
         
         top_card = column[-1]
-        return (top_card.suit.color != card.suit.color) and \
-               (top_card.rank.value == card.rank.value + 1)
+        return top_card.red != card.red and top_card.value == card.value + 1
 
     def can_move_to_foundation(self, card: Card, f_idx: int) -> bool:
         foundation = self.foundations[f_idx]
         if not foundation:
-            return card.rank == Rank.ACE
+            return card.value == 1 # Ace
         
         top_card = foundation[-1]
-        return (top_card.suit == card.suit) and \
-               (top_card.rank.value == card.rank.value - 1)
+        return top_card.suit is card.suit and top_card.value == card.value - 1
+
+    def face_up_count(self, col_idx: int) -> int:
+        return len(self.tableau[col_idx]) - self.face_down[col_idx]
+
+    def run_length(self, col_idx: int) -> int:
+        """Cards that can be picked up together from the top of a column."""
+        # Cards only land face up by a legal build, so the face-up part of a
+        # column is always one alternating run and face_down tracks its length
+        return self.face_up_count(col_idx)
+
+    def tableau_move_depths(self, from_col: int) -> Dict[int, int]:
+        """Legal moves out of a column's face-up run, as {to_col: num_cards}.
+
+        Ranks rise by one down the run, so the only depth a destination can
+        take follows from the two top ranks: one check per destination,
+        however long the run.
+        """
+        column = self.tableau[from_col]
+        run = self.run_length(from_col)
+        if not run:
+            return {}
+        top_value = column[-1].value
+
+        depths = {}
+        for to_col, dest in enumerate(self.tableau):
+            if to_col == from_col:
+                continue
+            # An empty column takes the run from its King
+            depth = (dest[-1].value if dest else 14) - top_value
+            if 1 <= depth <= run and (not dest or column[-depth].red != dest[-1].red):
+                depths[to_col] = depth
+        return depths
 
     def check_win(self) -> bool:
         return all(len(f) == 13 for f in self.foundations)
@@ -173,26 +197,22 @@ class SolitaireGame:
             return False
         
         source_col = self.tableau[from_col]
-        if len(source_col) < num_cards:
+        if not 0 < num_cards <= self.face_up_count(from_col):
             return False
         
-        cards_to_move = source_col[-num_cards:]
-        base_card = cards_to_move[0]
-        
-        if self.can_move_to_tableau(base_card, to_col):
+        if self.can_move_to_tableau(source_col[-num_cards], to_col):
             if record_undo:
                 self.save_state()
 
-            # Execute move
-            self.tableau[from_col] = source_col[:-num_cards]
-            self.tableau[to_col].extend(cards_to_move)
+            # Execute move in place: only the moved cards are touched
+            self.tableau[to_col].extend(source_col[-num_cards:])
+            del source_col[-num_cards:]
             
             # Flip new top card of source if needed
-            if self.tableau[from_col] and not self.tableau[from_col][-1].face_up:
-                self.tableau[from_col][-1].show()
-                self.score += 5
+            self._reveal(from_col)
             
             self.moves += 1
+            self.last_move = ('tableau', from_col, 'tableau', to_col, num_cards)
             return True
         return False
 
@@ -205,10 +225,12 @@ class SolitaireGame:
             if record_undo:
                 self.save_state()
 
+            self._cycle_played()
             self.waste.pop()
             self.tableau[to_col].append(card)
             self.score += 5
             self.moves += 1
+            self.last_move = ('waste', 0, 'tableau', to_col, 1)
             return True
         return False
 
@@ -221,10 +243,12 @@ class SolitaireGame:
             if record_undo:
                 self.save_state()
 
+            self._cycle_played()
             self.waste.pop()
             self.foundations[f_idx].append(card)
             self.score += 10
             self.moves += 1
+            self.last_move = ('waste', 0, 'foundation', f_idx, 1)
             return True
         return False
 
@@ -242,11 +266,10 @@ class SolitaireGame:
             self.score += 10
             
             # Flip new top card of source if needed
-            if self.tableau[from_col] and not self.tableau[from_col][-1].face_up:
-                self.tableau[from_col][-1].show()
-                self.score += 5
+            self._reveal(from_col)
             
             self.moves += 1
+            self.last_move = ('tableau', from_col, 'foundation', f_idx, 1)
             return True
         return False
 
@@ -263,9 +286,88 @@ class SolitaireGame:
             self.tableau[to_col].append(card)
             self.score = max(0, self.score - 15)
             self.moves += 1
+            self.last_move = ('foundation', f_idx, 'tableau', to_col, 1)
             return True
         return False
 
+    def plan_auto_complete(self) -> Optional[List[Tuple[str, int, int]]]:
+        """Returns the foundation moves that finish a trivially won position.
+
+        A position is trivially won once the stock is empty and every tableau
+        card is face up. The plan is built in one pass over a per-suit
+        next-rank table without touching the game state. Each move is
+        ('waste', 0, f_idx) or ('tableau', col, f_idx). Returns None when the
+        position does not qualify or the waste order blocks a clean finish.
+        """
+        if self.stock or any(self.face_down):
+            return None
+
+        # Next rank needed per suit, and which foundation each suit lives on
+        next_rank = {suit: 1 for suit in Suit}
+        target = {}
+        free = []
+        for f_idx, foundation in enumerate(self.foundations):
+            if foundation:
+                top_card = foundation[-1]
+                next_rank[top_card.suit] = top_card.rank.value + 1
+                target[top_card.suit] = f_idx
+            else:
+                free.append(f_idx)
+
+        heights = [len(column) for column in self.tableau]
+        waste_height = len(self.waste)
+        remaining = sum(heights) + waste_height
+        plan = []
+
+        while remaining:
+            progressed = False
+            while waste_height:
+                card = self.waste[waste_height - 1]
+                if card.rank.value != next_rank[card.suit]:
+                    break
+                if card.suit not in target:
+                    target[card.suit] = free.pop(0)
+                plan.append(('waste', 0, target[card.suit]))
+                next_rank[card.suit] += 1
+                waste_height -= 1
+                remaining -= 1
+                progressed = True
+
+            for i in range(7):
+                while heights[i]:
+                    card = self.tableau[i][heights[i] - 1]
+                    if card.rank.value != next_rank[card.suit]:
+                        break
+                    if card.suit not in target:
+                        target[card.suit] = free.pop(0)
+                    plan.append(('tableau', i, target[card.suit]))
+                    next_rank[card.suit] += 1
+                    heights[i] -= 1
+                    remaining -= 1
+                    progressed = True
+
+            if not progressed:
+                return None
+        return plan
+
+    def apply_foundation_move(self, move: Tuple[str, int, int]) -> bool:
+        """Plays a single move produced by plan_auto_complete without recording undo."""
+        source, idx, f_idx = move
+        if source == 'waste':
+            return self.move_waste_to_foundation(f_idx, record_undo=False)
+        return self.move_tableau_to_foundation(idx, f_idx, record_undo=False)
+
+    def auto_complete(self) -> bool:
+        """Finishes a trivially won position as a single undoable action."""
+        plan = self.plan_auto_complete()
+        if not plan:
+            return False
+
+        self.save_state()
+        for move in plan:
+            self.apply_foundation_move(move)
+        return True
+
     def auto_move_to_foundation(self) -> bool:
         # Save state once for the entire batch of auto-moves
         self.save_state()
@@ -291,3 +393,365 @@ class SolitaireGame:
             self.history.pop()
 
         return moved
+
+    def legal_moves(self) -> List[Tuple[str, int, str, int, int]]:
+        """Every legal move, in the same (src_pile, src_idx, dst_pile, dst_idx, num_cards)
+        form as last_move. Aces only list the first empty foundation."""
+        moves = []
+        if self.stock:
+            moves.append(('stock', 0, 'waste', 0, 1))
+        elif self.waste:
+            moves.append(('waste', 0, 'stock', 0, len(self.waste)))
+
+        if self.waste:
+            card = self.waste[-1]
+            f_idx = self._foundation_for(card)
+            if f_idx is not None:
+                moves.append(('waste', 0, 'foundation', f_idx, 1))
+            for to_col in range(7):
+                if self.can_move_to_tableau(card, to_col):
+                    moves.append(('waste', 0, 'tableau', to_col, 1))
+
+        for from_col in range(7):
+            if not self.tableau[from_col]:
+                continue
+            f_idx = self._foundation_for(self.tableau[from_col][-1])
+            if f_idx is not None:
+                moves.append(('tableau', from_col, 'foundation', f_idx, 1))
+            for to_col, num_cards in self.tableau_move_depths(from_col).items():
+                moves.append(('tableau', from_col, 'tableau', to_col, num_cards))
+
+        for f_idx in range(4):
+            if not self.foundations[f_idx]:
+                continue
+            card = self.foundations[f_idx][-1]
+            for to_col in range(7):
+                if self.can_move_to_tableau(card, to_col):
+                    moves.append(('foundation', f_idx, 'tableau', to_col, 1))
+        return moves
+
+    def moves_from(self, pile: str, idx: int) -> List[Tuple[str, int, str, int, int]]:
+        """Legal moves out of one pile. Unlike legal_moves, an Ace may go to
+        any empty foundation, since a player can pick one."""
+        moves = []
+        if pile == 'tableau':
+            if not self.tableau[idx]:
+                return moves
+            for to_col, num_cards in self.tableau_move_depths(idx).items():
+                moves.append(('tableau', idx, 'tableau', to_col, num_cards))
+            card = self.tableau[idx][-1]
+        else:
+            source = self.waste if pile == 'waste' else self.foundations[idx] if pile == 'foundation' else None
+            if not source:
+                return moves
+            card = source[-1]
+            for to_col in range(7):
+                if self.can_move_to_tableau(card, to_col):
+                    moves.append((pile, idx, 'tableau', to_col, 1))
+            if pile == 'foundation':
+                return moves
+
+        for f_idx in range(4):
+            if self.can_move_to_foundation(card, f_idx):
+                moves.append((pile, idx, 'foundation', f_idx, 1))
+        return moves
+
+    def _foundation_for(self, card: Card) -> Optional[int]:
+        for f_idx in range(4):
+            if self.can_move_to_foundation(card, f_idx):
+                return f_idx
+        return None
+
+    # --- Stock cycle ---
+    # Drawing one card at a time never changes the order cards come up in,
+    # the waste from the bottom and then the stock from the top, and
+    # neither does recycling; only playing the waste card does, by taking
+    # it out. The index maps each card to where it lies, i for waste[i] and
+    # -1 - j for stock[j], so a draw or a waste play changes one entry.
+
+    def _cycle_current(self) -> bool:
+        piles = self._cycle_piles
+        return (piles is not None and piles[0] is self.stock and piles[1] is self.waste
+                and piles[2] == len(self.stock) and piles[3] == len(self.waste))
+
+    def _stock_cycle(self) -> Dict[Card, int]:
+        """The index, rebuilt if the stock or waste changed some other way
+        (a recycle, undo, or piles set directly)."""
+        if not self._cycle_current():
+            index = {card: i for i, card in enumerate(self.waste)}
+            index.update((card, -1 - j) for j, card in enumerate(self.stock))
+            self._cycle = index
+            self._cycle_piles = (self.stock, self.waste, len(self.stock), len(self.waste))
+        return self._cycle
+
+    def _cycle_drawn(self):
+        """Updates the index for the stock's top card, about to be drawn."""
+        if self._cycle_current():
+            self._cycle[self.stock[-1]] = len(self.waste)
+            self._cycle_piles = (self.stock, self.waste, len(self.stock) - 1, len(self.waste) + 1)
+
+    def _cycle_played(self):
+        """Updates the index for the waste's top card, about to be played."""
+        if self._cycle_current():
+            del self._cycle[self.waste[-1]]
+            self._cycle_piles = (self.stock, self.waste, len(self.stock), len(self.waste) - 1)
+
+    def _draw_cards(self, draws: int):
+        """draw_from_stock that many times, without undo, moving a pass
+        through the stock at a time."""
+        stock, waste = self.stock, self.waste
+        while draws:
+            if not stock:
+                self.draw_from_stock(record_undo=False) # Recycle
+                draws -= 1
+                continue
+            count = min(draws, len(stock))
+            drawn = stock[:-count - 1:-1] # Top first
+            if self._cycle_current():
+                index = self._cycle
+                for i, card in enumerate(drawn, len(waste)):
+                    index[card] = i
+                self._cycle_piles = (stock, waste, len(stock) - count, len(waste) + count)
+            waste.extend(drawn)
+            del stock[-count:]
+            self.moves += count
+            self.last_move = ('stock', 0, 'waste', 0, 1)
+            draws -= count
+
+    def _draws(self, key: int) -> int:
+        if key < 0:
+            return len(self.stock) + 1 + key
+        if key == len(self.waste) - 1:
+            return 0
+        return len(self.stock) + key + 2 # The rest of the stock, the recycle, then up the waste
+
+    def stock_draws(self, card: Card) -> Optional[int]:
+        """How many draws bring card to the top of the waste: 0 if it is
+        there, at most len(stock) in this pass through the stock, and more
+        if it only comes up after the waste is recycled. None if the card
+        isn't in the stock or waste."""
+        key = self._stock_cycle().get(card)
+        return None if key is None else self._draws(key)
+
+    def card_after_draws(self, draws: int) -> Optional[Card]:
+        """The top of the waste after that many draws, or None if the waste
+        would be empty (just after a recycle)."""
+        waste, stock = self.waste, self.stock
+        total = len(waste) + len(stock)
+        # Positions in the order cards come up, with total for the empty waste
+        at = ((len(waste) - 1 if waste else total) + draws) % (total + 1)
+        if at == total:
+            return None
+        return waste[at] if at < len(waste) else stock[total - 1 - at]
+
+    def stock_moves(self) -> List[Tuple[str, int, str, int, int]]:
+        """Every stock or waste card that can be played, as macro moves
+        ('waste', draws, dst_pile, dst_idx, 1): draw that many times (see
+        stock_draws), then play the waste card. With 0 draws these are the
+        waste moves of legal_moves, and like them, Aces only list the first
+        empty foundation. The index is looked up for the cards the piles
+        take, so the cost doesn't grow with the stock."""
+        index = self._stock_cycle()
+        if not index:
+            return []
+        moves = []
+        empty = None
+        for f_idx, foundation in enumerate(self.foundations):
+            if foundation:
+                wanted = _FOUNDATION_NEXT[foundation[-1].index]
+            elif empty is None:
+                empty = f_idx
+                wanted = _ACES
+            else:
+                continue
+            for card in wanted:
+                key = index.get(card)
+                if key is not None:
+                    moves.append(('waste', self._draws(key), 'foundation', f_idx, 1))
+        for col, column in enumerate(self.tableau):
+            for card in _BUILDS_ON[column[-1].index] if column else _KINGS:
+                key = index.get(card)
+                if key is not None:
+                    moves.append(('waste', self._draws(key), 'tableau', col, 1))
+        return moves
+
+    def macro_moves(self) -> List[Tuple[str, int, str, int, int]]:
+        """legal_moves with the stock collapsed: no draws or recycles, and
+        a stock_moves macro move for each stock or waste card that can be
+        played. A search over these skips the positions in between."""
+        return [move for move in self.legal_moves() if move[0] not in ('stock', 'waste')] + self.stock_moves()
+
+    def apply_move(self, move: Tuple[str, int, str, int, int], record_undo=True) -> bool:
+        """Plays a move in the form returned by legal_moves or stock_moves.
+        A macro move is one undo step, and does nothing if the card it
+        turns up can't go where it says."""
+        src_pile, src_idx, dst_pile, dst_idx, num_cards = move
+        if src_pile == 'stock' or dst_pile == 'stock':
+            self.draw_from_stock(record_undo)
+            return True
+        if src_pile == 'waste' and src_idx:
+            card = self.card_after_draws(src_idx)
+            if card is None or not (self.can_move_to_foundation(card, dst_idx) if dst_pile == 'foundation'
+                                    else self.can_move_to_tableau(card, dst_idx)):
+                return False
+            if record_undo:
+                self.save_state()
+                record_undo = False
+            self._draw_cards(src_idx)
+        if src_pile == 'waste':
+            if dst_pile == 'foundation':
+                return self.move_waste_to_foundation(dst_idx, record_undo)
+            return self.move_waste_to_tableau(dst_idx, record_undo)
+        if src_pile == 'foundation':
+            return self.move_foundation_to_tableau(src_idx, dst_idx, record_undo)
+        if dst_pile == 'foundation':
+            return self.move_tableau_to_foundation(src_idx, dst_idx, record_undo)
+        return self.move_tableau_to_tableau(src_idx, dst_idx, num_cards, record_undo)
+
+    def clone(self) -> 'SolitaireGame':
+        """Independent copy of the position without the undo history, for searches."""
+        other = SolitaireGame.__new__(SolitaireGame)
+        other.seed = self.seed
+        other.deck = self.deck
+        other.tableau = [column[:] for column in self.tableau]
+        other.face_down = self.face_down[:]
+        other.foundations = [foundation[:] for foundation in self.foundations]
+        other.stock = self.stock[:]
+        other.waste = self.waste[:]
+        other.score = self.score
+        other.moves = self.moves
+        other.history = []
+        other.last_move = self.last_move
+        if self._cycle_current():
+            other._cycle = self._cycle.copy()
+            other._cycle_piles = (other.stock, other.waste, len(other.stock), len(other.waste))
+        return other
+
+    def state_key(self) -> tuple:
+        """Hashable position (piles and face-down counts, not score or moves)."""
+        return (tuple(map(tuple, self.tableau)), tuple(self.face_down),
+                tuple(len(foundation) for foundation in self.foundations),
+                tuple(self.stock), tuple(self.waste))
+
+    def to_notation(self) -> str:
+        """The position as one line of text, for bug reports, fixtures and solvers.
+
+        Six space-separated fields, FEN style:
+
+            tableau foundations stock waste score moves
+
+        The 7 tableau columns are separated by '/', each written bottom card
+        first with '|' between the face-down and face-up cards. Foundations
+        are written as their top cards, stock and waste bottom card first;
+        '-' marks an empty pile. Cards are two characters, rank then suit
+        (A23456789TJQK, hdcs), e.g. 'Th' for 10♥.
+        """
+        # One pass over every card, then cut the text into piles
+        text = ''.join([CARD_CODES[card.index] for card in chain(*self.tableau, self.stock, self.waste)])
+        fields = []
+        pos = 0
+        for column, down in zip(self.tableau, self.face_down):
+            split = pos + 2 * down
+            pos += 2 * len(column)
+            fields.append(text[split - 2 * down:split] + '|' + text[split:pos])
+        tableau = '/'.join(fields)
+        foundations = '/'.join([CARD_CODES[f[-1].index] if f else '-' for f in self.foundations])
+        split = pos + 2 * len(self.stock)
+        return f"{tableau} {foundations} {text[pos:split] or '-'} {text[split:] or '-'} {self.score} {self.moves}"
+
+    @classmethod
+    def from_notation(cls, text: str) -> 'SolitaireGame':
+        """Rebuilds a position written by to_notation. Raises ValueError if
+        the text is malformed, doesn't hold each of the 52 cards once, or
+        isn't a position play can reach: a column's face-up cards must be
+        one alternating run, and score and moves can't be negative.
+
+        Cards are looked up, counted and checked as integers read straight
+        from the text, so a position takes a few microseconds: tens of
+        thousands of round trips a second on one core, not the hundreds of
+        thousands a native codec would manage.
+        """
+        try:
+            tableau, foundations, stock, waste, score, moves = text.split()
+            columns = tableau.split('/')
+            tops = foundations.split('/')
+            if len(columns) != 7 or len(tops) != 4:
+                raise ValueError
+            stock = '' if stock == '-' else stock
+            waste = '' if waste == '-' else waste
+            # Read every card in one go, then cut the list into piles
+            pairs = memoryview((tableau.replace('|', '').replace('/', '') + stock + waste).encode('ascii')).cast('H')
+            cards = list(map(_CARD_FROM_PAIR.__getitem__, pairs))
+            game = cls.__new__(cls)
+            game.tableau = []
+            game.face_down = []
+            runs = [] # Face-up parts of two or more cards
+            no_face_up = False
+            pos = 0
+            for column in columns:
+                split = column.index('|') # Raises ValueError if missing
+                if split & 1 or not len(column) & 1: # Codes on both sides come in pairs
+                    raise ValueError
+                end = pos + (len(column) >> 1)
+                game.tableau.append(cards[pos:end])
+                game.face_down.append(split >> 1)
+                if len(column) - split > 3:
+                    runs.append(column[split + 1:])
+                elif split and len(column) - split == 1:
+                    no_face_up = True
+                pos = end
+            end = pos + (len(stock) >> 1)
+            game.stock = cards[pos:end]
+            game.waste = cards[end:]
+            # A foundation holds its suit from the Ace up to its top card
+            game.foundations = [list(_FOUNDATION_FROM_TOP[top]) for top in tops]
+            seen = set(pairs)
+            for top in tops:
+                seen.update(_FOUNDATION_PAIRS[top])
+            game.score = int(score)
+            game.moves = int(moves)
+            if game.score < 0 or game.moves < 0:
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Not a Klondike position: {text!r}") from None
+        if len(seen) != 52 or len(pairs) + sum(map(len, game.foundations)) != 52:
+            raise ValueError(f"Position does not hold each card once: {text!r}")
+        if no_face_up:
+            raise ValueError(f"Column has no face-up card: {text!r}")
+        # The face-up part of a column can only have been built one way
+        if not all(map(_is_run, runs)):
+            raise ValueError(f"Face-up cards are not an alternating run: {text!r}")
+        game.seed = None
+        game.deck = None
+        game.history = []
+        game.last_move = None
+        return game
+
+def _is_run(codes: str) -> bool:
+    """Whether two-character codes make one alternating run. Read as 32-bit
+    integers from offsets 0 and 2, they give every card with the one on it."""
+    data = codes.encode('ascii')
+    return (_RUN_STEPS.issuperset(memoryview(data[:len(data) & ~3]).cast('I')) and
+            _RUN_STEPS.issuperset(memoryview(data[2:2 + ((len(data) - 2) & ~3)]).cast('I')))
+
+def _pack_state(state: Dict) -> Tuple[bytes, int, int]:
+    """Undo snapshot as (face-down counts + pile lengths + card indexes, score, moves)."""
+    piles = [*state['tableau'], *state['foundations'], state['stock'], state['waste']]
+    data = bytearray(state['face_down'])
+    data.extend(len(pile) for pile in piles)
+    for pile in piles:
+        data.extend(card.index for card in pile)
+    return bytes(data), state['score'], state['moves']
+
+def _unpack_state(packed: Tuple[bytes, int, int]) -> GameState:
+    data, score, moves = packed
+    piles = []
+    pos = 20 # 7 face-down counts, then lengths of 7 columns, 4 foundations, stock and waste
+    for length in data[7:20]:
+        piles.append(tuple(CARDS[i] for i in data[pos:pos + length]))
+        pos += length
+    return GameState({'tableau': tuple(piles[:7]), 'face_down': tuple(data[:7]), 'foundations': tuple(piles[7:11]),
+                      'stock': piles[11], 'waste': piles[12], 'score': score, 'moves': moves})
+
+# Playable games by --variant name
+VARIANTS = {game.VARIANT: game for game in (SolitaireGame, FreeCellGame, SpiderGame)}
@@ -0,0 +1,161 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+from game_logic import SolitaireGame
+
+# Card sizes as (width, height, gap between columns)
+COMPACT = (3, 2, 1)
+NORMAL = (7, 5, 1)
+LARGE = (9, 7, 2)
+
+# Status line plus the four help lines below the board
+FOOTER_HEIGHT = 6
+
+def min_height(card_height: int) -> int:
+    """Rows needed to show the tallest possible column (13 face-up cards on
+    top of collapsed face-down ones) above the footer."""
+    tableau_y = 1 + card_height + 1
+    return tableau_y + 13 + card_height + 1 + FOOTER_HEIGHT
+
+def min_width(num_columns: int) -> int:
+    return 2 + num_columns * (COMPACT[0] + COMPACT[2])
+
+# Smallest terminal the compact Klondike layout still fits in
+MIN_HEIGHT, MIN_WIDTH = min_height(COMPACT[1]), min_width(7)
+
+class Layout:
+    """Screen geometry for one terminal size.
+
+    Computed once per resize and shared by the renderer and mouse
+    hit-testing, so both agree on where every pile is. Stacked tableau card
+    offsets depend only on the column's length and face-down count and are
+    memoized per layout.
+
+    num_columns and top_row come from the game variant; pile i of the top
+    row sits above tableau column i.
+    """
+    def __init__(self, height: int, width: int, num_columns: int = 7, top_row=SolitaireGame.TOP_ROW):
+        self.height = height
+        self.width = width
+        self.top_row = top_row
+
+        if width >= 2 + num_columns * (LARGE[0] + LARGE[2]) and height >= min_height(LARGE[1]) + 10:
+            self.size = 'large'
+            self.card_width, self.card_height, self.gap = LARGE
+        elif width >= 2 + num_columns * (NORMAL[0] + NORMAL[2]) and height >= min_height(NORMAL[1]):
+            self.size = 'normal'
+            self.card_width, self.card_height, self.gap = NORMAL
+        else:
+            self.size = 'compact'
+            self.card_width, self.card_height, self.gap = COMPACT
+
+        self.margin = 1 if self.size == 'compact' else 2
+        self.pitch = self.card_width + self.gap
+        self.columns = [self.margin + i * self.pitch for i in range(max(num_columns, len(top_row)))]
+
+        self.top_y = 1
+        self.tableau_y = self.top_y + self.card_height + 1
+        # Status line goes no lower than this, help text fills the rest
+        self.info_y = height - FOOTER_HEIGHT
+        # Face-up cards in large layouts show two lines each when there is room
+        self.face_up_step = 2 if self.size == 'large' else 1
+
+        self.origins: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        for i, pile in enumerate(top_row):
+            if pile is not None:
+                self.origins[pile] = (self.top_y, self.columns[i])
+        for i in range(num_columns):
+            self.origins[('tableau', i)] = (self.tableau_y, self.columns[i])
+
+        self._offsets: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+
+    @staticmethod
+    def fits(height: int, width: int, num_columns: int = 7) -> bool:
+        return height >= MIN_HEIGHT and width >= min_width(num_columns)
+
+    def card_offsets(self, num_cards: int, num_face_down: int) -> Tuple[int, ...]:
+        """Row offset of each card in a tableau column, relative to tableau_y.
+
+        Columns that would run into the status line are compressed: first
+        the face-up cards drop to one line each, then the face-down cards
+        collapse onto a single line.
+        """
+        key = (num_cards, num_face_down)
+        offsets = self._offsets.get(key)
+        if offsets is not None:
+            return offsets
+
+        available = self.info_y - 1 - self.tableau_y - self.card_height
+        for face_down_step, face_up_step in ((1, self.face_up_step), (1, 1), (0, 1)):
+            offsets = []
+            y = 0
+            for i in range(num_cards):
+                offsets.append(y)
+                y += face_down_step if i < num_face_down - 1 else face_up_step
+            if not offsets or offsets[-1] <= available:
+                break
+
+        offsets = tuple(offsets)
+        self._offsets[key] = offsets
+        return offsets
+
+    def card_position(self, pile: str, idx: int, card_idx: int = 0,
+                      num_cards: int = 0, num_face_down: int = 0) -> Tuple[int, int]:
+        """Screen cell (y, x) of card number card_idx in a pile.
+
+        For tableau columns num_cards and num_face_down describe the column;
+        card_idx may equal num_cards to address the slot just past the end.
+        """
+        y, x = self.origins[(pile, idx)]
+        if pile != 'tableau' or card_idx == 0:
+            return y, x
+        offsets = self.card_offsets(max(num_cards, card_idx + 1), num_face_down)
+        return y + offsets[card_idx], x
+
+class HitIndex:
+    """Maps a screen cell to the card under it, for mouse input.
+
+    Each screen row keeps the spans of the cards visible on it sorted by x,
+    so a lookup is one dict access plus a bisect. Targets are
+    (row, col, card_idx) in cursor coordinates; card_idx is the index into
+    the pile, or -1 for an empty pile.
+    """
+    def __init__(self, layout: Layout, game):
+        self.rows: Dict[int, Tuple[List[int], List[Tuple[int, Tuple[int, int, int]]]]] = {}
+        spans: Dict[int, List[Tuple[int, int, Tuple[int, int, int]]]] = {}
+
+        def add(top, bottom, x, target):
+            for y in range(top, bottom):
+                spans.setdefault(y, []).append((x, x + layout.card_width, target))
+
+        card_height = layout.card_height
+        for col, origin in enumerate(layout.top_row):
+            if origin is None:
+                continue
+            y, x = layout.origins[origin]
+            add(y, y + card_height, x, (0, col, len(game.pile(*origin)) - 1))
+
+        for col, column in enumerate(game.tableau):
+            y, x = layout.origins[('tableau', col)]
+            if not column:
+                add(y, y + card_height, x, (1, col, -1))
+                continue
+            offsets = layout.card_offsets(len(column), game.face_down[col])
+            # Each card owns the rows until the next card covers it
+            for i, offset in enumerate(offsets):
+                bottom = y + offsets[i + 1] if i + 1 < len(offsets) else y + offset + card_height
+                add(y + offset, bottom, x, (1, col, i))
+
+        for y, row_spans in spans.items():
+            row_spans.sort()
+            self.rows[y] = ([span[0] for span in row_spans], [(span[1], span[2]) for span in row_spans])
+
+    def lookup(self, y: int, x: int) -> Optional[Tuple[int, int, int]]:
+        row = self.rows.get(y)
+        if row is None:
+            return None
+        starts, spans = row
+        i = bisect_right(starts, x) - 1
+        if i < 0:
+            return None
+        end, target = spans[i]
+        return target if x < end else None
@@ -0,0 +1,267 @@
+import codecs
+import gzip
+import heapq
+import itertools
+import json
+import os
+import pickle
+import tarfile
+import tempfile
+import time
+import zipfile
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Bytes read from a score file at a time
+CHUNK = 1 << 16
+# Rows sorted in memory before they are spilled to a run file
+RUN_ROWS = 100000
+# Run files merged at once; more runs are merged in several passes
+FAN_IN = 64
+# Keys read from a run file at a time while merging
+BLOCK = 4096
+
+def _objects(stream: IO[bytes]) -> Iterator:
+    """Streams the values of a JSON array, or of whitespace-separated JSON
+    values (JSON lines), without ever holding the whole file."""
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+
+    def read():
+        data = stream.read(CHUNK)
+        return utf8.decode(data, final=not data)
+
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    in_array = None
+    while True:
+        # Skip separators, reading more as needed
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer):
+                break
+            buffer, pos = read(), 0
+            if not buffer:
+                return
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            pos += in_array
+            continue
+        if in_array and buffer[pos] == ']':
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            more = read()
+            if not more:
+                raise
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        yield value
+        pos = end
+
+def _score_streams(path: str) -> Iterator[IO[bytes]]:
+    """Binary streams of every score file in path: the file itself, or each
+    member of a zip or tar archive. Gzipped files are decompressed."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if not name.endswith('/'):
+                    with archive.open(name) as member:
+                        yield member
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path, 'r|*') as archive: # Streamed, never seeks back
+            for member in archive:
+                if member.isfile():
+                    yield archive.extractfile(member)
+    else:
+        with open(path, 'rb') as f:
+            yield f
+
+def read_scores(path: str, stats: Optional[Dict] = None) -> Iterator[Dict]:
+    """Every score entry in a highscores.json file, a JSON lines file, or a
+    zip/tar archive of them (any of which may be gzipped).
+
+    Entries that aren't score objects are counted in stats['skipped'].
+    """
+    for stream in _score_streams(path):
+        if stream.peek(2)[:2] == b'\x1f\x8b':
+            stream = gzip.GzipFile(fileobj=stream)
+        for value in _objects(stream):
+            try:
+                yield {'score': int(value['score']), 'moves': int(value['moves']),
+                       'date': str(value['date']), 'mode': str(value.get('mode', 'random'))}
+            except (TypeError, KeyError, ValueError):
+                if stats is not None:
+                    stats['skipped'] = stats.get('skipped', 0) + 1
+
+def rank_key(row: Dict) -> tuple:
+    """Sort key for a leaderboard: best first, so higher scores, then fewer
+    moves, then the earlier game. Every field is in it, so duplicates of
+    an entry sort next to each other."""
+    return (row['mode'], -row['score'], row['moves'], row['date'])
+
+def _from_key(key: Sequence) -> Dict:
+    mode, score, moves, date = key
+    return {'score': -score, 'moves': moves, 'date': date, 'mode': mode}
+
+class _Worst:
+    """Heap entry ordered worst first, so the heap top is the one to evict."""
+    __slots__ = ('key',)
+
+    def __init__(self, key: tuple):
+        self.key = key
+
+    def __lt__(self, other: '_Worst') -> bool:
+        return self.key > other.key
+
+class TopScores:
+    """The best `top` distinct entries of each mode, from a stream of any size.
+
+    Each mode keeps a heap of its entries worst first, plus the set of
+    entries in it: a row is dropped as a duplicate if it is already in the
+    heap, pushed if the heap isn't full, and otherwise replaces the worst
+    entry if it beats it. An entry once evicted can never come back, so
+    duplicates of it need no memory. Memory is O(top) per mode.
+    """
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.heaps: Dict[str, List[_Worst]] = {}
+        self.members: Dict[str, set] = {}
+        self.duplicates = 0
+
+    def add(self, row: Dict):
+        self.add_key(rank_key(row))
+
+    def add_key(self, key: tuple):
+        heap = self.heaps.get(key[0])
+        if heap is None:
+            heap = self.heaps[key[0]] = []
+            self.members[key[0]] = set()
+        members = self.members[key[0]]
+        if key in members:
+            self.duplicates += 1
+        elif len(heap) < self.top:
+            heapq.heappush(heap, _Worst(key))
+            members.add(key)
+        elif key < heap[0].key:
+            members.discard(heapq.heapreplace(heap, _Worst(key)).key)
+            members.add(key)
+
+    def scores(self) -> List[Dict]:
+        """All kept entries, highest score first, as ScoreManager stores them."""
+        keys = sorted((entry.key for heap in self.heaps.values() for entry in heap),
+                      key=lambda key: (key[1], key[2], key[3], key[0]))
+        return [_from_key(key) for key in keys]
+
+def _write_run(keys: List[tuple], directory: str) -> str:
+    """Sorts keys and saves them, without duplicates, as pickled blocks.
+    Runs are private temporary files, so pickle is safe and much faster
+    than JSON."""
+    keys.sort()
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        _dump_blocks(f, (key for key, _ in itertools.groupby(keys)))
+    return path
+
+def _dump_blocks(f, keys: Iterator[tuple]):
+    while True:
+        block = list(itertools.islice(keys, BLOCK))
+        if not block:
+            return
+        pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+
+def _read_run(path: str) -> Iterator[tuple]:
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield from pickle.load(f)
+            except EOFError:
+                return
+
+def _merge_runs(paths: List[str], directory: str) -> str:
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(fd, 'wb') as f:
+        _dump_blocks(f, heapq.merge(*map(_read_run, paths)))
+    for run in paths:
+        os.remove(run)
+    return path
+
+def external_sort(rows: Iterable[Dict], directory: str, run_rows: int = RUN_ROWS,
+                  fan_in: int = FAN_IN) -> Iterator[tuple]:
+    """The rank_key of every distinct row, in order, in bounded memory.
+
+    Rows are sorted run_rows at a time and spilled to run files in
+    directory, which are then merged fan_in at a time until one pass can
+    stream the rest. At most run_rows rows, plus one block per open run,
+    are ever in memory.
+    """
+    runs = []
+    keys = []
+    for row in rows:
+        keys.append(rank_key(row))
+        if len(keys) >= run_rows:
+            runs.append(_write_run(keys, directory))
+            keys = []
+    if keys or not runs:
+        runs.append(_write_run(keys, directory))
+    while len(runs) > fan_in:
+        runs = [_merge_runs(runs[i:i + fan_in], directory) for i in range(0, len(runs), fan_in)]
+
+    for key, _ in itertools.groupby(heapq.merge(*map(_read_run, runs))):
+        yield key
+    for run in runs:
+        os.remove(run)
+
+def merge_scores(paths: Sequence[str], top: int = 10, ranked_path: Optional[str] = None,
+                 run_rows: int = RUN_ROWS) -> Dict:
+    """Merges score files and archives into one deduplicated leaderboard.
+
+    Returns stats: rows read, skipped, duplicates, rows_per_sec and the
+    merged 'scores' (the best `top` per mode). Without ranked_path only
+    the leaderboard is kept, so duplicates only counts copies of entries
+    on it. With ranked_path, every distinct entry is also written there
+    as JSON lines, by mode and then rank, sorted externally so inputs may
+    be far larger than memory.
+    """
+    stats = {'rows': 0, 'skipped': 0, 'duplicates': 0}
+    start = time.perf_counter()
+
+    def rows():
+        for path in paths:
+            for row in read_scores(path, stats):
+                stats['rows'] += 1
+                yield row
+
+    best = TopScores(top)
+    if ranked_path is None:
+        for row in rows():
+            best.add(row)
+        stats['duplicates'] = best.duplicates
+    else:
+        # Sorting removes every duplicate, so the heap never sees one
+        quote = json.encoder.encode_basestring
+        directory = os.path.dirname(os.path.abspath(ranked_path))
+        tmp = ranked_path + '.tmp'
+        distinct = 0
+        with tempfile.TemporaryDirectory(dir=directory) as runs, open(tmp, 'w') as f:
+            for key in external_sort(rows(), runs, run_rows):
+                mode, score, moves, date = key
+                f.write(f'{{"score": {-score}, "moves": {moves}, "date": {quote(date)}, "mode": {quote(mode)}}}\n')
+                best.add_key(key)
+                distinct += 1
+        os.replace(tmp, ranked_path)
+        stats['duplicates'] = stats['rows'] - distinct
+
+    elapsed = time.perf_counter() - start
+    stats['elapsed'] = elapsed
+    stats['rows_per_sec'] = stats['rows'] / elapsed if elapsed else 0.0
+    stats['scores'] = best.scores()
+    return stats
+
+def save_leaderboard(path: str, scores: List[Dict]):
+    """Writes scores in the highscores.json format, replacing path atomically."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(scores, f, indent=2)
+    os.replace(tmp, path)
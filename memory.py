@@ -0,0 +1,107 @@
+import resource
+import sys
+import tracemalloc
+from enum import Enum
+from types import FunctionType, ModuleType
+from typing import Dict, List, Tuple
+
+# Size of the undo history above which it gets packed
+SOFT_CAP = 2 * 1024 * 1024
+# Snapshots left unpacked so recent undos stay cheap
+KEEP_RECENT = 20
+
+def deep_size(obj) -> int:
+    """Bytes held by obj and everything it references.
+
+    Shared objects are counted once, and Enum members, modules, classes and
+    functions are skipped since they live for the whole process anyway.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (Enum, ModuleType, type, FunctionType)):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+            # Slots of dict subclasses, e.g. the undo tree links of a GameState
+            stack.extend(getattr(item, name, None) for name in getattr(type(item), '__slots__', ()))
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+    return total
+
+def peak_rss() -> int:
+    """Most memory the process has held, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024 # Bytes on macOS, KiB elsewhere
+
+class MemoryMonitor:
+    """Enforces a soft cap on the undo history and reports memory use.
+
+    check() is meant to be called after every action. It measures the
+    history itself, so allocations elsewhere (such as a background search)
+    never trigger packing, and only once every keep_recent snapshots, so
+    most calls cost nothing. Once the history passes soft_cap, all but
+    the newest snapshots are packed.
+    """
+    def __init__(self, soft_cap: int = SOFT_CAP, keep_recent: int = KEEP_RECENT):
+        self.soft_cap = soft_cap
+        self.keep_recent = keep_recent
+        self.compactions = 0
+        self.history_size = 0 # Bytes, as last measured
+        self._measured_at = 0 # History length then
+
+    def check(self, game) -> bool:
+        count = len(game.history)
+        if count <= self.keep_recent or abs(count - self._measured_at) < self.keep_recent:
+            return False
+        self.history_size = deep_size(game.history)
+        self._measured_at = count
+        if self.history_size <= self.soft_cap or not game.compact_history(self.keep_recent):
+            return False
+        self.history_size = deep_size(game.history)
+        self.compactions += 1
+        return True
+
+    def breakdown(self, game, renderer=None, score_manager=None) -> Dict[str, int]:
+        """Bytes held by each part of the session."""
+        sizes = {
+            'history': deep_size(game.history),
+            'cards': deep_size([game.tableau] + [game.pile(*pile) for pile in game.TOP_ROW if pile]),
+        }
+        if renderer is not None:
+            sizes['renderer caches'] = deep_size([renderer.layout, renderer.hit_index])
+        if score_manager is not None:
+            sizes['scores'] = deep_size(score_manager.scores)
+        return sizes
+
+    def top_sites(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """Source lines holding the most traced memory, if tracemalloc is on
+        (with --trace-memory); tracing slows every allocation, so it is
+        off unless asked for."""
+        if not tracemalloc.is_tracing():
+            return []
+        stats = tracemalloc.take_snapshot().statistics('lineno')
+        return [(f"{stat.traceback[0].filename.rsplit('/', 1)[-1]}:{stat.traceback[0].lineno}", stat.size)
+                for stat in stats[:limit]]
+
+    def report(self, game, renderer=None, score_manager=None) -> List[str]:
+        peak = peak_rss()
+        lines = [f"Process peak: {peak / 1024:,.0f} KiB (history soft cap {self.soft_cap / 1024:,.0f} KiB)", ""]
+        packed = sum(isinstance(state, tuple) for state in game.history)
+        for name, size in self.breakdown(game, renderer, score_manager).items():
+            detail = f"  ({len(game.history)} snapshots, {packed} packed)" if name == 'history' else ""
+            lines.append(f"{name:<16} {size / 1024:>10,.1f} KiB{detail}")
+        lines.append(f"{'compactions':<16} {self.compactions:>10}")
+        lines += ["", "Top allocation sites:"]
+        if not tracemalloc.is_tracing():
+            lines.append("  (run with --trace-memory to see them)")
+        for site, size in self.top_sites():
+            lines.append(f"{site:<28} {size / 1024:>10,.1f} KiB")
+        return lines
@@ -0,0 +1,270 @@
+import os
+import time
+from multiprocessing import Event, Process, Queue, Value, shared_memory
+from queue import Empty
+from typing import Dict, List, Optional, Sequence, Tuple
+from game_logic import SolitaireGame
+from solver import ordered_moves, single_moves
+
+Move = Tuple[str, int, str, int, int]
+
+# Deals the speedup benchmark runs on: quick wins, long searches and deals
+# that run out of nodes single-threaded
+BENCHMARK_SEEDS = (0, 1, 5, 6, 10, 2, 3)
+
+# How many expansions a worker makes between looks at the shared state
+CHECK_EVERY = 64
+
+def fingerprint(game: SolitaireGame) -> int:
+    """64-bit position hash that is the same in every process.
+
+    Cards hash to their index and ints and tuples hash without the
+    per-process salt strings get, so hash(state_key()) can be shared.
+    0 marks an empty slot in the table, so it is never a fingerprint.
+    """
+    return hash(game.state_key()) & 0xFFFFFFFFFFFFFFFF or 1
+
+class SharedTable:
+    """Transposition table of position fingerprints in shared memory.
+
+    Workers insert without locks: each slot is one aligned 8-byte word, so
+    a racing pair of inserts at worst loses one of the positions, and a
+    lost position is only ever explored twice, never pruned wrongly. A
+    few slots are probed from the home slot; when all are taken, the home
+    slot is overwritten and the old position forgotten.
+    """
+    PROBES = 4
+
+    def __init__(self, slots: int = 1 << 20, name: Optional[str] = None):
+        self.slots = slots
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * 8)
+            self.shm.buf[:] = bytes(slots * 8)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.table = self.shm.buf.cast('Q')
+        self.mask = slots - 1
+
+    def __getstate__(self):
+        return (self.slots, self.shm.name)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def add(self, key: int) -> bool:
+        """Records a fingerprint. False if it was already there."""
+        table, mask = self.table, self.mask
+        home = key & mask
+        for probe in range(self.PROBES):
+            slot = (home + probe) & mask
+            held = table[slot]
+            if held == key:
+                return False
+            if not held:
+                table[slot] = key
+                return True
+        table[home] = key
+        return True
+
+    def close(self, unlink: bool = False):
+        self.table.release()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+class _Shared:
+    """Everything the workers of one search share."""
+    def __init__(self, table: SharedTable, node_limit: int, endgame=None):
+        self.table = table
+        self.node_limit = node_limit
+        self.endgame = endgame
+        self.tasks = Queue() # (position, path to it, moves to try there)
+        self.results = Queue() # Exactly one: the winning line, or None
+        self.outstanding = Value('i', 0) # Tasks queued or being searched
+        self.hungry = Value('i', 0) # Workers waiting for a task
+        self.nodes = Value('q', 0)
+        self.steals = Value('i', 0)
+        self.finished = Value('b', 0)
+        self.stop = Event()
+
+    def finish(self, line: Optional[List[Move]]):
+        """Reports the result, unless another worker got there first."""
+        with self.finished.get_lock():
+            if self.finished.value:
+                return
+            self.finished.value = 1
+        self.results.put(line)
+
+    def count(self, expanded: int) -> int:
+        with self.nodes.get_lock():
+            self.nodes.value += expanded
+            return self.nodes.value
+
+def _donate(shared: _Shared, stack, path: List[Move], base: List[Move]):
+    """Hands the untried moves of the shallowest open frame to an idle worker.
+
+    Shallow frames hold the biggest subtrees, so one steal keeps the thief
+    busy for a long time, and the victim carries on with its deeper line.
+    """
+    for depth, (position, moves) in enumerate(stack):
+        rest = list(moves)
+        if rest:
+            stack[depth] = (position, iter(()))
+            with shared.outstanding.get_lock():
+                shared.outstanding.value += 1
+            with shared.steals.get_lock():
+                shared.steals.value += 1
+            shared.tasks.put((position, base + path[:depth], rest))
+            return
+
+def _search(shared: _Shared, root: SolitaireGame, base: List[Move], moves: List[Move]) -> bool:
+    """Depth-first search of one task, as in solver.solve. False once the
+    search as a whole is over (won, out of nodes or stopped)."""
+    stack = [(root, iter(moves))]
+    path: List[Move] = []
+    expanded = 0
+    while stack:
+        position, frame = stack[-1]
+        move = next(frame, None)
+        if move is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+
+        child = position.clone()
+        child.apply_move(move, record_undo=False)
+        if child.check_win():
+            shared.finish(base + path + [move])
+            return False
+        if not shared.table.add(fingerprint(child)):
+            continue
+        if shared.endgame is not None:
+            rest = shared.endgame.line(child) # None for LOST positions too, searched on
+            if rest is not None:
+                shared.finish(base + path + [move] + rest)
+                return False
+
+        expanded += 1
+        if expanded == CHECK_EVERY:
+            expanded = 0
+            if shared.stop.is_set():
+                return False
+            if shared.count(CHECK_EVERY) > shared.node_limit:
+                shared.finish(None)
+                return False
+            if shared.hungry.value:
+                _donate(shared, stack, path, base)
+        path.append(move)
+        stack.append((child, ordered_moves(child)))
+    shared.count(expanded)
+    return True
+
+def _worker(shared: _Shared):
+    # Tasks still queued when the search ends are never needed
+    shared.tasks.cancel_join_thread()
+    while not shared.stop.is_set():
+        with shared.hungry.get_lock():
+            shared.hungry.value += 1
+        task = None
+        while task is None and not shared.stop.is_set():
+            try:
+                task = shared.tasks.get(timeout=0.01)
+            except Empty:
+                pass
+        with shared.hungry.get_lock():
+            shared.hungry.value -= 1
+        if task is None or not _search(shared, *task):
+            return
+        with shared.outstanding.get_lock():
+            shared.outstanding.value -= 1
+            exhausted = not shared.outstanding.value
+        if exhausted:
+            shared.finish(None) # Every reachable position was searched
+
+class ParallelSolver:
+    """Searches one position for a win across worker processes.
+
+    The search tree is split with work stealing: a worker that runs out of
+    work says so, and a busy worker hands over the untried moves at the
+    shallowest level of its search. All workers share one transposition
+    table in shared memory, so positions one worker has searched are
+    skipped by the others. An endgame.EndgameTable ends the search as in
+    solver.solve. After solve(), nodes, steals and elapsed describe the
+    search.
+    """
+    def __init__(self, workers: Optional[int] = None, node_limit: int = 100000,
+                 table_slots: int = 1 << 20, endgame=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.node_limit = node_limit
+        self.table_slots = table_slots
+        self.endgame = endgame
+        self.nodes = self.steals = 0
+        self.elapsed = 0.0
+
+    def solve(self, game: SolitaireGame) -> Optional[List[Move]]:
+        """Like solver.solve: the moves to a win, or None if none was found
+        within node_limit positions. The game is not modified."""
+        start = time.perf_counter()
+        root = game.clone()
+        if root.check_win():
+            return []
+
+        table = SharedTable(self.table_slots)
+        table.add(fingerprint(root))
+        shared = _Shared(table, self.node_limit, self.endgame)
+        shared.outstanding.value = 1
+        shared.tasks.put((root, [], list(ordered_moves(root))))
+        processes = [Process(target=_worker, args=(shared,), daemon=True) for _ in range(self.workers)]
+        for process in processes:
+            process.start()
+        try:
+            while True:
+                try:
+                    line = shared.results.get(timeout=0.1)
+                    break
+                except Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("solver workers exited without a result")
+        finally:
+            shared.stop.set()
+            for process in processes:
+                process.join()
+            table.close(unlink=True)
+        self.nodes = shared.nodes.value
+        self.steals = shared.steals.value
+        self.elapsed = time.perf_counter() - start
+        return line
+
+def benchmark(seeds: Sequence[int] = BENCHMARK_SEEDS, workers: Optional[int] = None,
+              node_limit: int = 100000) -> List[Dict]:
+    """Solves each deal with one worker and with `workers`, for format_benchmark."""
+    rows = []
+    for seed in seeds:
+        row = {'seed': seed}
+        for label, count in (('one', 1), ('many', workers)):
+            solver = ParallelSolver(count, node_limit)
+            line = solver.solve(SolitaireGame(seed))
+            row[label] = {'workers': solver.workers, 'moves': None if line is None else single_moves(line),
+                          'nodes': solver.nodes, 'steals': solver.steals, 'time': solver.elapsed}
+        rows.append(row)
+    return rows
+
+def format_benchmark(rows: List[Dict]) -> str:
+    workers = rows[0]['many']['workers'] if rows else 0
+    lines = [f"{'Seed':>6} {'Result':>8} {'1 worker':>10} {'Nodes':>8}   "
+             f"{'Result':>8} {f'{workers} workers':>10} {'Nodes':>8} {'Steals':>7} {'Speedup':>8}"]
+
+    def result(run):
+        return 'none' if run['moves'] is None else f"won {run['moves']}"
+    for row in rows:
+        one, many = row['one'], row['many']
+        lines.append(f"{row['seed']:>6} {result(one):>8} {one['time']:>9.2f}s {one['nodes']:>8}   "
+                     f"{result(many):>8} {many['time']:>9.2f}s {many['nodes']:>8} {many['steals']:>7} "
+                     f"{one['time'] / many['time']:>7.2f}x")
+    one_total = sum(row['one']['time'] for row in rows)
+    many_total = sum(row['many']['time'] for row in rows)
+    if many_total:
+        lines.append(f"\nTotal {one_total:.1f}s with 1 worker, {many_total:.1f}s with {workers}: "
+                     f"{one_total / many_total:.2f}x speedup")
+    return "\n".join(lines)
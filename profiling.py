@@ -0,0 +1,130 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# Functions summarized after a profiled session, besides the games' move handlers
+TRACKED_FUNCTIONS = ('draw_game', 'draw_card', 'save_state')
+# Modules defining the CardGame variants and the move handlers they share
+GAME_MODULES = ('cards.py', 'game_logic.py', 'freecell.py', 'spider.py')
+MOVE_HANDLERS = ('apply_move', 'draw_from_stock')
+
+def is_tracked(filename: str, name: str) -> bool:
+    if name.startswith('move_') or name in MOVE_HANDLERS:
+        return os.path.basename(filename) in GAME_MODULES
+    return name in TRACKED_FUNCTIONS
+
+def frame_label(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)})"
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval from a background thread.
+
+    Stacks are counted by their sequence of frame labels, outermost first,
+    which is exactly what collapsed-stack flame graph tools expect. The
+    profiled thread is never interrupted; sampling costs it only the GIL
+    hand-offs.
+    """
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def write_collapsed(self, path: str):
+        """One 'outer;...;inner count' line per distinct stack."""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(";".join(frame_label(code) for code in stack) + f" {count}\n")
+
+    def function_totals(self) -> Dict[str, int]:
+        """Inclusive sample counts for the tracked functions."""
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            # Recursive calls count once per sample
+            for name in {code.co_name for code in stack if is_tracked(code.co_filename, code.co_name)}:
+                totals[name] += count
+        return dict(totals)
+
+    def report(self) -> str:
+        lines = [f"{self.samples} samples every {self.interval * 1000:g} ms",
+                 f"{'Function':<28} {'Samples':>8} {'Share':>7} {'Est. time':>10}"]
+        for name, count in sorted(self.function_totals().items(), key=lambda item: -item[1]):
+            share = count / self.samples if self.samples else 0.0
+            lines.append(f"{name:<28} {count:>8} {share * 100:>6.1f}% {count * self.interval:>9.2f}s")
+        return "\n".join(lines)
+
+def cprofile_report(profile: cProfile.Profile) -> str:
+    """Calls and time for the tracked functions, summed over files."""
+    totals = {}
+    for (filename, _, name), (_, calls, tottime, cumtime, _) in pstats.Stats(profile).stats.items():
+        if is_tracked(filename, name):
+            row = totals.setdefault(name, [0, 0.0, 0.0])
+            row[0] += calls
+            row[1] += tottime
+            row[2] += cumtime
+    lines = [f"{'Function':<28} {'Calls':>8} {'Own time':>10} {'Total time':>11}"]
+    for name, (calls, tottime, cumtime) in sorted(totals.items(), key=lambda item: -item[1][2]):
+        lines.append(f"{name:<28} {calls:>8} {tottime:>9.3f}s {cumtime:>10.3f}s")
+    return "\n".join(lines)
+
+def run_profiled(func, *args, cprofile_path: Optional[str] = None,
+                 sample_path: Optional[str] = None, interval: float = 0.005):
+    """Runs func(*args) under cProfile and/or the sampling profiler.
+
+    Results are written when func returns (or raises) and the summaries are
+    printed, so call this outside curses.wrapper's screen.
+    """
+    profile = cProfile.Profile() if cprofile_path else None
+    sampler = SamplingProfiler(interval) if sample_path else None
+    if sampler:
+        sampler.start()
+    start = time.perf_counter()
+    try:
+        if profile:
+            return profile.runcall(func, *args)
+        return func(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        if sampler:
+            sampler.stop()
+            sampler.write_collapsed(sample_path)
+        if profile:
+            profile.dump_stats(cprofile_path)
+        print(f"Profiled {elapsed:.1f}s")
+        if profile:
+            print(f"\ncProfile stats written to {cprofile_path}")
+            print(cprofile_report(profile))
+        if sampler:
+            print(f"\nCollapsed stacks written to {sample_path}")
+            print(sampler.report())
@@ -0,0 +1,207 @@
+import curses
+import fcntl
+import json
+import os
+import pty
+import select
+import struct
+import termios
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from bots import GreedyPlayer
+from game_logic import Card, Rank, SolitaireGame, Suit
+from screen import AnsiScreen, CursesScreen, HeadlessScreen
+from ui import Renderer
+
+# Terminal size frames are drawn at, tall enough for the normal card size
+HEIGHT, WIDTH = 40, 80
+
+# (game, cursor_pos, selection) for one frame
+Frame = Tuple[SolitaireGame, Tuple[int, int], Optional[object]]
+
+def tall_column_game(seed: int = 0) -> SolitaireGame:
+    """A deal whose last column holds the tallest a Klondike column gets:
+    six face-down cards under a whole run from the King down to the Ace."""
+    game = SolitaireGame(seed)
+    suits = (Suit.SPADES, Suit.HEARTS)
+    run = [Card(suits[i % 2], rank) for i, rank in enumerate(reversed(list(Rank)))]
+    rest = [card for column in game.tableau for card in column] + game.stock
+    rest = [card for card in rest if card not in run]
+    game.tableau = [[] for _ in range(7)]
+    for i in range(6):
+        game.tableau[i], rest = rest[:i + 1], rest[i + 1:]
+    game.tableau[6], rest = rest[:6] + run, rest[6:]
+    game.stock = rest
+    game.face_down = list(range(6)) + [6]
+    return game
+
+def typical_frames(seed: int = 0, max_moves: int = 150) -> Iterator[Frame]:
+    """The frames of a game the greedy bot plays, drawn as a player would
+    see them: the cursor walks to each move's source, picks it up, walks
+    to the destination and drops it."""
+    from solitaire import select_pile
+
+    game = SolitaireGame(seed)
+    player = GreedyPlayer(seed)
+    player.new_game(game)
+    cursor = (1, 0)
+    for _ in range(max_moves):
+        move = player.choose_move(game)
+        if move is None:
+            return
+        src = game.cursor_of(move[0], move[1])
+        dst = game.cursor_of(move[2], move[3])
+        yield from _walk(game, cursor, src, None)
+        selection = select_pile(game, *src)
+        yield from _walk(game, src, dst, selection)
+        game.apply_move(move)
+        cursor = dst
+        yield game, cursor, None
+
+def _walk(game: SolitaireGame, start, end, selection) -> Iterator[Frame]:
+    """One frame per cursor step, as with the arrow keys."""
+    row, col = start
+    while (row, col) != end:
+        if col != end[1]:
+            col += 1 if end[1] > col else -1
+        else:
+            row = end[0]
+        yield game, (row, col), selection
+
+def worst_case_frames(rounds: int = 10) -> Iterator[Frame]:
+    """The 19-card column picked up a card deeper each time, and put down
+    again in between, so most frames repaint much of the tallest column."""
+    from solitaire import Selection
+
+    game = tall_column_game()
+    for _ in range(rounds):
+        for depth in range(1, 14):
+            yield game, (1, 6), Selection(1, 6, depth, 13)
+            yield game, (1, 6), None
+
+SCENARIOS = {
+    'typical': typical_frames,
+    'worst': worst_case_frames,
+}
+
+def measure(frames: Iterator[Frame], height: int = HEIGHT, width: int = WIDTH) -> Dict:
+    """Draws each frame headless. Only drawing is timed; comparing with
+    the previous frame, for the cells a terminal would be sent, isn't."""
+    screen = HeadlessScreen(height, width)
+    renderer = Renderer(screen)
+    previous = screen.copy()
+    count = changed = 0
+    elapsed = 0.0
+    for game, cursor, selection in frames:
+        start = time.perf_counter()
+        renderer.draw_game(game, cursor, selection)
+        elapsed += time.perf_counter() - start
+        changed += screen.changed_cells(previous)
+        previous = screen.copy()
+        count += 1
+    return {'frames': count, 'time': elapsed, 'fps': count / elapsed if elapsed else 0.0,
+            'cells_per_frame': changed / count if count else 0.0, 'cells': height * width}
+
+def benchmark(names: Optional[List[str]] = None, height: int = HEIGHT, width: int = WIDTH) -> Dict[str, Dict]:
+    return {name: measure(SCENARIOS[name](), height, width) for name in names or SCENARIOS}
+
+def format_benchmark(results: Dict[str, Dict]) -> str:
+    lines = [f"{'Layout':<10} {'Frames':>7} {'Frames/s':>9} {'Changed cells/frame':>20}"]
+    for name, result in results.items():
+        share = result['cells_per_frame'] / result['cells']
+        lines.append(f"{name:<10} {result['frames']:>7} {result['fps']:>9.0f} "
+                     f"{result['cells_per_frame']:>11.1f} ({share:>5.1%})")
+    return "\n".join(lines)
+
+def _pty_session(stdscr, output: str, name: str, sync: bool, results: int):
+    """Child side of pty_benchmark: draws the frames once the parent says go."""
+    screen = AnsiScreen(stdscr, sync) if output == 'ansi' else CursesScreen(stdscr)
+    renderer = Renderer(screen)
+    frames = list(SCENARIOS[name]())
+    renderer.draw_game(*frames[0]) # The first frame paints the whole board
+    os.write(results, b'ready\n')
+    stdscr.getch()
+    latencies = []
+    for game, cursor, selection in frames:
+        start = time.perf_counter()
+        renderer.draw_game(game, cursor, selection)
+        latencies.append(time.perf_counter() - start)
+    os.write(results, json.dumps(latencies).encode() + b'\n')
+    stdscr.getch() # Quit only once the parent has read every frame
+
+def _drain(fd: int, wait: float = 0.0) -> int:
+    """Reads what is waiting on fd, until nothing comes for `wait` seconds."""
+    count = 0
+    while select.select([fd], [], [], wait)[0]:
+        try:
+            data = os.read(fd, 1 << 16)
+        except OSError:
+            break
+        if not data:
+            break
+        count += len(data)
+    return count
+
+def pty_benchmark(output: str, name: str = 'typical', height: int = HEIGHT, width: int = WIDTH,
+                  sync: bool = True) -> Dict:
+    """Draws a scenario through a real terminal backend ('curses' or 'ansi')
+    on a pseudo-terminal, and counts the bytes that reach the other end.
+
+    Latency is the time to draw and send one frame, as the game sees it;
+    the benchmark reads the pty as fast as it can, so it measures the
+    backend and not a slow link.
+    """
+    results_r, results_w = os.pipe()
+    pid, master = pty.fork()
+    if pid == 0:
+        try:
+            os.close(results_r)
+            fcntl.ioctl(0, termios.TIOCSWINSZ, struct.pack('HHHH', height, width, 0, 0))
+            if os.environ.get('TERM', 'dumb') == 'dumb':
+                os.environ['TERM'] = 'xterm-256color'
+            curses.wrapper(_pty_session, output, name, sync, results_w)
+        finally:
+            os._exit(0)
+    os.close(results_w)
+    received = 0
+    buffer = b''
+    lines = []
+    try:
+        while len(lines) < 2:
+            ready = select.select([master, results_r], [], [], 30)[0]
+            if not ready:
+                raise RuntimeError("render benchmark session stopped responding")
+            if master in ready:
+                received += _drain(master)
+            if results_r in ready:
+                data = os.read(results_r, 1 << 20)
+                if not data:
+                    raise RuntimeError("render benchmark session exited early")
+                *done, buffer = (buffer + data).split(b'\n')
+                for line in done:
+                    lines.append(line)
+                    if len(lines) == 1:
+                        _drain(master, 0.2) # The setup and first frame aren't counted
+                        received = 0
+                        os.write(master, b'g')
+                    else:
+                        received += _drain(master)
+        os.write(master, b'q')
+        _drain(master, 0.2)
+    finally:
+        os.close(results_r)
+        os.close(master)
+        os.waitpid(pid, 0)
+    latencies = sorted(json.loads(lines[1]))
+    count = len(latencies)
+    return {'output': output, 'scenario': name, 'frames': count, 'bytes': received,
+            'bytes_per_frame': received / count, 'latency': sum(latencies) / count,
+            'p95': latencies[int(count * 0.95)]}
+
+def format_pty_benchmark(results: List[Dict]) -> str:
+    lines = [f"{'Layout':<10} {'Output':<7} {'Frames':>7} {'Bytes/frame':>12} {'Latency':>9} {'p95':>9}"]
+    for result in results:
+        lines.append(f"{result['scenario']:<10} {result['output']:<7} {result['frames']:>7} "
+                     f"{result['bytes_per_frame']:>12.0f} {result['latency'] * 1000:>7.2f}ms "
+                     f"{result['p95'] * 1000:>7.2f}ms")
+    return "\n".join(lines)
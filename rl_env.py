@@ -0,0 +1,413 @@
+import os
+import random
+import time
+from multiprocessing import Pipe, Process, shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+from game_logic import SolitaireGame
+
+Move = Tuple[str, int, str, int, int]
+
+# Every kind of Klondike move gets a fixed action number. Moves to a
+# foundation leave the foundation to the game, as legal_moves does, and a
+# tableau move's depth follows from its two columns.
+ACTIONS: Tuple[Tuple[str, int, str, int], ...] = (
+    (('stock', 0, 'waste', 0),) # Draw, or recycle the waste once the stock is empty
+    + (('waste', 0, 'foundation', -1),)
+    + tuple(('waste', 0, 'tableau', col) for col in range(7))
+    + tuple(('tableau', col, 'foundation', -1) for col in range(7))
+    + tuple(('foundation', f_idx, 'tableau', col) for f_idx in range(4) for col in range(7))
+    + tuple(('tableau', src, 'tableau', dst) for src in range(7) for dst in range(7) if src != dst))
+NUM_ACTIONS = len(ACTIONS)
+ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+
+# Observations are OBS_SIZE bytes. Each tableau column takes COLUMN_SLOTS
+# (the tallest a column gets: six face-down cards under a King-to-Ace run),
+# bottom card first: 0 for no card, HIDDEN for a face-down card, else
+# card.index + 1. Then the top card of each foundation and of the waste,
+# coded the same way, and how many cards the waste and stock hold.
+COLUMN_SLOTS = 19
+HIDDEN = 53
+FOUNDATION_OFFSET = 7 * COLUMN_SLOTS
+WASTE_OFFSET = FOUNDATION_OFFSET + 4
+WASTE_SIZE, STOCK_SIZE = WASTE_OFFSET + 1, WASTE_OFFSET + 2
+OBS_SIZE = WASTE_OFFSET + 3
+
+# Steps before an episode is cut short: random play cycles the stock forever
+MAX_STEPS = 1000
+
+# Constant fills, so encoding a position builds no bytes of its own
+_HIDDEN_RUNS = tuple(bytes([HIDDEN]) * n for n in range(COLUMN_SLOTS + 1))
+_EMPTY_RUNS = tuple(bytes(n) for n in range(COLUMN_SLOTS + 1))
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("the RL environment's arrays need numpy (pip install numpy)") from None
+    return numpy
+
+def action_of(move: Move) -> int:
+    """The action number of a move as legal_moves gives it."""
+    src_pile, src_idx, dst_pile, dst_idx, _ = move
+    if dst_pile == 'stock':
+        return 0
+    return ACTION_INDEX[src_pile, src_idx, dst_pile, -1 if dst_pile == 'foundation' else dst_idx]
+
+def legal_actions(game: SolitaireGame) -> Dict[int, Move]:
+    """{action: move} for a position. KlondikeEnv keeps the same in its
+    own lists instead, so a step doesn't build a dict."""
+    return {action_of(move): move for move in game.legal_moves()}
+
+def encode_observation(game: SolitaireGame, out, offset: int = 0):
+    """Writes the position's OBS_SIZE bytes into a buffer at offset."""
+    pos = offset
+    for column, down in zip(game.tableau, game.face_down):
+        out[pos:pos + down] = _HIDDEN_RUNS[down]
+        for i in range(down, len(column)):
+            out[pos + i] = column[i].index + 1
+        out[pos + len(column):pos + COLUMN_SLOTS] = _EMPTY_RUNS[COLUMN_SLOTS - len(column)]
+        pos += COLUMN_SLOTS
+    for foundation in game.foundations:
+        out[pos] = foundation[-1].index + 1 if foundation else 0
+        pos += 1
+    out[pos] = game.waste[-1].index + 1 if game.waste else 0
+    out[pos + 1] = len(game.waste)
+    out[pos + 2] = len(game.stock)
+
+class Buffers:
+    """Observations, action masks, rewards, end flags and actions of
+    num_envs environments, in one block of memory: a bytearray, or shared
+    memory for worker processes. numpy views of it are made once."""
+    def __init__(self, num_envs: int, memory=None):
+        self.num_envs = num_envs
+        self.memory = bytearray(self.size(num_envs)) if memory is None else memory
+        view = memoryview(self.memory)
+        fields = self.layout(num_envs)
+        self.reward = view[slice(*fields['reward'])].cast('f')
+        self.actions = view[slice(*fields['actions'])].cast('i')
+        self.obs = view[slice(*fields['obs'])]
+        self.mask = view[slice(*fields['mask'])]
+        self.terminated = view[slice(*fields['terminated'])]
+        self.truncated = view[slice(*fields['truncated'])]
+        self._arrays = None
+
+    @staticmethod
+    def layout(num_envs: int) -> Dict[str, Tuple[int, int]]:
+        """Byte ranges of each field, four-byte fields first to keep them aligned."""
+        fields = {}
+        start = 0
+        for name, size in (('reward', 4), ('actions', 4), ('obs', OBS_SIZE), ('mask', NUM_ACTIONS),
+                           ('terminated', 1), ('truncated', 1)):
+            fields[name] = (start, start + size * num_envs)
+            start += size * num_envs
+        return fields
+
+    @classmethod
+    def size(cls, num_envs: int) -> int:
+        return max(end for _, end in cls.layout(num_envs).values())
+
+    def arrays(self) -> Dict[str, object]:
+        """numpy views: obs (num_envs, OBS_SIZE) uint8, mask (num_envs,
+        NUM_ACTIONS) bool, reward float32, terminated and truncated bool,
+        actions int32."""
+        if self._arrays is None:
+            np = _numpy()
+            n = self.num_envs
+            self._arrays = {
+                'obs': np.frombuffer(self.obs, np.uint8).reshape(n, OBS_SIZE),
+                'mask': np.frombuffer(self.mask, np.bool_).reshape(n, NUM_ACTIONS),
+                'reward': np.frombuffer(self.reward, np.float32),
+                'terminated': np.frombuffer(self.terminated, np.bool_),
+                'truncated': np.frombuffer(self.truncated, np.bool_),
+                'actions': np.frombuffer(self.actions, np.int32),
+            }
+        return self._arrays
+
+    def release(self):
+        self._arrays = None
+        for view in (self.reward, self.actions, self.obs, self.mask, self.terminated, self.truncated):
+            view.release()
+
+class KlondikeEnv:
+    """A Gym-style environment over SolitaireGame.
+
+    reset(seed) deals a game and returns (observation, info); step(action)
+    plays one of the NUM_ACTIONS actions and returns (observation, reward,
+    terminated, truncated, info). The reward is how many cards went to the
+    foundations. An episode ends on a win or when no move is left, and is
+    truncated after max_steps. info['action_mask'] marks the legal actions;
+    stepping an illegal one raises ValueError.
+
+    The observation and mask are numpy views of preallocated buffers that
+    each step rewrites in place, so copy them to keep one.
+    """
+    def __init__(self, max_steps: int = MAX_STEPS, buffers: Optional[Buffers] = None, slot: int = 0):
+        self.max_steps = max_steps
+        self.buffers = buffers or Buffers(1)
+        self.slot = slot
+        self.game: Optional[SolitaireGame] = None
+        # The legal actions, and the move of each by action number; both
+        # are rewritten in place every step
+        self.legal: List[int] = []
+        self.moves: List[Optional[Move]] = [None] * NUM_ACTIONS
+        self.steps = 0
+        self._observation = self._info = None
+
+    @property
+    def observation(self):
+        if self._observation is None:
+            self._observation = self.buffers.arrays()['obs'][self.slot]
+        return self._observation
+
+    @property
+    def info(self) -> Dict:
+        if self._info is None:
+            self._info = {'action_mask': self.buffers.arrays()['mask'][self.slot]}
+        return self._info
+
+    def reset(self, seed: Optional[int] = None):
+        self.deal(seed)
+        return self.observation, self.info
+
+    def step(self, action: int):
+        reward, terminated, truncated = self.play(int(action))
+        return self.observation, float(reward), terminated, truncated, self.info
+
+    def deal(self, seed: Optional[int] = None):
+        """reset() without numpy: only the buffers are written."""
+        if self.game is None:
+            self.game = SolitaireGame(seed)
+        else:
+            self.game.reset_game(seed)
+        self.steps = 0
+        self._observe()
+
+    def play(self, action: int) -> Tuple[int, bool, bool]:
+        """step() without numpy: writes the buffers, returns (reward, terminated, truncated)."""
+        move = self.moves[action] if 0 <= action < NUM_ACTIONS else None
+        if move is None:
+            raise ValueError(f"action {action} is not legal in this position")
+        game = self.game
+        before = sum(map(len, game.foundations))
+        game.apply_move(move, record_undo=False)
+        self.steps += 1
+        self._observe()
+        reward = sum(map(len, game.foundations)) - before
+        terminated = not self.legal or game.check_win()
+        truncated = not terminated and self.steps >= self.max_steps
+        buffers, slot = self.buffers, self.slot
+        buffers.reward[slot] = reward
+        buffers.terminated[slot] = terminated
+        buffers.truncated[slot] = truncated
+        return reward, terminated, truncated
+
+    def _observe(self):
+        buffers, slot = self.buffers, self.slot
+        encode_observation(self.game, buffers.obs, slot * OBS_SIZE)
+        start = slot * NUM_ACTIONS
+        mask, legal, moves = buffers.mask, self.legal, self.moves
+        for action in legal:
+            mask[start + action] = 0
+            moves[action] = None
+        legal.clear()
+        for move in self.game.legal_moves():
+            action = action_of(move)
+            mask[start + action] = 1
+            moves[action] = move
+            legal.append(action)
+
+class _Group:
+    """The environments of a range of slots, stepped together. Finished
+    ones are dealt a new game at once, from a generator of their own, so
+    the deals don't depend on how slots are split between processes."""
+    def __init__(self, buffers: Buffers, start: int, stop: int, max_steps: int):
+        self.buffers = buffers
+        self.envs = [KlondikeEnv(max_steps, buffers, slot) for slot in range(start, stop)]
+        self.rngs = [random.Random() for _ in self.envs]
+
+    def reset(self, seed: Optional[int]):
+        for env, rng in zip(self.envs, self.rngs):
+            rng.seed(None if seed is None else f'{seed}:{env.slot}')
+            env.deal(None if seed is None else seed + env.slot)
+
+    def step(self, actions: Sequence[int]):
+        for env, rng, action in zip(self.envs, self.rngs, actions):
+            _, terminated, truncated = env.play(action)
+            if terminated or truncated:
+                env.deal(rng.getrandbits(32))
+
+class VectorEnv:
+    """num_envs KlondikeEnvs stepped with one call, in this process.
+
+    reset(seed) deals seed, seed + 1, ... and returns (observations, info);
+    step(actions) returns (observations, rewards, terminated, truncated,
+    info) as arrays with one row per environment. An environment whose
+    episode ended is dealt a new game within the same step: its reward and
+    flags are the old episode's last, its observation and mask the new
+    game's.
+    """
+    def __init__(self, num_envs: int, max_steps: int = MAX_STEPS):
+        self.num_envs = num_envs
+        self.buffers = Buffers(num_envs)
+        self._group = _Group(self.buffers, 0, num_envs, max_steps)
+
+    def reset(self, seed: Optional[int] = None):
+        self._group.reset(seed)
+        arrays = self.buffers.arrays()
+        return arrays['obs'], {'action_mask': arrays['mask']}
+
+    def step(self, actions):
+        self._group.step(actions.tolist() if hasattr(actions, 'tolist') else actions)
+        return _results(self.buffers)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _results(buffers: Buffers):
+    arrays = buffers.arrays()
+    return (arrays['obs'], arrays['reward'], arrays['terminated'], arrays['truncated'],
+            {'action_mask': arrays['mask']})
+
+def _worker(conn, name: str, num_envs: int, start: int, stop: int, max_steps: int):
+    shm = shared_memory.SharedMemory(name=name)
+    buffers = Buffers(num_envs, shm.buf)
+    group = _Group(buffers, start, stop, max_steps)
+    try:
+        while True:
+            command = conn.recv()
+            if command is None:
+                break
+            try:
+                if command == 'step':
+                    group.step(buffers.actions[start:stop].tolist())
+                else:
+                    group.reset(command[1])
+                conn.send(None)
+            except Exception as e:
+                conn.send(e)
+    finally:
+        buffers.release()
+        shm.close()
+
+class SubprocVectorEnv:
+    """VectorEnv with the environments split across worker processes.
+
+    Workers write observations, masks and rewards into shared memory, so
+    a step sends each worker one short message and nothing else crosses
+    between processes but a copy of the block into this process's own
+    arrays. Call close(), or use it as a context manager.
+    """
+    def __init__(self, num_envs: int, workers: Optional[int] = None, max_steps: int = MAX_STEPS):
+        self.num_envs = num_envs
+        self.workers = max(1, min(workers or os.cpu_count() or 1, num_envs))
+        size = Buffers.size(num_envs)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        # The arrays handed out are views of a private copy, so the shared
+        # memory can be closed whatever the caller still holds
+        self.buffers = Buffers(num_envs)
+        self._shared = self.shm.buf[:size]
+        self._private = memoryview(self.buffers.memory)
+        self._actions = slice(*Buffers.layout(num_envs)['actions'])
+        self.conns = []
+        self.processes = []
+        for i in range(self.workers):
+            start, stop = num_envs * i // self.workers, num_envs * (i + 1) // self.workers
+            conn, child = Pipe()
+            process = Process(target=_worker, args=(child, self.shm.name, num_envs, start, stop, max_steps),
+                              daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(conn)
+            self.processes.append(process)
+
+    def _call(self, command):
+        for conn in self.conns:
+            conn.send(command)
+        errors = [conn.recv() for conn in self.conns]
+        self._private[:] = self._shared
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def reset(self, seed: Optional[int] = None):
+        self._call(('reset', seed))
+        arrays = self.buffers.arrays()
+        return arrays['obs'], {'action_mask': arrays['mask']}
+
+    def step(self, actions):
+        self.buffers.arrays()['actions'][:] = actions
+        self._shared[self._actions] = self._private[self._actions]
+        self._call('step')
+        return _results(self.buffers)
+
+    def close(self):
+        if not self.processes:
+            return
+        for conn in self.conns:
+            conn.send(None)
+        for process in self.processes:
+            process.join()
+        for conn in self.conns:
+            conn.close()
+        self.processes = []
+        self._shared.release()
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _random_actions(rng, mask):
+    """A random legal action for each row of mask."""
+    return (rng.random(mask.shape) * mask).argmax(axis=1)
+
+def benchmark(num_envs: int = 64, steps: int = 20000, workers: Optional[int] = None, seed: int = 0) -> List[Dict]:
+    """Environment steps per second with random legal actions: one
+    KlondikeEnv, a VectorEnv and a SubprocVectorEnv of num_envs each
+    taking about `steps` steps. Only step() is timed, not the policy."""
+    np = _numpy()
+    rng = np.random.default_rng(seed)
+    rows = []
+
+    env = KlondikeEnv()
+    _, info = env.reset(seed)
+    elapsed = 0.0
+    for _ in range(steps):
+        action = _random_actions(rng, info['action_mask'][None])[0]
+        start = time.perf_counter()
+        _, _, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            env.reset()
+        elapsed += time.perf_counter() - start
+    rows.append({'env': 'single', 'envs': 1, 'workers': 1, 'steps': steps, 'time': elapsed})
+
+    for label, make in (('vector', lambda: VectorEnv(num_envs)),
+                        ('subprocess', lambda: SubprocVectorEnv(num_envs, workers))):
+        with make() as vector:
+            _, info = vector.reset(seed)
+            calls = max(1, steps // num_envs)
+            elapsed = 0.0
+            for _ in range(calls):
+                actions = _random_actions(rng, info['action_mask'])
+                start = time.perf_counter()
+                _, _, _, _, info = vector.step(actions)
+                elapsed += time.perf_counter() - start
+            rows.append({'env': label, 'envs': num_envs, 'workers': getattr(vector, 'workers', 1),
+                         'steps': calls * num_envs, 'time': elapsed})
+    return rows
+
+def format_benchmark(rows: List[Dict]) -> str:
+    lines = [f"{'Env':<11} {'Envs':>5} {'Workers':>8} {'Steps':>8} {'Steps/s':>9}"]
+    for row in rows:
+        lines.append(f"{row['env']:<11} {row['envs']:>5} {row['workers']:>8} {row['steps']:>8} "
+                     f"{row['steps'] / row['time'] if row['time'] else 0.0:>9.0f}")
+    return "\n".join(lines)
@@ -23,20 +23,29 @@ class ScoreManager:
         except:
             return []
 
-    def save_score(self, score: int, moves: int):
+    def save_score(self, score: int, moves: int, mode: str = "random"):
         entry = {
             "score": score,
             "moves": moves,
-            "date": time.strftime("%Y-%m-%d %H:%M:%S")
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "mode": mode
         }
         self.scores.append(entry)
         # Sort by score descending
         self.scores.sort(key=lambda x: x['score'], reverse=True)
-        # Keep top 10
-        self.scores = self.scores[:10]
+        # Keep top 10 of each mode
+        counts = {}
+        kept = []
+        for entry in self.scores:
+            entry_mode = entry.get("mode", "random")
+            counts[entry_mode] = counts.get(entry_mode, 0) + 1
+            if counts[entry_mode] <= 10:
+                kept.append(entry)
+        self.scores = kept
         
         with open(self.filename, 'w') as f:
             json.dump(self.scores, f, indent=2)
 
-    def get_high_scores(self):
-        return self.scores
+    def get_high_scores(self, mode: str = "random"):
+        # Scores saved before modes existed are random deals
+        return [s for s in self.scores if s.get('mode', 'random') == mode]
@@ -0,0 +1,384 @@
+import curses
+import os
+import re
+import select
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# The color pairs the board is drawn with, as (foreground, background)
+COLOR_PAIRS = {
+    1: (curses.COLOR_RED, curses.COLOR_WHITE),    # Red cards
+    2: (curses.COLOR_BLACK, curses.COLOR_WHITE),  # Black cards
+    3: (curses.COLOR_WHITE, curses.COLOR_BLUE),   # Back of card / Empty slot
+    4: (curses.COLOR_GREEN, curses.COLOR_BLACK),  # Background / Selection
+    5: (curses.COLOR_YELLOW, curses.COLOR_BLACK), # Selected Cursor
+}
+
+# Synchronized output: the terminal shows nothing of a frame until it ends
+BEGIN_SYNC, END_SYNC = '\x1b[?2026h', '\x1b[?2026l'
+# Unchanged cells between two changes on a row are rewritten rather than
+# jumped over when there are at most this many (a jump takes 4-5 bytes)
+MAX_GAP = 3
+
+def init_colors():
+    """Sets up the color pairs the board is drawn with (spectators use the same ones)."""
+    curses.start_color()
+    curses.use_default_colors()
+    for pair, (foreground, background) in COLOR_PAIRS.items():
+        curses.init_pair(pair, foreground, background)
+
+def row_spans(text: str, attrs: List[int]) -> List[Tuple[str, int]]:
+    """A screen row as (text, attr) runs, without trailing blanks."""
+    spans = []
+    start = 0
+    for x in range(1, len(attrs) + 1):
+        if x == len(attrs) or attrs[x] != attrs[start]:
+            spans.append((text[start:x], attrs[start]))
+            start = x
+    if spans and spans[-1][1] == 0:
+        # Rows are cleared before they are drawn
+        text = spans.pop()[0].rstrip(' ')
+        if text:
+            spans.append((text, 0))
+    return spans
+
+class Grid:
+    """A frame as rows of characters and curses attributes.
+
+    The Renderer draws into a Grid and never into a terminal, so frames
+    can be compared, tested and benchmarked without one.
+    """
+    def __init__(self, height: int, width: int):
+        self.resize(height, width)
+
+    def resize(self, height: int, width: int):
+        self.height, self.width = height, width
+        self.erase()
+
+    def getmaxyx(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    def erase(self):
+        self.chars = [[' '] * self.width for _ in range(self.height)]
+        self.attrs = [[0] * self.width for _ in range(self.height)]
+
+    def put(self, y: int, x: int, text: str, attr: int = 0):
+        """Writes text at (y, x), clipped to the grid."""
+        if y < 0 or y >= self.height or x >= self.width:
+            return
+        if x < 0:
+            text, x = text[-x:], 0
+        text = text[:self.width - x]
+        self.chars[y][x:x + len(text)] = text
+        self.attrs[y][x:x + len(text)] = [attr] * len(text)
+
+    def lines(self) -> List[str]:
+        return [''.join(row) for row in self.chars]
+
+    def copy(self) -> 'Grid':
+        other = Grid.__new__(Grid)
+        other.height, other.width = self.height, self.width
+        other.chars = [row[:] for row in self.chars]
+        other.attrs = [row[:] for row in self.attrs]
+        return other
+
+    def paste(self, other: 'Grid', top: int, left: int, bottom: int, right: int):
+        """Copies the rectangle top..bottom, left..right (inclusive) from other."""
+        top, left = max(0, top), max(0, left)
+        bottom, right = min(self.height - 1, bottom), min(self.width - 1, right)
+        for y in range(top, bottom + 1):
+            self.chars[y][left:right + 1] = other.chars[y][left:right + 1]
+            self.attrs[y][left:right + 1] = other.attrs[y][left:right + 1]
+
+    def changed_cells(self, other: 'Grid') -> int:
+        """How many cells differ from another frame of the same size."""
+        changed = 0
+        for chars, attrs, other_chars, other_attrs in zip(self.chars, self.attrs, other.chars, other.attrs):
+            if chars != other_chars or attrs != other_attrs:
+                changed += sum(c != d or a != b for c, d, a, b in zip(chars, other_chars, attrs, other_attrs))
+        return changed
+
+class HeadlessScreen(Grid):
+    """A screen that is only a Grid, for tests and benchmarks.
+
+    Color pairs use the same attribute bits as ncurses, so frames match
+    what CursesScreen would show. There is no keyboard: getch() returns -1.
+    """
+    def __init__(self, height: int, width: int):
+        super().__init__(height, width)
+        self.frames = 0
+
+    def color_pair(self, n: int) -> int:
+        return n << 8
+
+    def sync_size(self):
+        pass # Resized explicitly with resize()
+
+    def clear(self):
+        self.erase()
+
+    def refresh(self):
+        self.frames += 1
+
+    def getch(self) -> int:
+        return -1
+
+    def timeout(self, delay: int):
+        pass
+
+class CursesScreen(Grid):
+    """Shows Grid frames in a curses window.
+
+    refresh() compares each row with the one last shown and rewrites only
+    rows that changed, as runs of one attribute; curses then sends just the
+    changed cells to the terminal.
+    """
+    def __init__(self, window):
+        self.window = window
+        curses.curs_set(0) # Hide cursor
+        curses.mousemask(curses.ALL_MOUSE_EVENTS | curses.REPORT_MOUSE_POSITION)
+        init_colors()
+        super().__init__(*window.getmaxyx())
+
+    def resize(self, height: int, width: int):
+        super().resize(height, width)
+        self.shown: List[Optional[Tuple[list, list]]] = [None] * height
+
+    def color_pair(self, n: int) -> int:
+        return curses.color_pair(n)
+
+    def sync_size(self):
+        """Matches the grid to the window after the terminal was resized."""
+        self.resize(*self.window.getmaxyx())
+
+    def clear(self):
+        """Blanks the frame and repaints every cell on the next refresh."""
+        self.erase()
+        self.window.clear()
+        self.shown = [None] * self.height
+
+    def refresh(self):
+        window = self.window
+        for y in range(self.height):
+            chars, attrs = self.chars[y], self.attrs[y]
+            shown = self.shown[y]
+            if shown is not None and shown[0] == chars and shown[1] == attrs:
+                continue
+            window.move(y, 0)
+            window.clrtoeol()
+            x = 0
+            for text, attr in row_spans(''.join(chars), attrs):
+                try:
+                    window.addstr(y, x, text, attr)
+                except curses.error:
+                    pass # Writing the bottom-right cell moves the cursor off screen
+                x += len(text)
+            self.shown[y] = (chars[:], attrs[:])
+        window.refresh()
+
+    def getch(self) -> int:
+        return self.window.getch()
+
+    def timeout(self, delay: int):
+        self.window.timeout(delay)
+
+# SGR codes of the attributes the board uses, besides colors
+SGR_FLAGS = ((curses.A_BOLD, '1'), (curses.A_DIM, '2'), (curses.A_UNDERLINE, '4'), (curses.A_BLINK, '5'),
+             (curses.A_REVERSE, '7'))
+FLAG_MASK = curses.A_BOLD | curses.A_DIM | curses.A_UNDERLINE | curses.A_BLINK | curses.A_REVERSE
+
+def sgr(attr: int, current: Optional[int] = None) -> str:
+    """The ANSI escape sequence that changes the terminal's attribute from
+    current (None if unknown) to a curses attribute. Only what differs is
+    sent, unless a flag such as bold has to be turned off, which takes a
+    reset."""
+    if current is None or current & FLAG_MASK & ~attr:
+        codes = ['0']
+        current = 0
+    else:
+        codes = []
+    codes += [code for flag, code in SGR_FLAGS if attr & flag and not current & flag]
+    pair = COLOR_PAIRS.get((attr & curses.A_COLOR) >> 8, (None, None))
+    current_pair = COLOR_PAIRS.get((current & curses.A_COLOR) >> 8, (None, None))
+    for color, current_color, base in zip(pair, current_pair, (30, 40)):
+        if color != current_color:
+            codes.append(str(base + 9 if color is None else base + color)) # 39/49: default color
+    return f'\x1b[{";".join(codes)}m' if codes else ''
+
+# What a terminal sends back to probe_sync: the DECRQM and device attributes replies
+PROBE_REPLY = re.compile(r'\[\?[\d;]*(\$y|c)') # After the ESC
+
+def probe_sync(fd_in: int, fd_out: int, timeout: float = 1.0) -> Optional[bool]:
+    """Asks the terminal whether it supports synchronized output.
+
+    Sends a DECRQM query for mode 2026 followed by a primary device
+    attributes request, which every terminal answers: a terminal that
+    doesn't know mode 2026 answers only the second. Returns None if the
+    answer didn't all arrive within timeout, in which case the rest may
+    still come. The terminal must not be in canonical mode, as under curses.
+    """
+    os.write(fd_out, b'\x1b[?2026$p\x1b[c')
+    reply = b''
+    deadline = time.monotonic() + timeout
+    while not re.search(rb'\x1b\[\?[\d;]*c', reply):
+        left = deadline - time.monotonic()
+        if left <= 0 or not select.select([fd_in], [], [], left)[0]:
+            return None
+        reply += os.read(fd_in, 256)
+    mode = re.search(rb'\x1b\[\?2026;(\d)\$y', reply)
+    return bool(mode) and mode.group(1) in b'123' # Set, reset or permanently set
+
+class AnsiGrid(Grid):
+    """A Grid that writes itself to a terminal as ANSI escape sequences.
+
+    Each frame is one buffer and one write: runs of the cells that changed
+    since the last frame, each after a cursor move, with an attribute
+    change only where the attribute does change. With sync the frame is
+    wrapped in synchronized output, so the terminal never shows half of it.
+    """
+    def __init__(self, height: int, width: int, fd: int, sync: bool = False):
+        super().__init__(height, width)
+        self.fd = fd
+        self.sync = sync
+        self._sgr: Dict[Tuple[Optional[int], int], str] = {}
+        self.bytes_written = 0
+        self.writes = 0
+
+    def color_pair(self, n: int) -> int:
+        return n << 8 # As ncurses numbers them, which sgr() reads
+
+    def sync_size(self):
+        pass # Resized explicitly with resize()
+
+    def resize(self, height: int, width: int):
+        super().resize(height, width)
+        self.shown: List[Optional[Tuple[list, list]]] = [None] * height
+        self.full = True
+
+    def clear(self):
+        """Blanks the frame and repaints the whole terminal on the next refresh."""
+        self.erase()
+        self.shown = [None] * self.height
+        self.full = True
+
+    def frame(self) -> str:
+        """Escape sequences that turn the last frame shown into this one."""
+        out = []
+        attr = None # Attribute set in the terminal, if known
+        if self.full:
+            out.append('\x1b[0m\x1b[2J')
+            attr = 0
+        blank = [' '] * self.width, [0] * self.width
+        for y in range(self.height):
+            chars, attrs = self.chars[y], self.attrs[y]
+            shown_chars, shown_attrs = self.shown[y] or blank
+            if chars == shown_chars and attrs == shown_attrs:
+                continue
+            cursor = None # Column the cursor is at on this row
+            for x, (char, shown_char, cell, shown_cell) in enumerate(zip(chars, shown_chars, attrs, shown_attrs)):
+                if char == shown_char and cell == shown_cell:
+                    continue
+                if cursor is None:
+                    out.append(f'\x1b[{y + 1};{x + 1}H')
+                    cursor = x
+                elif x - cursor > MAX_GAP:
+                    out.append(f'\x1b[{x - cursor}C')
+                    cursor = x
+                for i in range(cursor, x + 1):
+                    if attrs[i] != attr:
+                        code = self._sgr.get((attr, attrs[i]))
+                        if code is None:
+                            code = self._sgr[attr, attrs[i]] = sgr(attrs[i], attr)
+                        out.append(code)
+                        attr = attrs[i]
+                    out.append(chars[i])
+                cursor = x + 1
+            self.shown[y] = (chars[:], attrs[:])
+        self.full = False
+        if not out:
+            return ''
+        if attr:
+            out.append('\x1b[0m')
+        if self.sync:
+            return BEGIN_SYNC + ''.join(out) + END_SYNC
+        return ''.join(out)
+
+    def refresh(self):
+        data = self.frame().encode()
+        if not data:
+            return
+        self.writes += 1
+        self.bytes_written += len(data)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):] # Only loops if the terminal falls behind
+
+class AnsiScreen(AnsiGrid):
+    """Shows frames with AnsiGrid's single writes instead of curses, for
+    slow links where curses' many small updates add up.
+
+    curses still reads the keyboard and mouse and tracks the terminal
+    size, but draws nothing after it has cleared the screen at the start.
+    Synchronized output is used if the terminal says it supports it.
+    """
+    def __init__(self, window, sync: Optional[bool] = None):
+        self.window = window
+        curses.curs_set(0) # Hide cursor
+        curses.mousemask(curses.ALL_MOUSE_EVENTS | curses.REPORT_MOUSE_POSITION)
+        window.refresh() # curses clears the screen now, and never writes again
+        fd = sys.stdout.fileno()
+        self.keys: deque = deque() # Read ahead by getch, not yet returned
+        self.delay = -1
+        # A probe that timed out may still be answered, as keys
+        self.reply_pending = False
+        if sync is None:
+            sync = probe_sync(sys.stdin.fileno(), fd)
+            self.reply_pending = sync is None
+        super().__init__(*window.getmaxyx(), fd, bool(sync))
+
+    def sync_size(self):
+        """Matches the grid to the window after the terminal was resized.
+
+        curses clears the terminal after a resize on its next refresh,
+        which getch() would otherwise do after the next frame was written.
+        """
+        self.window.refresh()
+        self.resize(*self.window.getmaxyx())
+
+    def getch(self) -> int:
+        if self.keys:
+            return self.keys.popleft()
+        key = self.window.getch()
+        if key == 27 and self.reply_pending:
+            if self._skip_reply():
+                return self.getch()
+            return self.keys.popleft()
+        return key
+
+    def _skip_reply(self) -> bool:
+        """Reads what follows an ESC, and drops it if it is a late answer to
+        probe_sync; otherwise keeps it for getch() to return."""
+        self.window.timeout(0)
+        keys = []
+        try:
+            while len(keys) < 16:
+                key = self.window.getch()
+                if key == -1:
+                    break
+                keys.append(key)
+                if key in (ord('c'), ord('y')):
+                    break
+        finally:
+            self.window.timeout(self.delay)
+        text = ''.join(chr(key) if key < 256 else '\0' for key in keys)
+        if PROBE_REPLY.fullmatch(text):
+            self.reply_pending = not text.endswith('c') # Device attributes come last
+            return True
+        self.keys.extend([27] + keys)
+        return False
+
+    def timeout(self, delay: int):
+        self.delay = delay
+        self.window.timeout(delay)
@@ -3,7 +3,7 @@ from setuptools import setup
 setup(
     name='terminal-solitaire',
     version='1.0.0',
-    py_modules=['solitaire', 'game_logic', 'ui', 'scores'],
+    py_modules=['solitaire', 'game_logic', 'ui', 'scores', 'animation', 'layout', 'solver', 'deadend', 'bots', 'watch', 'daily', 'telemetry', 'profiling', 'memory', 'cards', 'freecell', 'spider', 'spectate', 'parallel_solver', 'endgame', 'leaderboard', 'screen', 'render_bench', 'rl_env'],
     entry_points={
         'console_scripts': [
             'terminal-solitaire=solitaire:main',
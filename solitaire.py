@@ -1,63 +1,207 @@
 #!/usr/bin/python
+import argparse
 import curses
+import datetime
+import os
+import random
 import sys
 import time
-from game_logic import SolitaireGame
+import tracemalloc
+from collections import deque
+from animation import FrameScheduler, SLIDE_DURATION, slide_position
+from deadend import DeadEndDetector
+from game_logic import VARIANTS, SolitaireGame
+from layout import Layout, MIN_HEIGHT, min_width
+from memory import MemoryMonitor
 from ui import Renderer
 from scores import ScoreManager
+from screen import AnsiScreen, CursesScreen
+from telemetry import EventStream, NullStream, move_type, open_sink
+
+# Delay between cards during auto-complete playback
+AUTO_COMPLETE_DELAY_MS = 60
+# How often to check back while the dead-end search runs in the background
+DETECTOR_POLL_MS = 200
+
+# Keys that try to move cards
+ACTION_KEYS = (ord(' '), curses.KEY_ENTER, 10, 13, curses.KEY_MOUSE)
 
 def try_auto_move(game, row, col):
-    # Waste -> Foundation or Tableau
-    if row == 0 and col == 1:
-        # Try Foundation
-        for f in range(4):
-            if game.move_waste_to_foundation(f):
-                return True
-        # Try Tableau
-        for t in range(7):
-            if game.move_waste_to_tableau(t):
-                return True
-    
-    # Tableau -> Foundation or Tableau
-    elif row == 1:
-        src_col = col
-        # Try Foundation (only top card)
-        for f in range(4):
-            if game.move_tableau_to_foundation(src_col, f):
-                return True
-        
-        # Try Tableau
-        # Try moving stack
-        src_pile = game.tableau[src_col]
-        face_up_count = 0
-        for c in reversed(src_pile):
-            if c.face_up: face_up_count += 1
-            else: break
-        
-        if face_up_count > 0:
-            for t in range(7):
-                if t == src_col: continue
-                # Try moving whole stack
-                if game.move_tableau_to_tableau(src_col, t, face_up_count):
-                    return True
+    """Double-tap: sends the card at (row, col) to a foundation if it can go,
+    otherwise moves it, with its whole run, onto the first tableau pile that
+    takes it."""
+    pile = game.pile_at(row, col)
+    if pile is None or pile[0] in ('stock', 'foundation'):
+        return False
+    moves = game.moves_from(*pile)
+    # Try Foundation (only top card)
+    for move in moves:
+        if move[2] == 'foundation':
+            return game.apply_move(move)
+    # Try Tableau, moving the whole run
+    run = game.run_length(col) if pile[0] == 'tableau' else 1
+    for move in moves:
+        if move[2] == 'tableau' and move[4] == run:
+            return game.apply_move(move)
     return False
 
-def run_game(stdscr):
-    # Minimum required dimensions
-    MIN_H, MIN_W = 40, 60
+class Selection:
+    """A picked-up pile in cursor coordinates.
+
+    num_cards pins how many tableau cards come along; None lets the move
+    pick whichever depth fits the destination. Legal destinations for every
+    depth are worked out once when the pile is picked up, so neither
+    rendering nor changing the depth re-runs the rules.
+    """
+    def __init__(self, row, col, num_cards=None, run_length=1, targets=None):
+        self.row = row
+        self.col = col
+        self.num_cards = num_cards
+        self.run_length = run_length
+        # {(row, col): num_cards} for every legal destination
+        self.targets = targets or {}
+        self.by_depth = {}
+        for pile, depth in self.targets.items():
+            self.by_depth.setdefault(depth, []).append(pile)
+        self.all_targets = list(self.targets)
+
+    @property
+    def depth(self):
+        """Number of cards currently picked up."""
+        return self.run_length if self.num_cards is None else self.num_cards
+
+    def target_piles(self):
+        """Destinations that accept the current depth."""
+        if self.num_cards is None:
+            return self.all_targets
+        return self.by_depth.get(self.num_cards, [])
+
+    def deeper(self) -> bool:
+        if self.row != 1 or self.depth >= self.run_length:
+            return False
+        self.num_cards = self.depth + 1
+        return True
+
+    def shallower(self) -> bool:
+        if self.row != 1 or self.depth <= 1:
+            return False
+        self.num_cards = self.depth - 1
+        return True
+
+    def __str__(self):
+        if self.num_cards is None:
+            return f"({self.row}, {self.col})"
+        return f"({self.row}, {self.col}) x{self.num_cards}"
+
+def legal_targets(game, row, col):
+    """Every pile the cards at (row, col) can legally move to, as {(row, col): num_cards}."""
+    return {game.cursor_of(move[2], move[3]): move[4] for move in game.moves_from(*game.pile_at(row, col))}
+
+def select_pile(game, row, col, card_idx=None):
+    """Picks up the pile under the cursor, or returns None if it is empty.
+
+    card_idx (from a mouse click) picks the substack starting at that card.
+    """
+    pile = game.pile_at(row, col)
+    if pile is None or pile[0] == 'stock' or not game.pile(*pile):
+        return None
+    if row == 0: # Waste, free cell or foundation
+        return Selection(row, col, targets=legal_targets(game, row, col))
+
+    column = game.tableau[col]
+    run_length = game.run_length(col)
+    num_cards = None
+    if card_idx is not None and len(column) - run_length <= card_idx < len(column):
+        num_cards = len(column) - card_idx
+    return Selection(row, col, num_cards, run_length, legal_targets(game, row, col))
+
+def move_selection(game, selection, dst_row, dst_col) -> bool:
+    """Moves the selected cards onto the pile at (dst_row, dst_col)."""
+    num_cards = selection.targets.get((dst_row, dst_col))
+    if num_cards is None:
+        return False
+    if selection.num_cards is not None and num_cards != selection.num_cards:
+        # Only an empty column may take a different part of the run
+        if dst_row != 1 or game.tableau[dst_col]:
+            return False # The pinned depth doesn't fit there
+        num_cards = selection.num_cards
+
+    src = game.pile_at(selection.row, selection.col)
+    return game.apply_move(src + game.pile_at(dst_row, dst_col) + (num_cards,))
+
+def activate(game, row, col, selection, card_idx=None):
+    """Space/Enter or a click on a pile: deal, pick up, or drop the selection.
+
+    Returns the new selection.
+    """
+    # Handle Stock Draw (or a Spider deal)
+    if game.pile_at(row, col) == ('stock', 0):
+        game.draw_from_stock()
+        return None
+
+    if selection is None:
+        return select_pile(game, row, col, card_idx)
+
+    move_selection(game, selection, row, col)
+    return None
+
+def key_name(key):
+    try:
+        return curses.keyname(key).decode(errors='replace')
+    except ValueError:
+        return str(key)
+
+def report_turn(events, game, turn, selection, cursor):
+    """Emits a move event for whatever the last key did to the game.
+
+    A move is rejected when an action key dropped a selection somewhere
+    other than its own pile and nothing moved.
+    """
+    key, moves, last_move, selected = turn
+    if game.moves > moves and game.last_move is not last_move:
+        events.emit('move', type=move_type(game.last_move), move=list(game.last_move),
+                    count=game.moves - moves, ok=True)
+    elif selected is not None and selection is None and key in ACTION_KEYS and game.moves == moves \
+            and cursor != (selected.row, selected.col):
+        events.emit('move', ok=False, source=[selected.row, selected.col], target=list(cursor))
 
+def animate_last_move(stdscr, renderer, scheduler, game, cursor_pos, selection):
+    """Slides the cards of the last move into place. Any key skips to the end."""
+    animation = renderer.begin_animation(game, cursor_pos, selection)
+    if animation is None:
+        return
+    cards, start, end = animation
+
+    stdscr.nodelay(True)
+    try:
+        for progress in scheduler.frames(SLIDE_DURATION):
+            key = stdscr.getch()
+            if key != -1:
+                # Leave the key for the main loop to handle
+                curses.ungetch(key)
+                break
+            y, x = slide_position(start, end, progress)
+            renderer.draw_animation_frame(cards, y, x)
+    finally:
+        stdscr.nodelay(False)
+
+def wait_for_min_size(stdscr, num_columns=7):
+    """Blocks until the terminal is big enough for the compact layout."""
     while True:
         h, w = stdscr.getmaxyx()
-        if h >= MIN_H and w >= MIN_W:
-            break
+        if Layout.fits(h, w, num_columns):
+            return
 
         stdscr.clear()
         msg1 = f"Terminal is too small ({w}x{h})."
-        msg2 = f"Please resize to at least {MIN_W}x{MIN_H}."
+        msg2 = f"Please resize to at least {min_width(num_columns)}x{MIN_HEIGHT}."
 
         # Center the text
-        stdscr.addstr(h // 2 - 1, max(0, (w - len(msg1)) // 2), msg1)
-        stdscr.addstr(h // 2, max(0, (w - len(msg2)) // 2), msg2)
+        try:
+            stdscr.addstr(h // 2 - 1, max(0, (w - len(msg1)) // 2), msg1[:w])
+            stdscr.addstr(h // 2, max(0, (w - len(msg2)) // 2), msg2[:w])
+        except curses.error:
+            pass # Too small even for the message
         stdscr.refresh()
 
         # Wait for resize event or any key
@@ -65,121 +209,212 @@ def run_game(stdscr):
         if key == curses.KEY_RESIZE:
             curses.update_lines_cols() # Ensure curses knows about the new size
 
-    game = SolitaireGame()
-    renderer = Renderer(stdscr)
+def step_cursor(game, row, col, step):
+    """The next column left (step -1) or right (step 1) of col on a cursor
+    row, skipping gaps in the top row, or col itself at the edge."""
+    width = game.NUM_COLUMNS if row == 1 else len(game.TOP_ROW)
+    new_col = col + step
+    while 0 <= new_col < width:
+        if game.pile_at(row, new_col) is not None:
+            return new_col
+        new_col += step
+    return col
+
+def run_game(stdscr, seed=None, mode='random', events=None, variant=SolitaireGame, broadcaster=None,
+             output='curses'):
+    """Interactive game loop. With a seed every re-deal replays the same deal,
+    and high scores are kept under the given mode (e.g. 'daily'). variant is
+    the game class to play. Actions are reported to events, an EventStream,
+    and frames to spectators through broadcaster, if given. output 'ansi'
+    draws with AnsiScreen instead of curses."""
+    events = events or NullStream()
+    wait_for_min_size(stdscr, variant.NUM_COLUMNS)
+
+    game = variant(seed)
+    recorder = None
+    if broadcaster:
+        from spectate import FrameRecorder
+        recorder = FrameRecorder(broadcaster)
+    screen = AnsiScreen(stdscr) if output == 'ansi' else CursesScreen(stdscr)
+    renderer = Renderer(screen, variant, recorder)
     score_manager = ScoreManager()
     
     # Cursor position: (row, col)
-    # Row 0: Top area (Stock=0, Waste=1, F1=3, F2=4, F3=5, F4=6)
-    # Row 1: Tableau (0-6)
+    # Row 0: Top area (game.TOP_ROW, e.g. Klondike's Stock=0, Waste=1, F1=3 .. F4=6)
+    # Row 1: Tableau (0 .. NUM_COLUMNS - 1)
     cursor_row = 1
     cursor_col = 0
     
-    selection = None # (row, col)
+    selection = None # Selection
     last_action_time = 0
+    drag_start = None # (row, col, card_idx) under a held mouse button
+
+    # Auto-complete moves still waiting to be played back
+    pending_moves = deque()
+
+    scheduler = FrameScheduler()
+    moves_seen = game.moves
+    detector = DeadEndDetector()
+    monitor = MemoryMonitor()
+    events.emit('start', seed=game.seed, mode=mode, variant=game.VARIANT)
+    turn = None # (key, moves, last move, selection) when the last key was read
+    notice = None # Shown until the next key, e.g. which undo line is being played
     
     while True:
-        renderer.draw_game(game, (cursor_row, cursor_col), selection)
-        
-        key = stdscr.getch()
+        if turn is not None:
+            report_turn(events, game, turn, selection, (cursor_row, cursor_col))
+            turn = None
+
+        # Animate single moves; batches (auto-stack), undo and re-deal just jump
+        if game.moves == moves_seen + 1:
+            animate_last_move(stdscr, renderer, scheduler, game, (cursor_row, cursor_col), selection)
+        moves_seen = game.moves
+
+        # Cheap unless the stock was just recycled
+        detector.observe(game)
+        if monitor.check(game):
+            events.emit('compact', snapshots=len(game.history))
+
+        renderer.draw_game(game, (cursor_row, cursor_col), selection, message=notice or detector.warning)
+        events.emit('frame')
+
+        # Only poll while an auto-complete plays back or a dead-end search is running
+        if pending_moves:
+            screen.timeout(AUTO_COMPLETE_DELAY_MS)
+        elif detector.busy:
+            screen.timeout(DETECTOR_POLL_MS)
+        else:
+            screen.timeout(-1)
+        key = screen.getch()
+        if key != -1:
+            events.emit('key', key=key_name(key))
+            turn = (key, game.moves, game.last_move, selection)
+            notice = None
+
+        if pending_moves:
+            if key == -1:
+                # Timed out: play the next card and keep animating
+                game.apply_foundation_move(pending_moves.popleft())
+                if pending_moves:
+                    continue
+            else:
+                # Any key skips straight to the end of the playback
+                while pending_moves:
+                    game.apply_foundation_move(pending_moves.popleft())
         
         # Handle Terminal Resize Event
         if key == curses.KEY_RESIZE:
-            stdscr.clear()
+            wait_for_min_size(stdscr, variant.NUM_COLUMNS)
+            renderer.resize()
+            renderer.erase(clear=True)
             continue
 
         if key == ord('q'):
+            events.emit('quit')
             break
 
         # --- High Scores ---
         elif key == ord('h') or key == ord('H'):
-            renderer.draw_high_scores(score_manager.get_high_scores())
+            title = "HIGH SCORES" if mode == 'random' else f"{mode.upper()} HIGH SCORES"
+            renderer.draw_high_scores(score_manager.get_high_scores(mode), title)
             # Clear screen upon return to ensure clean redraw of the game
-            stdscr.clear()
+            renderer.erase(clear=True)
         # -------------------
 
+        elif key == ord('m') or key == ord('M'):
+            renderer.draw_report("MEMORY", monitor.report(game, renderer, score_manager))
+            renderer.erase(clear=True)
+
         # --- Undo Handling ---
         elif key == ord('u') or key == ord('U'):
-            if game.undo():
+            undone = game.undo()
+            events.emit('undo', ok=undone)
+            if undone:
                 selection = None # Reset selection to prevent state mismatches
+                detector.reset()
+
+        elif key == ord('y') or key == ord('Y'):
+            redone = game.redo()
+            events.emit('redo', ok=redone)
+            if redone:
+                selection = None
+                detector.reset()
+
+        elif key == ord('b') or key == ord('B'): # Next line of the undo tree
+            switched = game.switch_branch()
+            events.emit('branch', ok=switched is not None)
+            if switched:
+                selection = None
+                detector.reset()
+                notice = f"Line {switched[0]} of {switched[1]}"
+            else:
+                notice = "No other line to switch to"
         # ---------------------
         
+        elif key == curses.KEY_UP and selection and cursor_row == 1 and cursor_col == selection.col \
+                and selection.deeper():
+            pass # Picked up one more card of the run
+
+        elif key == curses.KEY_DOWN and selection and cursor_row == 1 and cursor_col == selection.col \
+                and selection.shallower():
+            pass # Put back the deepest picked-up card
+
         elif key == curses.KEY_UP:
             if cursor_row == 1:
                 cursor_row = 0
-                # Map tableau col to top row roughly
-                if cursor_col <= 1: cursor_col = cursor_col # 0,1 -> 0,1
-                elif cursor_col == 2: cursor_col = 1 # Gap -> Waste
-                elif cursor_col >= 3: cursor_col = cursor_col # 3-6 -> 3-6
+                # Top piles sit above the tableau column with the same index
+                if game.pile_at(0, cursor_col) is None: # Gap -> pile to its left
+                    cursor_col = step_cursor(game, 0, cursor_col, -1)
         
         elif key == curses.KEY_DOWN:
             if cursor_row == 0:
                 cursor_row = 1
-                # Map top row to tableau
-                if cursor_col == 2: cursor_col = 2 # Gap -> T3
-                # 0,1 -> 0,1; 3-6 -> 3-6. Matches well.
         
         elif key == curses.KEY_LEFT:
-            if cursor_col > 0:
-                cursor_col -= 1
-                if cursor_row == 0 and cursor_col == 2: # Skip gap at 2 in top row
-                    cursor_col = 1
+            cursor_col = step_cursor(game, cursor_row, cursor_col, -1)
         
         elif key == curses.KEY_RIGHT:
-            max_col = 6
-            if cursor_col < max_col:
-                cursor_col += 1
-                if cursor_row == 0 and cursor_col == 2: # Skip gap at 2 in top row
-                    cursor_col = 3
+            cursor_col = step_cursor(game, cursor_row, cursor_col, 1)
 
         elif key == curses.KEY_MOUSE:
             try:
                 _, mx, my, _, bstate = curses.getmouse()
-                
-                # Map coordinates to cursor_row, cursor_col
-                new_row, new_col = -1, -1
-                
-                # Top Row (Stock, Waste, Foundations)
-                if my >= 1 and my <= 5: # Card height is 5
-                    if 2 <= mx < 9: # Stock
-                        new_row, new_col = 0, 0
-                    elif 10 <= mx < 17: # Waste
-                        new_row, new_col = 0, 1
-                    elif mx >= 26: # Foundations
-                        # 26 + i*8
-                        f_idx = (mx - 26) // 8
-                        if 0 <= f_idx < 4:
-                            # Check if within card width
-                            offset = (mx - 26) % 8
-                            if offset < 7:
-                                new_row, new_col = 0, 3 + f_idx
-                
-                # Tableau
-                elif my >= 7:
-                    # 2 + i*8
-                    if mx >= 2:
-                        t_idx = (mx - 2) // 8
-                        if 0 <= t_idx < 7:
-                            offset = (mx - 2) % 8
-                            if offset < 7:
-                                new_row, new_col = 1, t_idx
-                
-                if new_row != -1 and new_col != -1:
-                    cursor_row, cursor_col = new_row, new_col
-                    
-                    # Handle Double Click
-                    if bstate & curses.BUTTON1_DOUBLE_CLICKED:
-                        if try_auto_move(game, cursor_row, cursor_col):
-                            selection = None
-                        elif cursor_row == 0 and cursor_col == 0:
-                            # Double click on Stock -> Deal
-                            game.draw_from_stock()
-                            selection = None
-                    else:
-                        # Single Click -> Trigger action (simulate Space)
-                        key = ord(' ')
             except curses.error:
-                pass
+                bstate = 0
+
+            # Map the screen cell to (row, col, card index) in one lookup
+            hit = renderer.hit_test(my, mx) if bstate else None
+
+            if bstate & curses.BUTTON1_PRESSED:
+                # Start of a drag: remember what was grabbed until release
+                drag_start = hit
+                if hit:
+                    cursor_row, cursor_col = hit[0], hit[1]
+
+            elif bstate & curses.BUTTON1_RELEASED:
+                if drag_start and hit and hit[:2] != drag_start[:2]:
+                    # Dropped on another pile: pick up at the press, drop here
+                    grabbed = select_pile(game, *drag_start)
+                    if grabbed:
+                        move_selection(game, grabbed, hit[0], hit[1])
+                    selection = None
+                    cursor_row, cursor_col = hit[0], hit[1]
+                elif drag_start:
+                    # Released where it started: same as a click
+                    cursor_row, cursor_col = drag_start[0], drag_start[1]
+                    selection = activate(game, cursor_row, cursor_col, selection, drag_start[2])
+                drag_start = None
+
+            elif hit and bstate & (curses.BUTTON1_CLICKED | curses.BUTTON1_DOUBLE_CLICKED):
+                cursor_row, cursor_col = hit[0], hit[1]
+
+                # Handle Double Click (the first click already dealt from the Stock)
+                if bstate & curses.BUTTON1_DOUBLE_CLICKED:
+                    if try_auto_move(game, cursor_row, cursor_col):
+                        selection = None
+                else:
+                    # Single Click -> same as Space, picking the clicked card's substack
+                    selection = activate(game, cursor_row, cursor_col, selection, hit[2])
 
         elif key == ord(' ') or key == curses.KEY_ENTER or key == 10 or key == 13: # Action
             current_time = time.time()
@@ -192,79 +427,22 @@ def run_game(stdscr):
                     last_action_time = 0 # Reset to prevent triple-tap issues
                     continue
 
-            # Handle Stock Draw
-            if cursor_row == 0 and cursor_col == 0:
-                game.draw_from_stock()
-                selection = None
-                continue
-            
-            if selection is None:
-                # Select current
-                # Check if valid selection
-                valid = False
-                if cursor_row == 0:
-                    if cursor_col == 1: # Waste
-                        if game.waste: valid = True
-                    elif cursor_col >= 3: # Foundation
-                        f_idx = cursor_col - 3
-                        if game.foundations[f_idx]: valid = True
-                else: # Tableau
-                    if game.tableau[cursor_col]: valid = True
-                
-                if valid:
-                    selection = (cursor_row, cursor_col)
-            else:
-                # Try move
-                src_row, src_col = selection
-                dst_row, dst_col = cursor_row, cursor_col
-                
-                success = False
-                
-                # Source: Waste
-                if src_row == 0 and src_col == 1:
-                    if dst_row == 1: # To Tableau
-                        success = game.move_waste_to_tableau(dst_col)
-                    elif dst_row == 0 and dst_col >= 3: # To Foundation
-                        success = game.move_waste_to_foundation(dst_col - 3)
-                
-                # Source: Foundation
-                elif src_row == 0 and src_col >= 3:
-                    f_idx = src_col - 3
-                    if dst_row == 1: # To Tableau
-                        success = game.move_foundation_to_tableau(f_idx, dst_col)
-                
-                # Source: Tableau
-                elif src_row == 1:
-                    if dst_row == 1: # To Tableau
-                        src_pile = game.tableau[src_col]
-                        # Find how many cards are face up
-                        face_up_count = 0
-                        for c in reversed(src_pile):
-                            if c.face_up: face_up_count += 1
-                            else: break
-                        
-                        # Try to move the whole face-up stack
-                        if game.move_tableau_to_tableau(src_col, dst_col, face_up_count):
-                            success = True
-                        else:
-                            # Try moving 1 card
-                            if face_up_count > 1:
-                                if game.move_tableau_to_tableau(src_col, dst_col, 1):
-                                    success = True
-                    
-                    elif dst_row == 0 and dst_col >= 3: # To Foundation
-                        success = game.move_tableau_to_foundation(src_col, dst_col - 3)
-
-                if success:
-                    selection = None
-                else:
-                    selection = None
+            selection = activate(game, cursor_row, cursor_col, selection)
 
         elif key == ord('s') or key == ord('S'): # Auto-stack
-            game.auto_move_to_foundation()
+            plan = game.plan_auto_complete()
+            if plan:
+                # Trivially won: one undo entry for the whole finish, played back card by card
+                game.save_state()
+                pending_moves.extend(plan)
+            else:
+                game.auto_move_to_foundation()
+            selection = None
 
         elif key == ord('r') or key == ord('R'): # Re-deal
-            game.reset_game()
+            game.reset_game(seed)
+            events.emit('redeal', seed=game.seed)
+            detector.reset()
             selection = None
             last_action_time = 0
             # Reset cursor to starting position (optional, but good for UX)
@@ -272,23 +450,281 @@ def run_game(stdscr):
             cursor_col = 0
 
         if game.check_win():
+            if turn is not None:
+                report_turn(events, game, turn, selection, (cursor_row, cursor_col))
             # Draw one last time
             renderer.draw_game(game, (cursor_row, cursor_col), selection)
             
             # Save Score
-            score_manager.save_score(game.score, game.moves)
+            score_manager.save_score(game.score, game.moves, mode)
+            events.emit('win', score=game.score, moves=game.moves)
             
-            # Show win message
-            stdscr.addstr(10, 30, "YOU WIN!", curses.A_BOLD | curses.color_pair(1))
-            stdscr.addstr(11, 25, f"Score: {game.score}  Moves: {game.moves}", curses.A_BOLD)
-            stdscr.addstr(12, 25, "Press Q to Quit", curses.A_BOLD)
-            stdscr.refresh()
+            renderer.draw_win(game)
             while True:
                 if stdscr.getch() == ord('q'):
                     return
 
+def tournament(args):
+    from bots import BOTS, format_report, run_tournament
+
+    bot_names = args.bots.split(',') if args.bots else list(BOTS)
+    unknown = [name for name in bot_names if name not in BOTS]
+    if unknown:
+        sys.exit(f"Unknown bot(s): {', '.join(unknown)}. Choose from: {', '.join(BOTS)}")
+
+    seeds = list(range(args.seed, args.seed + args.games))
+    start = time.perf_counter()
+    stats = run_tournament(bot_names, seeds, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(format_report(stats))
+    print(f"\n{len(bot_names) * len(seeds)} games in {elapsed:.1f}s")
+
+def solve(args):
+    from endgame import open_default
+    from parallel_solver import ParallelSolver, benchmark, format_benchmark
+    from solver import single_moves
+
+    if args.benchmark:
+        print(format_benchmark(benchmark(workers=args.workers, node_limit=args.nodes)))
+        return
+    if args.position:
+        try:
+            game = SolitaireGame.from_notation(args.position)
+        except ValueError as e:
+            sys.exit(str(e))
+    else:
+        game = SolitaireGame(args.seed)
+    solver = ParallelSolver(args.workers, args.nodes, endgame=open_default())
+    line = solver.solve(game)
+    if line is None:
+        print(f"No win found in {solver.nodes} positions", end='')
+    else:
+        print(f"Won in {single_moves(line)} moves after {solver.nodes} positions", end='')
+    print(f" ({solver.elapsed:.1f}s, {solver.workers} workers, {solver.steals} steals)")
+    for move in line or ():
+        print(' '.join(map(str, move)))
+
+def endgame(args):
+    from endgame import EndgameTable, build, default_path
+
+    path = args.file or default_path()
+    if args.build:
+        def report(seed, positions):
+            print(f"seed {seed}: {positions} positions")
+        seeds = range(args.seed, args.seed + args.games)
+        count = build(path, seeds, args.max_cards, progress=report)
+        print(f"{count} positions written to {path}")
+        return
+    if not args.position:
+        sys.exit("Give --build or --position NOTATION")
+    try:
+        table = EndgameTable(path)
+        distance = table.distance(SolitaireGame.from_notation(args.position))
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+    if distance is None:
+        print("Not in the endgame table")
+    elif distance < 0:
+        print("Can't be won without taking cards back off the foundations")
+    else:
+        print(f"Won in {distance} moves")
+
+def merge(args):
+    from leaderboard import merge_scores, save_leaderboard
+
+    output = args.output or ScoreManager().filename
+    paths = list(args.files)
+    if not args.output and os.path.exists(output) and output not in paths:
+        paths.insert(0, output) # Importing keeps your own scores too
+    try:
+        stats = merge_scores(paths, args.top, args.ranked)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Can't merge scores: {e}")
+    save_leaderboard(output, stats['scores'])
+    print(f"{stats['rows']} rows from {len(paths)} file(s) in {stats['elapsed']:.1f}s "
+          f"({stats['rows_per_sec']:.0f} rows/s), {stats['skipped']} unreadable")
+    print(f"{len(stats['scores'])} high scores written to {output}")
+    if args.ranked:
+        print(f"{stats['rows'] - stats['duplicates']} distinct scores ranked in {args.ranked}")
+
+def render_benchmark(args):
+    from render_bench import SCENARIOS, benchmark, format_benchmark, format_pty_benchmark, pty_benchmark
+
+    if args.pty:
+        results = [pty_benchmark(output, name, args.height, args.width, not args.no_sync)
+                   for name in ([args.layout] if args.layout else SCENARIOS) for output in ('curses', 'ansi')]
+        print(format_pty_benchmark(results))
+        return
+    print(format_benchmark(benchmark(args.layout and [args.layout], args.height, args.width)))
+
+def rl_benchmark(args):
+    from rl_env import benchmark, format_benchmark
+
+    try:
+        rows = benchmark(args.envs, args.steps, args.workers)
+    except ImportError as e:
+        sys.exit(str(e))
+    print(format_benchmark(rows))
+
+def watch(args):
+    from bots import BOTS
+    from watch import watch_game
+
+    if args.bot not in BOTS:
+        sys.exit(f"Unknown bot: {args.bot}. Choose from: {', '.join(BOTS)}")
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+    curses.wrapper(watch_game, args.bot, args.speed, seed, args.fps)
+
+def daily(args, events=None, broadcaster=None):
+    from daily import DailyDeals
+
+    deals = DailyDeals()
+    if args.precompute:
+        def report(day, seed):
+            print(f"{day.isoformat()}: seed {seed}")
+        added = deals.precompute(args.days, progress=report)
+        print(f"{added} new daily deal(s) cached in {deals.filename}")
+        return
+
+    if datetime.date.today().isoformat() not in deals.seeds:
+        print("Finding today's deal...")
+    seed = deals.seed_for()
+    # Fill in the coming days while this one is played
+    deals.precompute_in_background(args.days)
+    curses.wrapper(run_game, seed, 'daily', events, SolitaireGame, broadcaster, args.backend)
+
+def play(args, events=None):
+    variant = VARIANTS[args.variant]
+    if args.command == 'daily' and variant is not SolitaireGame:
+        sys.exit("Daily deals are Klondike only.")
+    broadcaster = None
+    if args.broadcast:
+        from spectate import Broadcaster
+        broadcaster = Broadcaster(args.broadcast)
+    try:
+        if args.command == 'daily':
+            daily(args, events, broadcaster)
+        else:
+            # Each variant keeps its own high scores
+            mode = 'random' if variant is SolitaireGame else args.variant
+            curses.wrapper(run_game, None, mode, events, variant, broadcaster, args.backend)
+    finally:
+        if broadcaster:
+            broadcaster.close()
+
+def spectate(args):
+    from spectate import spectate as spectate_game
+
+    curses.wrapper(spectate_game, args.socket)
+
 def main():
-    curses.wrapper(run_game)
+    parser = argparse.ArgumentParser(prog='terminal-solitaire')
+    parser.add_argument('--variant', choices=list(VARIANTS), default='klondike', help='game to play')
+    parser.add_argument('--events', metavar='SINK',
+                        help="write game events to a JSONL file, or to a Unix socket with 'unix:PATH'")
+    parser.add_argument('--broadcast', metavar='SOCKET',
+                        help="let others watch the game with 'terminal-solitaire spectate SOCKET'")
+    parser.add_argument('--output', dest='backend', choices=['curses', 'ansi'], default='curses',
+                        help='draw with curses, or with one ANSI write per frame (faster over slow links)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="trace allocations for the memory report's top sites (slows the game)")
+    parser.add_argument('--cprofile', metavar='FILE', help='profile the session with cProfile and save the stats')
+    parser.add_argument('--sample', metavar='FILE', help='sample the stack and save collapsed stacks for flame graphs')
+    parser.add_argument('--sample-interval', type=float, default=5, metavar='MS', help='sampling interval')
+    commands = parser.add_subparsers(dest='command')
+
+    tournament_parser = commands.add_parser('tournament', help='benchmark the built-in bots on the same seeded deals')
+    tournament_parser.add_argument('--bots', help='comma-separated bot names (default: all)')
+    tournament_parser.add_argument('--games', type=int, default=100, help='deals per bot')
+    tournament_parser.add_argument('--seed', type=int, default=0, help='first deal seed')
+    tournament_parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+
+    solve_parser = commands.add_parser('solve', help='search one deal for a win across worker processes')
+    solve_parser.add_argument('--seed', type=int, default=0, help='deal seed')
+    solve_parser.add_argument('--position', metavar='NOTATION', help='solve this position instead of a fresh deal')
+    solve_parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    solve_parser.add_argument('--nodes', type=int, default=100000, help='positions to search before giving up')
+    solve_parser.add_argument('--benchmark', action='store_true',
+                              help='compare one worker with --workers on a fixed set of deals')
+
+    endgame_parser = commands.add_parser('endgame', help='build or query the endgame table')
+    endgame_parser.add_argument('--build', action='store_true', help='generate the table from solved deals')
+    endgame_parser.add_argument('--games', type=int, default=200, help='deals to solve when building')
+    endgame_parser.add_argument('--seed', type=int, default=0, help='first deal seed')
+    endgame_parser.add_argument('--max-cards', type=int, default=16,
+                                help='most cards left outside the foundations in a stored position')
+    endgame_parser.add_argument('--position', metavar='NOTATION', help='look up how far this position is from a win')
+    endgame_parser.add_argument('--file', help='table file (default: endgame.db next to the high scores)')
+
+    merge_parser = commands.add_parser('merge', aliases=['import'],
+                                       help='merge high score files and archives into one leaderboard')
+    merge_parser.add_argument('files', nargs='+', help='highscores.json files, JSON lines, or zip/tar archives of them')
+    merge_parser.add_argument('--output', help='leaderboard to write (default: your own high scores, merged in)')
+    merge_parser.add_argument('--top', type=int, default=10, help='scores kept per mode')
+    merge_parser.add_argument('--ranked', metavar='FILE',
+                              help='also write every distinct score, ranked, as JSON lines')
+
+    render_parser = commands.add_parser('render-benchmark', help='measure drawing speed, without a terminal unless --pty')
+    render_parser.add_argument('--pty', action='store_true',
+                               help='draw through curses and ANSI output on a pseudo-terminal, counting the bytes sent')
+    render_parser.add_argument('--no-sync', action='store_true', help='with --pty, no synchronized output for ANSI')
+    render_parser.add_argument('--layout', choices=['typical', 'worst'], help='only this board (default: both)')
+    render_parser.add_argument('--height', type=int, default=40, help='screen rows')
+    render_parser.add_argument('--width', type=int, default=80, help='screen columns')
+
+    rl_parser = commands.add_parser('rl-benchmark', help='measure reinforcement-learning environment steps per second')
+    rl_parser.add_argument('--envs', type=int, default=64, help='environments in the vectorized runs')
+    rl_parser.add_argument('--steps', type=int, default=20000, help='environment steps per run')
+    rl_parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+
+    watch_parser = commands.add_parser('watch', help='watch a bot play in real time')
+    watch_parser.add_argument('--bot', default='greedy', help='bot to watch')
+    watch_parser.add_argument('--speed', type=float, default=5, help='moves per second (0 = as fast as it can think)')
+    watch_parser.add_argument('--seed', type=int, default=None, help='deal seed (default: random)')
+    watch_parser.add_argument('--fps', type=int, default=30, help='maximum frames per second')
+
+    daily_parser = commands.add_parser('daily', help="play today's guaranteed-winnable deal")
+    daily_parser.add_argument('--precompute', action='store_true', help='find and cache upcoming daily deals, then exit')
+    daily_parser.add_argument('--days', type=int, default=365, help='days ahead to precompute')
+
+    spectate_parser = commands.add_parser('spectate', help='watch a game started with --broadcast')
+    spectate_parser.add_argument('socket', help='Unix socket the game is broadcast on')
+
+    args = parser.parse_args()
+    if args.command == 'tournament':
+        tournament(args)
+    elif args.command == 'solve':
+        solve(args)
+    elif args.command == 'endgame':
+        endgame(args)
+    elif args.command in ('merge', 'import'):
+        merge(args)
+    elif args.command == 'render-benchmark':
+        render_benchmark(args)
+    elif args.command == 'rl-benchmark':
+        rl_benchmark(args)
+    elif args.command == 'watch':
+        watch(args)
+    elif args.command == 'spectate':
+        spectate(args)
+    else:
+        if args.trace_memory:
+            tracemalloc.start()
+        try:
+            events = EventStream(open_sink(args.events)) if args.events else None
+        except OSError as e:
+            sys.exit(f"Can't write events to {args.events}: {e.strerror or e}")
+        try:
+            if args.cprofile or args.sample:
+                from profiling import run_profiled
+                run_profiled(play, args, events, cprofile_path=args.cprofile,
+                             sample_path=args.sample, interval=args.sample_interval / 1000)
+            else:
+                play(args, events)
+        finally:
+            if events:
+                events.close()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,150 @@
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+from game_logic import SolitaireGame
+
+Move = Tuple[str, int, str, int, int]
+
+def face_down_total(game: SolitaireGame) -> int:
+    return sum(game.face_down)
+
+def foundation_total(game: SolitaireGame) -> int:
+    return sum(len(foundation) for foundation in game.foundations)
+
+def find_progress(game: SolitaireGame, node_limit: int = 5000) -> Optional[bool]:
+    """Breadth-first search for any line that makes progress.
+
+    Progress means a card reaches the foundations or a face-down card is
+    turned over. Returns True if such a line exists, False if every
+    position reachable from here was visited without finding one, and None
+    if node_limit positions were expanded first. Stock cards are played
+    with macro moves, so cycling through the stock costs no positions.
+    The game is not modified.
+    """
+    start_foundations = foundation_total(game)
+    start_face_down = face_down_total(game)
+
+    root = game.clone()
+    seen = {root.state_key()}
+    queue = deque([root])
+    expanded = 0
+    while queue:
+        if expanded >= node_limit:
+            return None
+        position = queue.popleft()
+        expanded += 1
+        for move in position.macro_moves():
+            child = position.clone()
+            child.apply_move(move, record_undo=False)
+            if foundation_total(child) > start_foundations or face_down_total(child) < start_face_down:
+                return True
+            key = child.state_key()
+            if key not in seen:
+                seen.add(key)
+                queue.append(child)
+    return False
+
+def single_moves(line: List[Move]) -> int:
+    """How many moves a line takes one at a time: a stock macro move
+    counts its draws as well as the play."""
+    return sum(move[1] + 1 if move[0] == 'waste' else 1 for move in line)
+
+def is_useful(game: SolitaireGame, move: Move) -> bool:
+    """Filters out moves that only shuffle cards around.
+
+    Foundation-to-tableau moves are dropped, and tableau-to-tableau moves
+    must move a whole face-up run that achieves something: either a
+    face-down card gets turned over, or a column whose bottom card isn't
+    a King is emptied, making room for a King.
+    """
+    src_pile, src_idx, dst_pile, _, num_cards = move
+    if src_pile == 'foundation':
+        return False
+    if src_pile == 'tableau' and dst_pile == 'tableau':
+        column = game.tableau[src_idx]
+        if num_cards < game.face_up_count(src_idx):
+            return False # Splitting a run never reveals anything
+        return len(column) > num_cards or column[0].value != 13
+    return True
+
+def is_safe_foundation_move(game: SolitaireGame, move: Move) -> bool:
+    """A foundation move no winning line would ever need to take back:
+    Aces and Twos, or cards whose opposite-color predecessors are already up."""
+    src_pile, src_idx, dst_pile, _, _ = move
+    if dst_pile != 'foundation':
+        return False
+    card = game.card_after_draws(src_idx) if src_pile == 'waste' else game.tableau[src_idx][-1]
+    value = card.value
+    if value <= 2:
+        return True
+    needed = 0
+    for foundation in game.foundations:
+        if foundation and foundation[-1].red != card.red and len(foundation) >= value - 1:
+            needed += 1
+    return needed == 2
+
+def ordered_moves(game: SolitaireGame) -> Iterator[Move]:
+    """Useful moves, most promising first. A safe foundation move is forced.
+    Stock cards come as macro moves (SolitaireGame.stock_moves), fewest
+    draws first."""
+    moves = [m for m in game.macro_moves() if is_useful(game, m)]
+    for move in moves:
+        if is_safe_foundation_move(game, move):
+            return iter([move])
+
+    def priority(move):
+        src_pile, _, dst_pile, _, _ = move
+        if dst_pile == 'foundation':
+            return 0
+        if src_pile == 'tableau':
+            return 1 # Reveals a card
+        return 2 + move[1] # A stock or waste card, after move[1] draws
+    return iter(sorted(moves, key=priority))
+
+def solve(game: SolitaireGame, node_limit: int = 20000, endgame=None) -> Optional[List[Move]]:
+    """Depth-first search for a winning line from the current position.
+
+    Positions are deduplicated with a transposition set. With an
+    endgame.EndgameTable, the search finishes as soon as it reaches a
+    position the table has a win for.
+    Returns the moves to play, stock cards as macro moves, or None if no
+    win was found within node_limit positions (or the deal is
+    unwinnable). The game is not modified.
+    """
+    root = game.clone()
+    if root.check_win():
+        return []
+
+    seen = {root.state_key()}
+    stack = [(root, ordered_moves(root))]
+    path: List[Move] = []
+    expanded = 1
+    while stack:
+        position, moves = stack[-1]
+        move = next(moves, None)
+        if move is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+
+        child = position.clone()
+        child.apply_move(move, record_undo=False)
+        if child.check_win():
+            return path + [move]
+        key = child.state_key()
+        if key in seen:
+            continue
+        seen.add(key)
+        if endgame is not None:
+            # LOST positions are searched like any other: the table doesn't
+            # know about foundation takebacks
+            rest = endgame.line(child)
+            if rest is not None:
+                return path + [move] + rest
+
+        expanded += 1
+        if expanded > node_limit:
+            return None
+        path.append(move)
+        stack.append((child, ordered_moves(child)))
+    return None
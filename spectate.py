@@ -0,0 +1,306 @@
+import curses
+import json
+import os
+import select
+import selectors
+import socket
+import stat
+import sys
+import threading
+from collections import deque
+from typing import Optional, Tuple
+
+from screen import Grid, init_colors, row_spans
+
+# Seconds the viewer waits for a frame or key before checking for a resize
+RESIZE_POLL = 0.1
+# Frames waiting for the broadcast thread; older ones are dropped past this
+MAX_QUEUED_FRAMES = 64
+
+class FrameRecorder:
+    """Passes the frames the Renderer shows on to a broadcaster.
+
+    commit() compares each row of the screen's grid with the last published
+    frame and hands the broadcaster only the rows that changed, already
+    encoded. Each row's encoding is kept, so a full frame for a viewer that
+    fell behind is just those strings joined, never a re-render.
+    """
+    def __init__(self, broadcaster: 'Broadcaster'):
+        self.broadcaster = broadcaster
+        self.size = None
+
+    def commit(self, grid: Grid):
+        size = grid.getmaxyx()
+        if size != self.size:
+            self.size = size
+            self.sent = [None] * size[0] # (text, attrs) of each row as last published
+            self.encoded = [json.dumps([y, []]) for y in range(size[0])]
+        changed = []
+        for y in range(size[0]):
+            row = (''.join(grid.chars[y]), grid.attrs[y][:])
+            if row != self.sent[y]:
+                self.sent[y] = row
+                self.encoded[y] = json.dumps([y, row_spans(*row)], ensure_ascii=False)
+                changed.append(self.encoded[y])
+        self.broadcaster.publish(size, changed, tuple(self.encoded))
+
+def encode_frame(size: Tuple[int, int], rows, key: bool) -> bytes:
+    """One JSON line: {"size": [h, w], "key": full frame?, "rows": [[y, spans], ...]}."""
+    return (f'{{"size": [{size[0]}, {size[1]}], "key": {"true" if key else "false"}, '
+            f'"rows": [{", ".join(rows)}]}}\n').encode()
+
+class Frame:
+    """A published frame: its diff, encoded once, and a full version built
+    on first use from the row encodings captured at commit time."""
+    __slots__ = ('size', 'diff', 'rows', '_full')
+
+    def __init__(self, size, changed, rows):
+        self.size = size
+        self.diff = encode_frame(size, changed, False)
+        self.rows = rows
+        self._full = None
+
+    def full(self) -> bytes:
+        if self._full is None:
+            self._full = encode_frame(self.size, self.rows, True)
+        return self._full
+
+class Spectator:
+    """One connected viewer. At most one message is in flight per viewer;
+    frames published while it is still sending are dropped, and the
+    viewer is brought back in sync with a full frame."""
+    __slots__ = ('sock', 'pending', 'stale', 'sent', 'dropped')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.pending = memoryview(b'')
+        self.stale = True # Needs a full frame before any diff makes sense
+        self.sent = 0
+        self.dropped = 0
+
+class Broadcaster:
+    """Serves frames to spectators connected to a Unix socket.
+
+    publish() only queues the frame and wakes a background thread, which
+    accepts viewers and fans frames out with non-blocking sends, so the
+    player never waits on a viewer. Frames are encoded once however many
+    viewers there are. At most MAX_QUEUED_FRAMES wait; if older ones are
+    dropped, every viewer gets a full frame next.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path) # Left over from a crashed host
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(path)
+        self.listener.listen(128)
+        self.listener.setblocking(False)
+        self.spectators = {}
+        self.frames = deque(maxlen=MAX_QUEUED_FRAMES)
+        self._skipped = False # A queued frame was dropped: every viewer needs a full one
+        self.latest: Optional[Frame] = None
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.listener, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def publish(self, size, changed, rows):
+        if len(self.frames) == MAX_QUEUED_FRAMES:
+            self._skipped = True # Set before append() drops the oldest
+        self.frames.append(Frame(size, changed, rows))
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except BlockingIOError:
+            pass # Already woken
+
+    def stats(self) -> Tuple[int, int, int]:
+        """Viewers, frames sent and frames dropped so far."""
+        spectators = list(self.spectators.values())
+        return (len(spectators), sum(s.sent for s in spectators), sum(s.dropped for s in spectators))
+
+    def close(self):
+        self._closed = True
+        self._wake()
+        self._thread.join()
+        for spectator in list(self.spectators.values()):
+            spectator.sock.close()
+        self._selector.close()
+        self.listener.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _serve(self):
+        while not self._closed:
+            for key, events in self._selector.select():
+                if key.fileobj is self.listener:
+                    self._accept()
+                elif key.fileobj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    while self.frames:
+                        frame = self.frames.popleft()
+                        if self._skipped:
+                            self._skipped = False
+                            for spectator in self.spectators.values():
+                                spectator.stale = True
+                        self._fan_out(frame)
+                else:
+                    spectator = key.data
+                    if self.spectators.get(spectator.sock.fileno()) is not spectator:
+                        continue # Dropped earlier in this batch
+                    if events & selectors.EVENT_READ:
+                        self._read(spectator)
+                    if events & selectors.EVENT_WRITE and spectator.sock.fileno() != -1:
+                        self._flush(spectator)
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            spectator = Spectator(sock)
+            self.spectators[sock.fileno()] = spectator
+            self._selector.register(sock, selectors.EVENT_READ, spectator)
+            self._catch_up(spectator)
+
+    def _fan_out(self, frame: Frame):
+        self.latest = frame
+        for spectator in list(self.spectators.values()):
+            if spectator.pending:
+                # Still sending an earlier frame: skip this one
+                spectator.dropped += 1
+                spectator.stale = True
+            elif spectator.stale:
+                self._send(spectator, frame.full())
+            else:
+                self._send(spectator, frame.diff)
+
+    def _catch_up(self, spectator: Spectator):
+        if spectator.stale and not spectator.pending and self.latest is not None:
+            self._send(spectator, self.latest.full())
+
+    def _send(self, spectator: Spectator, data: bytes):
+        spectator.pending = memoryview(data)
+        spectator.stale = False
+        spectator.sent += 1
+        self._flush(spectator)
+
+    def _flush(self, spectator: Spectator):
+        try:
+            sent = spectator.sock.send(spectator.pending)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(spectator)
+            return
+        spectator.pending = spectator.pending[sent:]
+        if not spectator.pending:
+            self._catch_up(spectator)
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if spectator.pending else 0)
+        if spectator.sock.fileno() != -1 and self._selector.get_key(spectator.sock).events != events:
+            self._selector.modify(spectator.sock, events, spectator)
+
+    def _read(self, spectator: Spectator):
+        try:
+            data = spectator.sock.recv(64)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._drop(spectator)
+        elif not spectator.pending:
+            # Any byte asks for a full frame, e.g. after the viewer resized
+            spectator.stale = True
+            self._catch_up(spectator)
+        else:
+            spectator.stale = True
+
+    def _drop(self, spectator: Spectator):
+        if spectator.sock.fileno() == -1:
+            return # Already dropped
+        self.spectators.pop(spectator.sock.fileno(), None)
+        self._selector.unregister(spectator.sock)
+        spectator.sock.close()
+
+def apply_frame(stdscr, frame: dict):
+    """Draws a received frame, clipped to this terminal."""
+    h, w = stdscr.getmaxyx()
+    if frame['key']:
+        stdscr.erase()
+    for y, spans in frame['rows']:
+        if y >= h:
+            continue
+        stdscr.move(y, 0)
+        stdscr.clrtoeol()
+        x = 0
+        for text, attr in spans:
+            if x >= w:
+                break
+            try:
+                stdscr.addstr(y, x, text[:w - x], attr)
+            except curses.error:
+                pass # Bottom-right cell
+            x += len(text)
+
+def spectate(stdscr, path: str):
+    """Shows the game broadcast on a Unix socket until Q is pressed."""
+    curses.curs_set(0)
+    init_colors()
+    stdscr.nodelay(True)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError as e:
+        stdscr.addstr(0, 0, f"Can't connect to {path}: {e.strerror} - Q to quit"[:stdscr.getmaxyx()[1] - 1])
+        sock = None
+
+    buffer = b''
+    while True:
+        ready, _, _ = select.select([sys.stdin] + ([sock] if sock else []), [], [], RESIZE_POLL)
+        # A resize doesn't make stdin readable, so keys are read on every pass
+        key = stdscr.getch()
+        if key in (ord('q'), ord('Q')):
+            break
+        if key == curses.KEY_RESIZE:
+            stdscr.clear()
+            stdscr.refresh()
+            if sock:
+                try:
+                    sock.send(b'k') # Ask for a full frame
+                except OSError:
+                    pass # The read below finds the broadcast ended
+        if sock in ready:
+            try:
+                data = sock.recv(1 << 16)
+            except OSError:
+                data = b'' # The host went away mid-send
+            if not data:
+                sock.close()
+                sock = None
+                stdscr.addstr(0, 0, "Broadcast ended - Q to quit", curses.A_BOLD)
+                stdscr.refresh()
+                continue
+            *lines, buffer = (buffer + data).split(b'\n')
+            for line in lines:
+                apply_frame(stdscr, json.loads(line))
+            stdscr.refresh()
+    if sock:
+        sock.close()
@@ -0,0 +1,227 @@
+from typing import Dict, List, Optional, Tuple
+from cards import Card, CardGame, Deck, Rank, Suit, follows_suit
+
+Move = Tuple[str, int, str, int, int]
+
+DEAL = ('stock', 0, 'tableau', 0, 10)
+
+def spider_cards(suits: int) -> Tuple[Card, ...]:
+    """The two-deck, 104-card pack played with 1, 2 or 4 suits."""
+    chosen = [Suit.SPADES, Suit.HEARTS, Suit.CLUBS, Suit.DIAMONDS][:suits]
+    return tuple(Card(suit, rank) for _ in range(8 // suits) for suit in chosen for rank in Rank)
+
+class SpiderGame(CardGame):
+    """A game of Spider: 10 columns built down regardless of suit, where only
+    same-suit runs move together and a full King-to-Ace run of one suit is
+    removed to the foundations.
+
+    The length of the same-suit run ending at each card is kept alongside
+    the columns and updated as cards move, so finding movable runs and
+    completed suits never rescans a column.
+    """
+    VARIANT = 'spider'
+    NUM_COLUMNS = 10
+    # Stock, a gap, then one foundation per completed suit
+    TOP_ROW = (('stock', 0), None) + tuple(('foundation', i) for i in range(8))
+    NESTED_PILES = ('tableau', 'runs', 'foundations')
+    PILES = ('face_down', 'stock')
+    VALUES = ('empty_columns', 'score', 'moves')
+
+    def __init__(self, seed: Optional[int] = None, suits: int = 4):
+        self.seed = seed
+        self.suits = suits
+        self.deck = Deck(seed, spider_cards(suits))
+        self.tableau: List[List[Card]] = [[] for _ in range(10)]
+        # runs[i][j]: length of the same-suit run ending at tableau[i][j] (0 if face down)
+        self.runs: List[List[int]] = [[] for _ in range(10)]
+        self.face_down = [0] * 10
+        self.foundations: List[List[Card]] = [[] for _ in range(8)]
+        self.stock: List[Card] = []
+        self.score = 500
+        self.moves = 0
+        self.history = []
+        self.last_move: Optional[Move] = None
+        self.deal()
+
+    def reset_game(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.deck.reset(seed)
+        for column, runs in zip(self.tableau, self.runs):
+            column.clear()
+            runs.clear()
+        for foundation in self.foundations:
+            foundation.clear()
+        self.stock.clear()
+        self.score = 500
+        self.moves = 0
+        self.history.clear()
+        self.here = None
+        self.last_move = None
+        self.deal()
+
+    def deal(self):
+        cards = self.deck.cards
+        top = len(cards)
+        for i in range(54):
+            top -= 1
+            column = self.tableau[i % 10]
+            column.append(cards[top])
+            self.runs[i % 10].append(0)
+        for col in range(10):
+            # Only the last card of each column starts face up
+            self.face_down[col] = len(self.tableau[col]) - 1
+            self.runs[col][-1] = 1
+        self.stock.extend(cards[top - 1::-1] if top else ())
+        self.empty_columns = 0
+
+    def _push(self, col: int, card: Card):
+        column, runs = self.tableau[col], self.runs[col]
+        if column and runs[-1] and follows_suit(card, column[-1]):
+            runs.append(runs[-1] + 1)
+        else:
+            runs.append(1)
+        column.append(card)
+
+    def _pop(self, col: int, num_cards: int) -> List[Card]:
+        column = self.tableau[col]
+        cards = column[-num_cards:]
+        del column[-num_cards:]
+        del self.runs[col][-num_cards:]
+        self._reveal(col)
+        return cards
+
+    def _reveal(self, col: int):
+        column = self.tableau[col]
+        if not column:
+            self.empty_columns += 1
+        elif self.face_down[col] == len(column):
+            self.face_down[col] -= 1
+            self.runs[col][-1] = 1
+
+    def _complete(self, col: int):
+        """Removes a finished King-to-Ace run from the top of a column."""
+        runs = self.runs[col]
+        if runs and runs[-1] >= 13:
+            foundation = next(f for f in self.foundations if not f)
+            foundation.extend(reversed(self._pop(col, 13)))
+            self.score += 100
+            self.last_removed += 13
+
+    def run_length(self, col_idx: int) -> int:
+        runs = self.runs[col_idx]
+        return runs[-1] if runs else 0
+
+    def can_deal(self) -> bool:
+        # Every column must have a card before the next row is dealt
+        return bool(self.stock) and not self.empty_columns
+
+    def tableau_move_depths(self, from_col: int) -> Dict[int, int]:
+        """{to_col: num_cards}; moves into an empty column take the whole run."""
+        column = self.tableau[from_col]
+        run = self.run_length(from_col)
+        if not run:
+            return {}
+        depths = {}
+        for to_col, dest in enumerate(self.tableau):
+            if to_col == from_col:
+                continue
+            if not dest:
+                depths[to_col] = run
+                continue
+            # Any suit may be built on, so only the rank decides the depth
+            depth = dest[-1].value - column[-1].value
+            if 1 <= depth <= run:
+                depths[to_col] = depth
+        return depths
+
+    def moves_from(self, pile: str, idx: int) -> List[Move]:
+        if pile == 'stock':
+            return [DEAL] if self.can_deal() else []
+        if pile != 'tableau':
+            return [] # Completed suits stay put
+        return [('tableau', idx, 'tableau', to_col, num_cards)
+                for to_col, num_cards in self.tableau_move_depths(idx).items()]
+
+    def legal_moves(self) -> List[Move]:
+        moves = self.moves_from('stock', 0)
+        for col in range(10):
+            moves.extend(self.moves_from('tableau', col))
+        return moves
+
+    def is_legal(self, move: Move) -> bool:
+        src_pile, src_idx, dst_pile, dst_idx, num_cards = move
+        if src_pile == 'stock':
+            return self.can_deal()
+        if src_pile != 'tableau' or dst_pile != 'tableau' or src_idx == dst_idx:
+            return False
+        if not self.tableau[dst_idx]:
+            # An empty column takes any part of the run
+            return 1 <= num_cards <= self.run_length(src_idx)
+        return self.tableau_move_depths(src_idx).get(dst_idx) == num_cards
+
+    def draw_from_stock(self, record_undo=True) -> bool:
+        """Deals one card face up onto every column."""
+        if not self.can_deal():
+            return False
+        if record_undo:
+            self.save_state()
+        self.last_removed = 0
+        for col in range(10):
+            self._push(col, self.stock.pop())
+        for col in range(10):
+            self._complete(col)
+        self.moves += 1
+        self.score = max(0, self.score - 1)
+        self.last_move = DEAL
+        return True
+
+    def apply_move(self, move: Move, record_undo=True) -> bool:
+        src_pile, src_idx, dst_pile, dst_idx, num_cards = move
+        if src_pile == 'stock':
+            return self.draw_from_stock(record_undo)
+        if not self.is_legal(move):
+            return False
+        if record_undo:
+            self.save_state()
+
+        self.last_removed = 0
+        if not self.tableau[dst_idx]:
+            self.empty_columns -= 1
+        for card in self._pop(src_idx, num_cards):
+            self._push(dst_idx, card)
+        self._complete(dst_idx)
+
+        self.moves += 1
+        self.score = max(0, self.score - 1)
+        self.last_move = move
+        return True
+
+    def auto_move_to_foundation(self) -> bool:
+        return False # Completed suits leave on their own
+
+    def plan_auto_complete(self):
+        return None
+
+    def check_win(self) -> bool:
+        return all(self.foundations)
+
+    def clone(self) -> 'SpiderGame':
+        other = SpiderGame.__new__(SpiderGame)
+        other.seed = self.seed
+        other.suits = self.suits
+        other.deck = self.deck
+        other.tableau = [column[:] for column in self.tableau]
+        other.runs = [runs[:] for runs in self.runs]
+        other.face_down = self.face_down[:]
+        other.foundations = [f[:] for f in self.foundations]
+        other.stock = self.stock[:]
+        other.empty_columns = self.empty_columns
+        other.score = self.score
+        other.moves = self.moves
+        other.history = []
+        other.last_move = self.last_move
+        return other
+
+    def state_key(self) -> tuple:
+        return (tuple(map(tuple, self.tableau)), tuple(self.face_down),
+                sum(1 for f in self.foundations if f), len(self.stock))
@@ -0,0 +1,122 @@
+import json
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+class MemorySink:
+    """Keeps the most recent events in a ring buffer."""
+    def __init__(self, capacity: int = 10000):
+        self.events = deque(maxlen=capacity)
+
+    def write(self, event: dict):
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+class JsonlSink:
+    """Appends one JSON object per line to a file."""
+    def __init__(self, path: str):
+        self.file = open(path, 'a')
+
+    def write(self, event: dict):
+        self.file.write(json.dumps(event) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class SocketSink:
+    """Streams JSON lines to a listener on a Unix socket.
+
+    If the listener goes away events are dropped; the game keeps running.
+    """
+    def __init__(self, path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def write(self, event: dict):
+        if self.sock is None:
+            return
+        try:
+            self.sock.sendall((json.dumps(event) + "\n").encode())
+        except OSError:
+            self.close()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+def open_sink(spec: str):
+    """'ring' keeps events in memory, 'unix:PATH' streams them to a socket,
+    anything else is a JSONL file path. Raises OSError if the socket or
+    file can't be opened."""
+    if spec == 'ring':
+        return MemorySink()
+    if spec.startswith('unix:'):
+        return SocketSink(spec[len('unix:'):])
+    return JsonlSink(spec)
+
+class EventStream:
+    """Timestamps events and hands them to a sink on a background thread.
+
+    emit() only reads the clock and enqueues, so it is safe to call from the
+    input loop; encoding and I/O happen on the writer thread. Timestamps come
+    from time.monotonic, so they can be subtracted but are not wall time.
+    """
+    def __init__(self, sink, clock=time.monotonic):
+        self.sink = sink
+        self.clock = clock
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_events, daemon=True)
+        self._writer.start()
+
+    def emit(self, kind: str, **fields):
+        fields['event'] = kind
+        fields['t'] = self.clock()
+        self._queue.put(fields)
+
+    def _write_events(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            self.sink.write(event)
+            # Flush whenever the queue runs dry, not after every line
+            if self._queue.empty() and hasattr(self.sink, 'flush'):
+                self.sink.flush()
+
+    def close(self):
+        """Writes out everything emitted so far and closes the sink."""
+        self._queue.put(None)
+        self._writer.join()
+        self.sink.close()
+
+class NullStream:
+    """Stands in for an EventStream when telemetry is off."""
+    def emit(self, kind: str, **fields):
+        pass
+
+    def close(self):
+        pass
+
+def move_type(move) -> Optional[str]:
+    """Short name for a move tuple, e.g. 'draw', 'recycle' or 'waste_to_tableau'."""
+    if move is None:
+        return None
+    src_pile, _, dst_pile, _, _ = move
+    if src_pile == 'stock':
+        return 'draw'
+    if dst_pile == 'stock':
+        return 'recycle'
+    return f"{src_pile}_to_{dst_pile}"
@@ -0,0 +1,46 @@
+import unittest
+from animation import FrameScheduler, slide_position
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestFrameScheduler(unittest.TestCase):
+    def test_frames_end_on_final_state(self):
+        clock = FakeClock()
+        scheduler = FrameScheduler(fps=10, clock=clock, sleep=clock.sleep)
+        progress = list(scheduler.frames(0.5))
+        self.assertEqual(progress[-1], 1.0)
+        self.assertEqual(progress, sorted(progress))
+        # 0.5s at 10fps: 5 frames plus the opening one
+        self.assertEqual(len(progress), 6)
+        self.assertEqual(scheduler.dropped, 0)
+
+    def test_slow_frames_are_dropped(self):
+        clock = FakeClock()
+        scheduler = FrameScheduler(fps=10, clock=clock, sleep=clock.sleep)
+        progress = []
+        for p in scheduler.frames(1.0):
+            progress.append(p)
+            clock.now += 0.25 # Each frame takes 2.5 budgets to draw
+        # Animation still finishes on time instead of lagging
+        self.assertLessEqual(clock.now, 1.5)
+        self.assertEqual(progress[-1], 1.0)
+        self.assertGreater(scheduler.dropped, 0)
+
+    def test_zero_duration(self):
+        scheduler = FrameScheduler()
+        self.assertEqual(list(scheduler.frames(0)), [1.0])
+
+    def test_slide_position(self):
+        self.assertEqual(slide_position((1, 2), (10, 20), 0.0), (1, 2))
+        self.assertEqual(slide_position((1, 2), (10, 20), 1.0), (10, 20))
+
+if __name__ == '__main__':
+    unittest.main()
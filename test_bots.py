@@ -0,0 +1,33 @@
+import unittest
+from bots import BOTS, play_game, run_tournament, format_report
+from game_logic import SolitaireGame
+
+class TestBots(unittest.TestCase):
+    def test_bots_only_play_legal_moves(self):
+        for name, bot_class in BOTS.items():
+            game = SolitaireGame(seed=7)
+            player = bot_class(seed=7)
+            player.new_game(game)
+            for _ in range(30):
+                move = player.choose_move(game)
+                if move is None:
+                    break
+                self.assertIn(move, game.legal_moves(), name)
+                game.apply_move(move, record_undo=False)
+
+    def test_play_game_is_reproducible(self):
+        first = play_game(BOTS['greedy'](), seed=3)
+        second = play_game(BOTS['greedy'](), seed=3)
+        first.pop('think_time')
+        second.pop('think_time')
+        self.assertEqual(first, second)
+
+    def test_tournament_report(self):
+        stats = run_tournament(['random', 'greedy'], [1, 2], workers=1)
+        self.assertEqual(set(stats), {'random', 'greedy'})
+        self.assertEqual(stats['greedy']['games'], 2)
+        self.assertTrue(0.0 <= stats['random']['win_rate'] <= 1.0)
+        self.assertIn('greedy', format_report(stats))
+
+if __name__ == '__main__':
+    unittest.main()
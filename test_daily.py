@@ -0,0 +1,79 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from daily import DailyDeals, candidate_seeds, find_winnable_seed
+from game_logic import SolitaireGame
+from solver import solve
+
+DAY = datetime.date(2026, 10, 19) # Its first candidate is winnable, so the search is quick
+
+class TestDailyDeals(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.original_env = os.environ.get('SNAP_USER_DATA')
+        os.environ['SNAP_USER_DATA'] = self.test_dir
+
+    def tearDown(self):
+        if self.original_env:
+            os.environ['SNAP_USER_DATA'] = self.original_env
+        else:
+            del os.environ['SNAP_USER_DATA']
+        shutil.rmtree(self.test_dir)
+
+    def test_candidates_differ_per_day(self):
+        today = set(candidate_seeds(DAY))
+        tomorrow = set(candidate_seeds(DAY + datetime.timedelta(days=1)))
+        self.assertFalse(today & tomorrow)
+
+    def test_daily_seed_is_winnable(self):
+        seed = find_winnable_seed(DAY)
+        self.assertIn(seed, candidate_seeds(DAY))
+        line = solve(SolitaireGame(seed))
+        self.assertIsNotNone(line)
+
+        game = SolitaireGame(seed)
+        for move in line:
+            game.apply_move(move)
+        self.assertTrue(game.check_win())
+
+    def test_seed_is_cached(self):
+        deals = DailyDeals()
+        seed = deals.seed_for(DAY)
+
+        with mock.patch('daily.find_winnable_seed') as search:
+            self.assertEqual(DailyDeals().seed_for(DAY), seed)
+            search.assert_not_called()
+
+    def test_precompute_skips_cached_days(self):
+        deals = DailyDeals()
+        deals.seeds[DAY.isoformat()] = 42
+        with mock.patch('daily.find_winnable_seed', side_effect=lambda day: day.toordinal()) as search:
+            added = deals.precompute(3, start=DAY)
+        self.assertEqual(added, 2)
+        self.assertEqual(search.call_count, 2)
+
+        reloaded = DailyDeals()
+        self.assertEqual(reloaded.seeds[DAY.isoformat()], 42)
+        tomorrow = DAY + datetime.timedelta(days=1)
+        self.assertEqual(reloaded.seeds[tomorrow.isoformat()], tomorrow.toordinal())
+
+    def test_precompute_in_background(self):
+        process = DailyDeals().precompute_in_background(1, start=DAY)
+        process.join(60)
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(DailyDeals().seeds, {DAY.isoformat(): find_winnable_seed(DAY)})
+
+    def test_save_keeps_other_writers_days(self):
+        first, second = DailyDeals(), DailyDeals()
+        first.seeds['2026-01-01'] = 1
+        first.save()
+        second.seeds['2026-01-02'] = 2
+        second.save()
+        self.assertEqual(DailyDeals().seeds, {'2026-01-01': 1, '2026-01-02': 2})
+        self.assertEqual(os.listdir(self.test_dir), ['daily_seeds.json']) # No temp files left
+
+if __name__ == '__main__':
+    unittest.main()
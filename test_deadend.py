@@ -0,0 +1,41 @@
+import unittest
+from deadend import DeadEndDetector, WARNING
+from test_solver import dead_end_game
+
+def cycle_stock(game, detector):
+    """Draws through the whole stock and recycles it, observing every step."""
+    while game.stock:
+        game.draw_from_stock()
+        detector.observe(game)
+    game.draw_from_stock()
+    detector.observe(game)
+
+class TestDeadEndDetector(unittest.TestCase):
+    def test_warns_after_fruitless_cycle(self):
+        game = dead_end_game()
+        detector = DeadEndDetector()
+
+        cycle_stock(game, detector)
+        self.assertFalse(detector.busy)
+        self.assertIsNone(detector.warning)
+
+        # Second identical cycle triggers the background search
+        cycle_stock(game, detector)
+        detector._thread.join()
+        self.assertEqual(detector.warning, WARNING)
+
+        detector.reset()
+        self.assertIsNone(detector.warning)
+
+    def test_quiet_while_progressing(self):
+        game = dead_end_game()
+        detector = DeadEndDetector()
+        cycle_stock(game, detector)
+        # Playing a card changes the next cycle's fingerprint
+        game.stock.pop()
+        cycle_stock(game, detector)
+        self.assertFalse(detector.busy)
+        self.assertIsNone(detector.warning)
+
+if __name__ == '__main__':
+    unittest.main()
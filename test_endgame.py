@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from endgame import EndgameTable, LOST, cards_left, distances_to_win, position_key, write
+from game_logic import SolitaireGame
+from solver import single_moves, solve
+
+def endgame_position(cards: int) -> SolitaireGame:
+    """A position on a winning line with at most `cards` cards left to play."""
+    game = SolitaireGame(739908000)
+    for move in solve(game):
+        game.apply_move(move, record_undo=False)
+        if cards_left(game) <= cards:
+            return game
+
+class TestPositionKey(unittest.TestCase):
+    def test_ignores_column_order_and_score(self):
+        game = SolitaireGame(3)
+        other = game.clone()
+        other.tableau.reverse()
+        other.face_down.reverse()
+        other.score, other.moves = 99, 7
+        self.assertEqual(position_key(game), position_key(other))
+        other.draw_from_stock(record_undo=False)
+        self.assertNotEqual(position_key(game), position_key(other))
+
+class TestEndgameTable(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'endgame.db')
+        self.game = endgame_position(12)
+        distances = distances_to_win(self.game)
+        self.lost = SolitaireGame(5)
+        self.lost.foundations = [[] for _ in range(4)] # Only the key matters
+        distances[position_key(self.lost)] = LOST
+        write(self.path, distances, 52)
+        self.table = EndgameTable(self.path)
+
+    def tearDown(self):
+        self.table.close()
+        os.remove(self.path)
+        os.rmdir(self.dir)
+
+    def test_lookup(self):
+        self.assertGreater(len(self.table), 1)
+        self.assertGreater(self.table.distance(self.game), 0)
+        self.assertEqual(self.table.distance(self.lost), -1)
+        self.assertIsNone(self.table.distance(SolitaireGame(4)))
+        self.assertEqual(list(self.table.keys), sorted(self.table.keys))
+
+    def test_line_is_shortest_win(self):
+        distance = self.table.distance(self.game)
+        line = self.table.line(self.game)
+        self.assertEqual(len(line), distance)
+        for move in line:
+            self.assertTrue(self.game.apply_move(move))
+        self.assertTrue(self.game.check_win())
+
+    def test_solver_finishes_from_table(self):
+        game = SolitaireGame(739908000)
+        line = solve(game, endgame=self.table)
+        self.assertLessEqual(single_moves(line), single_moves(solve(game)))
+        for move in line:
+            game.apply_move(move)
+        self.assertTrue(game.check_win())
+
+    def test_lost_positions_are_still_searched(self):
+        game = SolitaireGame(739908000)
+        line = solve(game)
+        after = game.clone()
+        after.apply_move(line[0], record_undo=False)
+        path = os.path.join(self.dir, 'lost.db')
+        write(path, {position_key(after): LOST}, 52)
+        table = EndgameTable(path)
+        try:
+            self.assertEqual(solve(game, endgame=table), line)
+        finally:
+            table.close()
+            os.remove(path)
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.dir, 'other.db')
+        with open(path, 'wb') as f:
+            f.write(b'not a table')
+        with self.assertRaises(ValueError):
+            EndgameTable(path)
+        os.remove(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from freecell import FreeCellGame
+from game_logic import Card, Rank, Suit
+
+def card(suit, value):
+    return Card(suit, Rank(value))
+
+class TestFreeCellGame(unittest.TestCase):
+    def setUp(self):
+        self.game = FreeCellGame(seed=1)
+
+    def clear(self):
+        """Empties the table so tests can lay out their own columns."""
+        for col in range(8):
+            self.game._pop(col, len(self.game.tableau[col]))
+
+    def test_deal(self):
+        self.assertEqual([len(column) for column in self.game.tableau], [7, 7, 7, 7, 6, 6, 6, 6])
+        self.assertEqual(self.game.free_cells, 4)
+        self.assertEqual(self.game.empty_columns, 0)
+        # Same seed, same deal
+        self.assertEqual(FreeCellGame(seed=1).tableau, self.game.tableau)
+
+    def test_runs_tracked_incrementally(self):
+        self.clear()
+        for c in (card(Suit.SPADES, 9), card(Suit.HEARTS, 8), card(Suit.CLUBS, 7), card(Suit.SPADES, 6)):
+            self.game._push(0, c)
+        self.assertEqual(self.game.runs[0], [1, 2, 3, 1])
+        self.game._pop(0, 1)
+        self.assertEqual(self.game.run_length(0), 3)
+
+    def test_supermove_capacity(self):
+        self.clear()
+        # Seven columns empty; fill all but two and three of the free cells
+        for col in range(1, 6):
+            self.game._push(col, card(Suit.DIAMONDS, col + 1))
+            self.game.empty_columns -= 1
+        for c_idx in range(3):
+            self.game.cells[c_idx].append(card(Suit.CLUBS, c_idx + 1))
+            self.game.free_cells -= 1
+        self.assertEqual(self.game.empty_columns, 3) # Column 0 is empty too
+        self.assertEqual(self.game.capacity(), 2 << 3)
+        self.assertEqual(self.game.capacity(to_empty=True), 2 << 2)
+
+    def test_move_limited_by_capacity(self):
+        self.clear()
+        run = [card(Suit.SPADES, 9), card(Suit.HEARTS, 8), card(Suit.CLUBS, 7), card(Suit.DIAMONDS, 6)]
+        for c in run:
+            self.game._push(0, c)
+        self.game._push(1, card(Suit.HEARTS, 10))
+        for col in range(2, 8):
+            self.game._push(col, card(Suit.CLUBS, 13))
+        self.game.empty_columns = 0
+        for c_idx in range(3):
+            self.game.cells[c_idx].append(card(Suit.CLUBS, c_idx + 1))
+        self.game.free_cells = 1
+
+        # One free cell and no empty columns: only two cards move at once
+        self.assertNotIn(1, self.game.tableau_move_depths(0))
+        self.game.cells[0].clear()
+        self.game.cells[1].clear()
+        self.game.free_cells = 3
+        self.assertEqual(self.game.tableau_move_depths(0)[1], 4)
+        self.assertFalse(self.game.apply_move(('tableau', 0, 'tableau', 1, 3)))
+        self.assertTrue(self.game.apply_move(('tableau', 0, 'tableau', 1, 4)))
+        self.assertEqual(self.game.runs[1], [1, 2, 3, 4, 5])
+        self.assertEqual(self.game.empty_columns, 1)
+
+    def test_cells_and_undo(self):
+        before = self.game.state_key()
+        self.assertTrue(self.game.apply_move(('tableau', 0, 'cell', 2, 1)))
+        self.assertEqual(self.game.free_cells, 3)
+        self.assertEqual(len(self.game.tableau[0]), 6)
+        self.assertFalse(self.game.apply_move(('tableau', 1, 'cell', 2, 1))) # Cell taken
+        self.assertTrue(self.game.undo())
+        self.assertEqual(self.game.state_key(), before)
+        self.assertEqual(self.game.free_cells, 4)
+
+    def test_auto_move_to_foundation(self):
+        self.clear()
+        self.game._push(0, card(Suit.HEARTS, 2))
+        self.game._push(0, card(Suit.HEARTS, 1))
+        self.game.cells[0].append(card(Suit.HEARTS, 3))
+        self.game.free_cells = 3
+        self.game.empty_columns = 7
+        self.assertTrue(self.game.auto_move_to_foundation())
+        self.assertEqual(len(self.game.foundations[0]), 3)
+        self.assertEqual(len(self.game.history), 1)
+        self.assertEqual(self.game.free_cells, 4)
+
+    def test_clone_is_independent(self):
+        other = self.game.clone()
+        other.apply_move(other.legal_moves()[0])
+        self.assertNotEqual(other.state_key(), self.game.state_key())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,12 @@
+import copy
+import random
 import unittest
 import os
 import json
 import tempfile
 import shutil
 from unittest.mock import patch
-from game_logic import Card, Deck, SolitaireGame, Suit, Rank
+from game_logic import CARDS, Card, Deck, SolitaireGame, Suit, Rank
 from scores import ScoreManager
 
 class TestSolitaireGame(unittest.TestCase):
@@ -22,19 +24,39 @@ class TestSolitaireGame(unittest.TestCase):
         self.assertEqual(str(Rank.TWO), '2')
 
     def test_card_repr(self):
-        """Test card string representation when face up/down"""
+        """Test card string representation"""
         c = Card(Suit.HEARTS, Rank.ACE)
-        self.assertEqual(repr(c), "[?]")
-        c.show()
         self.assertEqual(repr(c), "A♥")
-        c.hide()
-        self.assertEqual(repr(c), "[?]")
+
+    def test_cards_are_interned(self):
+        c = Card(Suit.HEARTS, Rank.ACE)
+        self.assertIs(Card(Suit.HEARTS, Rank.ACE), c)
+        self.assertIs(copy.deepcopy(c), c)
+        self.assertIs(CARDS[c.index], c)
+        with self.assertRaises(AttributeError):
+            c.rank = Rank.KING
 
     # --- Deck Tests ---
     def test_deck_creation(self):
         deck = Deck()
         self.assertEqual(len(deck.cards), 52)
 
+    def test_seeded_deal(self):
+        first = SolitaireGame(seed=42)
+        second = SolitaireGame(seed=42)
+        self.assertEqual(first.state_key(), second.state_key())
+        second.reset_game(seed=43)
+        self.assertNotEqual(first.state_key(), second.state_key())
+
+    def test_redeal_reuses_deck(self):
+        cards = self.game.deck.cards
+        tableau = self.game.tableau
+        self.game.reset_game(seed=42)
+        self.assertIs(self.game.deck.cards, cards)
+        self.assertIs(self.game.tableau, tableau)
+        # Same deal as a fresh game with that seed
+        self.assertEqual(self.game.state_key(), SolitaireGame(seed=42).state_key())
+
     def test_deck_draw_empty(self):
         deck = Deck()
         # Draw all 52 cards
@@ -48,11 +70,10 @@ class TestSolitaireGame(unittest.TestCase):
         """Verify the tableau setup and stock size after deal"""
         for i in range(7):
             self.assertEqual(len(self.game.tableau[i]), i + 1)
-            # Top card should be face up
-            self.assertTrue(self.game.tableau[i][-1].face_up)
-            # Others should be face down
-            for j in range(i):
-                self.assertFalse(self.game.tableau[i][j].face_up)
+            # Only the top card should be face up
+            self.assertEqual(self.game.face_down[i], i)
+            self.assertTrue(self.game.is_face_up(i, i))
+            self.assertFalse(self.game.is_face_up(i, i - 1))
 
         # Check stock size: 52 - 28 (tableau cards) = 24
         self.assertEqual(len(self.game.stock), 24)
@@ -64,7 +85,6 @@ class TestSolitaireGame(unittest.TestCase):
         self.game.draw_from_stock()
         self.assertEqual(len(self.game.stock), initial_stock_len - 1)
         self.assertEqual(len(self.game.waste), 1)
-        self.assertTrue(self.game.waste[0].face_up)
 
     def test_recycle_waste(self):
         """Test recycling waste back to stock when stock is empty"""
@@ -72,7 +92,6 @@ class TestSolitaireGame(unittest.TestCase):
         self.game.stock = []
         # Add a card to waste
         c1 = Card(Suit.SPADES, Rank.ACE)
-        c1.show()
         self.game.waste = [c1]
 
         # Trigger recycle
@@ -80,8 +99,7 @@ class TestSolitaireGame(unittest.TestCase):
 
         self.assertEqual(len(self.game.stock), 1)
         self.assertEqual(len(self.game.waste), 0)
-        # Check if recycled card is face down
-        self.assertFalse(self.game.stock[0].face_up)
+        self.assertIs(self.game.stock[0], c1)
 
     def test_draw_stock_fully_empty(self):
         """Test draw action when both stock and waste are empty"""
@@ -94,15 +112,14 @@ class TestSolitaireGame(unittest.TestCase):
     # --- Tableau Move Tests ---
     def test_move_tableau_to_tableau_valid(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         
         # Destination: King Spades
         k_spades = Card(Suit.SPADES, Rank.KING)
-        k_spades.show()
         self.game.tableau[0].append(k_spades)
         
         # Source: Queen Hearts
         q_hearts = Card(Suit.HEARTS, Rank.QUEEN)
-        q_hearts.show()
         self.game.tableau[1].append(q_hearts)
         
         success = self.game.move_tableau_to_tableau(1, 0, 1)
@@ -112,38 +129,36 @@ class TestSolitaireGame(unittest.TestCase):
 
     def test_move_tableau_to_tableau_invalid_color(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         
         k_spades = Card(Suit.SPADES, Rank.KING)
-        k_spades.show()
         self.game.tableau[0].append(k_spades)
         
         # Invalid: Black Queen on Black King
         q_clubs = Card(Suit.CLUBS, Rank.QUEEN)
-        q_clubs.show()
         self.game.tableau[1].append(q_clubs)
         
         self.assertFalse(self.game.move_tableau_to_tableau(1, 0, 1))
 
     def test_move_tableau_to_tableau_invalid_rank(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         
         k_spades = Card(Suit.SPADES, Rank.KING)
-        k_spades.show()
         self.game.tableau[0].append(k_spades)
         
         # Invalid: Jack on King (needs Queen)
         j_hearts = Card(Suit.HEARTS, Rank.JACK)
-        j_hearts.show()
         self.game.tableau[1].append(j_hearts)
         
         self.assertFalse(self.game.move_tableau_to_tableau(1, 0, 1))
 
     def test_move_tableau_empty_col(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
 
         # King to empty
         k_hearts = Card(Suit.HEARTS, Rank.KING)
-        k_hearts.show()
         self.game.tableau[0].append(k_hearts)
 
         success = self.game.move_tableau_to_tableau(0, 1, 1)
@@ -152,7 +167,6 @@ class TestSolitaireGame(unittest.TestCase):
 
         # Non-King to empty
         q_hearts = Card(Suit.HEARTS, Rank.QUEEN)
-        q_hearts.show()
         self.game.tableau[2].append(q_hearts)
 
         success = self.game.move_tableau_to_tableau(2, 3, 1)
@@ -165,17 +179,57 @@ class TestSolitaireGame(unittest.TestCase):
         self.assertFalse(self.game.move_tableau_to_tableau(-1, 0, 1))
         self.assertFalse(self.game.move_tableau_to_tableau(0, 99, 1))
 
+    def test_tableau_move_depths(self):
+        self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
+        hidden = Card(Suit.CLUBS, Rank.TWO)
+        run = [Card(Suit.SPADES, Rank.KING), Card(Suit.HEARTS, Rank.QUEEN), Card(Suit.CLUBS, Rank.JACK)]
+        self.game.tableau[0] = [hidden] + run
+        self.game.face_down[0] = 1
+
+        black_king = Card(Suit.CLUBS, Rank.KING)
+        self.game.tableau[1] = [black_king]
+        black_queen = Card(Suit.SPADES, Rank.QUEEN)
+        self.game.tableau[2] = [black_queen]
+
+        # Whole run to the empty columns, Q+J onto the black King, nothing onto the black Queen
+        depths = self.game.tableau_move_depths(0)
+        self.assertEqual(depths[1], 2)
+        self.assertNotIn(2, depths)
+        for col in range(3, 7):
+            self.assertEqual(depths[col], 3)
+
+    def test_stack_move_is_in_place(self):
+        self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
+        hidden = Card(Suit.CLUBS, Rank.TWO)
+        self.game.tableau[0] = [hidden, Card(Suit.HEARTS, Rank.QUEEN), Card(Suit.CLUBS, Rank.JACK)]
+        self.game.face_down[0] = 1
+        self.game.tableau[1] = [Card(Suit.SPADES, Rank.KING)]
+        source, dest = self.game.tableau[0], self.game.tableau[1]
+
+        self.assertTrue(self.game.move_tableau_to_tableau(0, 1, 2))
+        # Both columns are the same lists, truncated and extended
+        self.assertIs(self.game.tableau[0], source)
+        self.assertIs(self.game.tableau[1], dest)
+        self.assertEqual(source, [hidden])
+        self.assertEqual(self.game.run_length(0), 1) # Revealed
+        self.assertEqual(self.game.run_length(1), 3)
+        # The snapshot taken for undo is unaffected
+        self.assertTrue(self.game.undo())
+        self.assertEqual(len(self.game.tableau[0]), 3)
+        self.assertEqual(self.game.run_length(0), 2)
+
     # --- Waste to Tableau/Foundation Tests ---
     def test_move_waste_to_tableau(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.game.waste = []
 
         k_spades = Card(Suit.SPADES, Rank.KING)
-        k_spades.show()
         self.game.tableau[0].append(k_spades)
 
         q_hearts = Card(Suit.HEARTS, Rank.QUEEN)
-        q_hearts.show()
         self.game.waste.append(q_hearts)
 
         success = self.game.move_waste_to_tableau(0)
@@ -183,21 +237,29 @@ class TestSolitaireGame(unittest.TestCase):
         self.assertEqual(len(self.game.tableau[0]), 2)
         self.assertEqual(len(self.game.waste), 0)
 
+    def test_last_move(self):
+        self.assertIsNone(self.game.last_move)
+        self.game.draw_from_stock()
+        self.assertEqual(self.game.last_move, ('stock', 0, 'waste', 0, 1))
+
+        # Undo forgets it so the UI doesn't replay it
+        self.game.undo()
+        self.assertIsNone(self.game.last_move)
+
     def test_move_waste_to_tableau_empty(self):
         self.game.waste = []
         self.assertFalse(self.game.move_waste_to_tableau(0))
 
     def test_move_waste_to_tableau_invalid(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.game.waste = []
 
         k_spades = Card(Suit.SPADES, Rank.KING)
-        k_spades.show()
         self.game.tableau[0].append(k_spades)
 
         # Invalid suit
         q_spades = Card(Suit.SPADES, Rank.QUEEN)
-        q_spades.show()
         self.game.waste.append(q_spades)
 
         self.assertFalse(self.game.move_waste_to_tableau(0))
@@ -207,7 +269,6 @@ class TestSolitaireGame(unittest.TestCase):
         self.game.waste = []
 
         a_hearts = Card(Suit.HEARTS, Rank.ACE)
-        a_hearts.show()
         self.game.waste.append(a_hearts)
 
         success = self.game.move_waste_to_foundation(0)
@@ -222,10 +283,10 @@ class TestSolitaireGame(unittest.TestCase):
     # --- Foundation Tests ---
     def test_move_tableau_to_foundation(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.game.foundations = [[] for _ in range(4)]
 
         a_hearts = Card(Suit.HEARTS, Rank.ACE)
-        a_hearts.show()
         self.game.tableau[0].append(a_hearts)
 
         # Move Ace
@@ -235,7 +296,6 @@ class TestSolitaireGame(unittest.TestCase):
 
         # Move Two
         two_hearts = Card(Suit.HEARTS, Rank.TWO)
-        two_hearts.show()
         self.game.tableau[0].append(two_hearts)
 
         success = self.game.move_tableau_to_foundation(0, 0)
@@ -244,10 +304,10 @@ class TestSolitaireGame(unittest.TestCase):
 
     def test_move_tableau_to_foundation_invalid(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.game.foundations = [[] for _ in range(4)]
 
         two_hearts = Card(Suit.HEARTS, Rank.TWO)
-        two_hearts.show()
         self.game.tableau[0].append(two_hearts)
 
         # Cannot move 2 to empty
@@ -255,18 +315,18 @@ class TestSolitaireGame(unittest.TestCase):
 
     def test_move_tableau_to_foundation_empty_col(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.assertFalse(self.game.move_tableau_to_foundation(0, 0))
 
     def test_move_foundation_to_tableau(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.game.foundations = [[] for _ in range(4)]
 
         k_spades = Card(Suit.SPADES, Rank.KING)
-        k_spades.show()
         self.game.tableau[0].append(k_spades)
 
         q_hearts = Card(Suit.HEARTS, Rank.QUEEN)
-        q_hearts.show()
         self.game.foundations[0].append(q_hearts)
 
         success = self.game.move_foundation_to_tableau(0, 0)
@@ -281,16 +341,15 @@ class TestSolitaireGame(unittest.TestCase):
     # --- Auto Move & Win ---
     def test_auto_move_to_foundation(self):
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.game.waste = []
         self.game.foundations = [[] for _ in range(4)]
 
         # Setup: Ace in Waste, Ace in Tableau
         a_hearts = Card(Suit.HEARTS, Rank.ACE)
-        a_hearts.show()
         self.game.waste.append(a_hearts)
 
         a_spades = Card(Suit.SPADES, Rank.ACE)
-        a_spades.show()
         self.game.tableau[0].append(a_spades)
 
         # Should move both
@@ -300,6 +359,73 @@ class TestSolitaireGame(unittest.TestCase):
         count = sum(len(f) for f in self.game.foundations)
         self.assertEqual(count, 2)
 
+    def _setup_trivially_won(self):
+        """Two face-up runs per color pair and nothing left in stock or waste"""
+        self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
+        self.game.foundations = [[] for _ in range(4)]
+        self.game.stock = []
+        self.game.waste = []
+        # Alternating runs King->Ace: hearts/spades in col 0 and 1, diamonds/clubs in col 2 and 3
+        for col, (red, black) in enumerate([(Suit.HEARTS, Suit.SPADES), (Suit.SPADES, Suit.HEARTS),
+                                            (Suit.DIAMONDS, Suit.CLUBS), (Suit.CLUBS, Suit.DIAMONDS)]):
+            for value in range(13, 0, -1):
+                self.game.tableau[col].append(Card(red if value % 2 else black, Rank(value)))
+
+    def test_plan_auto_complete(self):
+        self._setup_trivially_won()
+        plan = self.game.plan_auto_complete()
+        self.assertEqual(len(plan), 52)
+        # Plan is computed without touching the game
+        self.assertEqual(sum(len(f) for f in self.game.foundations), 0)
+
+    def test_plan_auto_complete_not_trivial(self):
+        # Fresh deal still has face-down cards and a full stock
+        self.assertIsNone(self.game.plan_auto_complete())
+
+        self._setup_trivially_won()
+        self.game.face_down[0] = 1
+        self.assertIsNone(self.game.plan_auto_complete())
+
+    def test_plan_auto_complete_blocked_waste(self):
+        self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
+        self.game.foundations = [[] for _ in range(4)]
+        self.game.stock = []
+        a_hearts = Card(Suit.HEARTS, Rank.ACE)
+        two_hearts = Card(Suit.HEARTS, Rank.TWO)
+        # The Two sits on top of the Ace it needs
+        self.game.waste = [a_hearts, two_hearts]
+        self.assertIsNone(self.game.plan_auto_complete())
+
+    def test_auto_complete(self):
+        self._setup_trivially_won()
+        self.game.history = []
+        self.assertTrue(self.game.auto_complete())
+        self.assertTrue(self.game.check_win())
+        self.assertEqual(len(self.game.history), 1)
+
+        # Single undo restores the whole position
+        self.assertTrue(self.game.undo())
+        self.assertEqual(sum(len(f) for f in self.game.foundations), 0)
+        self.assertEqual(len(self.game.tableau[0]), 13)
+
+    # --- Move Generation ---
+    def test_legal_moves_apply(self):
+        for move in self.game.legal_moves():
+            copy = self.game.clone()
+            self.assertTrue(copy.apply_move(move, record_undo=False))
+            self.assertEqual(copy.last_move, move)
+        # Fresh deal can always draw
+        self.assertIn(('stock', 0, 'waste', 0, 1), self.game.legal_moves())
+
+    def test_clone_is_independent(self):
+        copy = self.game.clone()
+        self.assertEqual(copy.state_key(), self.game.state_key())
+        copy.draw_from_stock(record_undo=False)
+        self.assertNotEqual(copy.state_key(), self.game.state_key())
+        self.assertEqual(len(self.game.waste), 0)
+
     # --- Reset / Re-deal Tests ---
     def test_reset_game(self):
         """Test that resetting the game clears state and redeals"""
@@ -346,13 +472,12 @@ class TestSolitaireGame(unittest.TestCase):
     def test_undo_tableau_move(self):
         """Test undoing a card move between tableau columns"""
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
 
         k_spades = Card(Suit.SPADES, Rank.KING)
-        k_spades.show()
         self.game.tableau[0].append(k_spades)
 
         q_hearts = Card(Suit.HEARTS, Rank.QUEEN)
-        q_hearts.show()
         self.game.tableau[1].append(q_hearts)
 
         # Perform move
@@ -364,20 +489,17 @@ class TestSolitaireGame(unittest.TestCase):
 
         # Verify restoration
         self.assertEqual(len(self.game.tableau[1]), 1)
-        restored_card = self.game.tableau[1][0]
-        # Compare properties since objects might be regenerated by deepcopy
-        self.assertEqual(restored_card.rank, q_hearts.rank)
-        self.assertEqual(restored_card.suit, q_hearts.suit)
-        self.assertEqual(restored_card.face_up, q_hearts.face_up)
+        self.assertIs(self.game.tableau[1][0], q_hearts)
+        self.assertTrue(self.game.is_face_up(1, 0))
 
     def test_undo_auto_move(self):
         """Ensure auto-move is treated as a single undoable action"""
         self.game.tableau = [[] for _ in range(7)]
+        self.game.face_down = [0] * 7
         self.game.waste = []
         self.game.foundations = [[] for _ in range(4)]
 
         a_hearts = Card(Suit.HEARTS, Rank.ACE)
-        a_hearts.show()
         self.game.waste.append(a_hearts)
 
         # Perform auto move
@@ -389,6 +511,210 @@ class TestSolitaireGame(unittest.TestCase):
         self.assertEqual(len(self.game.waste), 1)
         self.assertEqual(self.game.waste[0].suit, Suit.HEARTS)
 
+class TestUndoTree(unittest.TestCase):
+    def setUp(self):
+        self.game = SolitaireGame(5)
+
+    def play(self, move):
+        self.assertTrue(self.game.apply_move(move))
+        return self.game.state_key()
+
+    def tableau_moves(self):
+        return [move for move in self.game.legal_moves() if move[0] == 'tableau' and move[2] == 'tableau']
+
+    def test_snapshots_share_unchanged_piles(self):
+        self.game.draw_from_stock()
+        self.game.draw_from_stock()
+        first, second = self.game.history
+        self.assertIs(second['tableau'], first['tableau'])
+        self.assertIs(second['foundations'], first['foundations'])
+        self.assertIsNot(second['stock'], first['stock'])
+
+        self.game.draw_from_stock()
+        self.play(self.tableau_moves()[0] if self.tableau_moves() else ('stock', 0, 'waste', 0, 1))
+        before, after = self.game.history[-1], self.game.snapshot()
+        shared = sum(a is b for a, b in zip(before['tableau'], after['tableau']))
+        self.assertGreaterEqual(shared, 5)
+
+    def test_undo_redo(self):
+        start = self.game.state_key()
+        drawn = self.play(('stock', 0, 'waste', 0, 1))
+        self.assertFalse(self.game.redo()) # Nothing undone yet
+        self.assertTrue(self.game.undo())
+        self.assertEqual(self.game.state_key(), start)
+        self.assertTrue(self.game.redo())
+        self.assertEqual(self.game.state_key(), drawn)
+        self.assertEqual(self.game.moves, 1)
+        self.assertFalse(self.game.redo())
+        self.assertTrue(self.game.undo())
+        self.assertEqual(len(self.game.history), 0)
+
+    def test_branches(self):
+        self.play(('stock', 0, 'waste', 0, 1))
+        line_a = [self.play(('stock', 0, 'waste', 0, 1)) for _ in range(3)]
+        for _ in range(3):
+            self.game.undo()
+        fork = self.game.state_key()
+        move = next(move for move in self.game.legal_moves() if move[2] != 'waste')
+        line_b = self.play(move)
+
+        # Switching from the tip of one line goes to the tip of the other
+        self.assertEqual(self.game.switch_branch(), (1, 2))
+        self.assertEqual(self.game.state_key(), line_a[-1])
+        self.assertEqual(len(self.game.history), 4)
+        self.assertEqual(self.game.switch_branch(), (2, 2))
+        self.assertEqual(self.game.state_key(), line_b)
+
+        # Undo leads back to the fork, redo follows the line switched to
+        self.game.undo()
+        self.assertEqual(self.game.state_key(), fork)
+        self.assertTrue(self.game.redo())
+        self.assertEqual(self.game.state_key(), line_b)
+
+        # Replaying a move already in the tree follows it instead of branching
+        self.game.undo()
+        self.play(('stock', 0, 'waste', 0, 1))
+        self.assertEqual(len(self.game.history[-1].children), 2)
+
+    def test_no_branch_to_switch_to(self):
+        self.assertIsNone(self.game.switch_branch())
+        self.play(('stock', 0, 'waste', 0, 1))
+        self.game.undo()
+        self.assertIsNone(self.game.switch_branch())
+
+    def test_reset_forgets_the_tree(self):
+        self.play(('stock', 0, 'waste', 0, 1))
+        self.game.undo()
+        self.game.reset_game(5)
+        self.assertFalse(self.game.redo())
+
+class TestStockCycle(unittest.TestCase):
+    def first_appearance(self, game):
+        """Draws needed for each stock and waste card, found by drawing."""
+        game = game.clone()
+        first = {}
+        for draws in range(len(game.stock) + len(game.waste) + 2):
+            if game.waste and game.waste[-1] not in first:
+                first[game.waste[-1]] = draws
+            game.draw_from_stock(record_undo=False)
+        return first
+
+    def test_draws_match_drawing(self):
+        game = SolitaireGame(11)
+        rng = random.Random(11)
+        for _ in range(120):
+            first = self.first_appearance(game)
+            self.assertEqual({card: game.stock_draws(card) for card in first}, first)
+            for card, draws in first.items():
+                self.assertIs(game.card_after_draws(draws), card)
+            move = rng.choice(game.legal_moves() + game.stock_moves())
+            self.assertTrue(game.apply_move(move, record_undo=False))
+        self.assertIsNone(game.stock_draws(next(card for column in game.tableau for card in column)))
+
+    def test_index_is_updated_not_rebuilt(self):
+        game = SolitaireGame(2)
+        index = game._stock_cycle()
+        game.draw_from_stock()
+        game.draw_from_stock()
+        self.assertIs(game._stock_cycle(), index)
+        self.assertEqual(game.stock_draws(game.waste[0]), len(game.stock) + 2)
+        game.undo() # Piles replaced: rebuilt
+        self.assertEqual(game.stock_draws(game.waste[0]), 0)
+
+    def test_stock_moves_play_cards_from_anywhere_in_the_cycle(self):
+        game = SolitaireGame(0)
+        game.tableau = [[] for _ in range(7)]
+        game.face_down = [0] * 7
+        game.foundations = [[] for _ in range(4)]
+        ace, queen = Card(Suit.HEARTS, Rank.ACE), Card(Suit.SPADES, Rank.QUEEN)
+        game.tableau[0] = [Card(Suit.HEARTS, Rank.KING)]
+        rest = [card for card in CARDS if card not in (ace, queen, game.tableau[0][0])]
+        game.waste = [queen] + rest[:10] # The Queen only comes up again after a recycle
+        game.stock = rest[10:20] + [ace] + rest[20:]
+        moves = game.stock_moves()
+        ace_draws = len(game.stock) - 10
+        queen_draws = len(game.stock) + 2
+        self.assertIn(('waste', ace_draws, 'foundation', 0, 1), moves)
+        self.assertIn(('waste', queen_draws, 'tableau', 0, 1), moves)
+        self.assertIn(('waste', queen_draws, 'tableau', 0, 1), game.macro_moves())
+        self.assertFalse([move for move in game.macro_moves() if move[0] == 'stock' or move[2] == 'stock'])
+
+        moves_before = game.moves
+        self.assertTrue(game.apply_move(('waste', queen_draws, 'tableau', 0, 1)))
+        self.assertEqual(game.tableau[0][-1], queen)
+        self.assertEqual(game.moves, moves_before + queen_draws)
+        self.assertEqual(len(game.history), 1) # One undo step
+        game.undo()
+        self.assertEqual(game.waste[0], queen)
+        # A macro move whose card doesn't fit changes nothing
+        self.assertFalse(game.apply_move(('waste', 1, 'tableau', 0, 1)))
+        self.assertEqual(game.history, [])
+
+class TestNotation(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(3)
+        for seed in range(20):
+            game = SolitaireGame(seed)
+            for _ in range(120):
+                text = game.to_notation()
+                other = SolitaireGame.from_notation(text)
+                self.assertEqual(other.state_key(), game.state_key())
+                self.assertEqual((other.score, other.moves), (game.score, game.moves))
+                self.assertEqual(other.to_notation(), text)
+                moves = game.legal_moves()
+                if not moves:
+                    break
+                game.apply_move(rng.choice(moves))
+
+    def test_fixture(self):
+        text = "|Ks/|Kh/|/|/|/|/| Jh/Kd/Kc/Qs - Qh 120 300"
+        game = SolitaireGame.from_notation(text)
+        self.assertEqual(game.tableau[0], [Card(Suit.SPADES, Rank.KING)])
+        self.assertEqual(len(game.foundations[0]), 11)
+        self.assertEqual(game.foundations[0][-1], Card(Suit.HEARTS, Rank.JACK))
+        self.assertEqual(game.score, 120)
+        self.assertEqual(game.waste, [Card(Suit.HEARTS, Rank.QUEEN)])
+        self.assertEqual(len(game.plan_auto_complete()), 3)
+
+        # A position read from text can still be re-dealt
+        game.reset_game(7)
+        self.assertEqual(game.tableau, SolitaireGame(7).tableau)
+
+    def test_face_down_split(self):
+        game = SolitaireGame(1)
+        columns = game.to_notation().split()[0].split('/')
+        self.assertEqual([column.index('|') // 2 for column in columns], list(range(7)))
+
+    def test_malformed(self):
+        good = SolitaireGame(2).to_notation()
+        fields = good.split()
+        for text in ["", good + " 1", good.replace('|', '', 1), good.replace('/', ' ', 1),
+                     good[:-1] + "x", good.replace(fields[2], fields[2][2:]), # Missing a card
+                     good.replace(fields[2], fields[2][:-2] + fields[2][:2])]: # Duplicate
+            with self.assertRaises(ValueError):
+                SolitaireGame.from_notation(text)
+
+    def test_unreachable(self):
+        for text in ["|KsQs/|Kh/|/|/|/|/| Jh/Kd/Kc/Js - Qh 120 300", # Same color
+                     "|QhKs/|Kh/|/|/|/|/| Jh/Kd/Kc/Qs - - 120 300", # Not descending
+                     "Ks|/|Kh/|/|/|/|/| Jh/Kd/Kc/Qs - Qh 120 300", # Nothing face up
+                     "|Ks/|Kh/|/|/|/|/| Jh/Kd/Kc/Qs - Qh -5 300",
+                     "|Ks/|Kh/|/|/|/|/| Jh/Kd/Kc/Qs - Qh 120 -1"]:
+            with self.assertRaises(ValueError):
+                SolitaireGame.from_notation(text)
+        # A face-down card may be anything
+        game = SolitaireGame.from_notation("Qh|Ks/|Kh/|/|/|/|/| Jh/Kd/Kc/Qs - - 120 300")
+        self.assertEqual(game.run_length(0), 1)
+
+    def test_long_runs(self):
+        # Every step of a run is checked, whichever card it starts at
+        text = "|KsQhJcTh9c/|KhQcJhTc9h/|/|/|/|/| 8h/Kd/8c/8s Kc9sTsJsQs - 0 0"
+        self.assertEqual(SolitaireGame.from_notation(text).run_length(0), 5)
+        for a, b in [('Ks', 'Kh'), ('Qh', 'Qc'), ('Th', 'Tc'), ('9c', '9h')]:
+            swapped = text.replace(a, '__').replace(b, a).replace('__', b)
+            with self.assertRaises(ValueError):
+                SolitaireGame.from_notation(swapped)
+
 class TestScoreManager(unittest.TestCase):
     def setUp(self):
         # Create a temporary directory
@@ -438,5 +764,22 @@ class TestScoreManager(unittest.TestCase):
         # Lowest in top 10 should be 20
         self.assertEqual(scores[-1]['score'], 20)
 
+    def test_daily_scores_kept_separately(self):
+        manager = ScoreManager()
+        for i in range(12):
+            manager.save_score(i * 10, i + 5)
+        manager.save_score(5, 99, mode='daily')
+
+        self.assertEqual(len(manager.get_high_scores()), 10)
+        daily = manager.get_high_scores('daily')
+        self.assertEqual(len(daily), 1)
+        self.assertEqual(daily[0]['moves'], 99)
+
+    def test_untagged_scores_are_random_deals(self):
+        manager = ScoreManager()
+        manager.scores = [{"score": 10, "moves": 3, "date": "2024-01-01 00:00:00"}]
+        self.assertEqual(len(manager.get_high_scores()), 1)
+        self.assertEqual(manager.get_high_scores('daily'), [])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from game_logic import FreeCellGame, SolitaireGame, SpiderGame
+from layout import HitIndex, Layout, MIN_HEIGHT, MIN_WIDTH
+
+class TestLayout(unittest.TestCase):
+    def test_card_size_follows_terminal(self):
+        self.assertEqual(Layout(MIN_HEIGHT, MIN_WIDTH).size, 'compact')
+        self.assertEqual(Layout(40, 60).size, 'normal')
+        self.assertEqual(Layout(31, 60).size, 'compact')
+        self.assertEqual(Layout(60, 120).size, 'large')
+        self.assertTrue(Layout.fits(MIN_HEIGHT, MIN_WIDTH))
+        self.assertFalse(Layout.fits(MIN_HEIGHT - 1, MIN_WIDTH))
+
+    def test_normal_layout_matches_classic_positions(self):
+        layout = Layout(40, 60)
+        self.assertEqual(layout.origins[('stock', 0)], (1, 2))
+        self.assertEqual(layout.origins[('waste', 0)], (1, 10))
+        self.assertEqual(layout.origins[('foundation', 0)], (1, 26))
+        self.assertEqual(layout.origins[('tableau', 6)], (7, 50))
+        self.assertEqual(layout.card_offsets(7, 6), (0, 1, 2, 3, 4, 5, 6))
+
+    def test_tall_columns_are_compressed(self):
+        layout = Layout(32, 60)
+        self.assertEqual(layout.size, 'normal')
+        offsets = layout.card_offsets(19, 6)
+        self.assertEqual(len(offsets), 19)
+        # Face-down cards collapse onto one line
+        self.assertEqual(offsets[:6], (0,) * 6)
+        # Cursor line below the last card still clears the status line
+        self.assertLess(layout.tableau_y + offsets[-1] + layout.card_height, layout.info_y)
+
+    def test_offsets_are_memoized(self):
+        layout = Layout(40, 60)
+        self.assertIs(layout.card_offsets(10, 3), layout.card_offsets(10, 3))
+
+    def test_hit_index_top_row(self):
+        game = SolitaireGame()
+        index = HitIndex(Layout(40, 60), game)
+        self.assertEqual(index.lookup(1, 2), (0, 0, 23)) # Stock top card
+        self.assertEqual(index.lookup(3, 12), (0, 1, -1)) # Empty waste
+        self.assertIsNone(index.lookup(3, 20)) # Gap above tableau 2
+        self.assertEqual(index.lookup(5, 26), (0, 3, -1))
+        self.assertIsNone(index.lookup(6, 2)) # Between rows
+
+    def test_variant_layouts(self):
+        layout = Layout(40, 120, SpiderGame.NUM_COLUMNS, SpiderGame.TOP_ROW)
+        self.assertEqual(layout.size, 'normal') # Ten columns don't fit large cards
+        self.assertEqual(layout.origins[('foundation', 7)], (1, 74))
+        self.assertEqual(layout.origins[('tableau', 9)], (7, 74))
+        self.assertFalse(Layout.fits(MIN_HEIGHT, MIN_WIDTH, SpiderGame.NUM_COLUMNS))
+
+        game = FreeCellGame()
+        index = HitIndex(Layout(40, 70, game.NUM_COLUMNS, game.TOP_ROW), game)
+        self.assertEqual(index.lookup(1, 2), (0, 0, -1)) # Empty free cell
+        self.assertEqual(index.lookup(1, 58), (0, 7, -1)) # Empty foundation
+
+    def test_hit_index_tableau_cards(self):
+        game = SolitaireGame()
+        layout = Layout(40, 60)
+        index = HitIndex(layout, game)
+        # Column 6 has 7 cards, each owning one row except the last
+        for card_idx in range(6):
+            self.assertEqual(index.lookup(7 + card_idx, 50), (1, 6, card_idx))
+        for y in range(13, 18):
+            self.assertEqual(index.lookup(y, 56), (1, 6, 6))
+        self.assertIsNone(index.lookup(18, 50))
+        self.assertIsNone(index.lookup(8, 9)) # Between columns
+
+        game.tableau[0] = []
+        index = HitIndex(layout, game)
+        self.assertEqual(index.lookup(7, 2), (1, 0, -1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import gzip
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from leaderboard import TopScores, external_sort, merge_scores, rank_key, read_scores
+
+def entry(score, moves=100, date='2026-01-01 10:00:00', mode='random'):
+    return {'score': score, 'moves': moves, 'date': date, 'mode': mode}
+
+class TestLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_reads_every_format(self):
+        rows = [entry(i, date=f'2026-01-01 10:00:{i:02d}') for i in range(5)]
+        with open(self.path('a.json'), 'w') as f:
+            json.dump(rows, f, indent=2)
+        with gzip.open(self.path('b.jsonl.gz'), 'wt') as f:
+            f.write(''.join(json.dumps(row) + '\n' for row in rows))
+        with tarfile.open(self.path('c.tar.gz'), 'w:gz') as archive:
+            data = json.dumps(rows).encode()
+            info = tarfile.TarInfo('home/highscores.json')
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        for name in ('a.json', 'b.jsonl.gz', 'c.tar.gz'):
+            self.assertEqual(list(read_scores(self.path(name))), rows)
+
+    def test_streams_values_across_chunks(self):
+        import leaderboard
+        rows = [entry(i, mode='é' * (i % 7)) for i in range(300)]
+        with open(self.path('big.json'), 'w') as f:
+            json.dump(rows, f)
+        chunk, leaderboard.CHUNK = leaderboard.CHUNK, 7
+        try:
+            self.assertEqual(list(read_scores(self.path('big.json'))), rows)
+        finally:
+            leaderboard.CHUNK = chunk
+
+    def test_bad_entries_are_skipped(self):
+        with open(self.path('bad.json'), 'w') as f:
+            json.dump([entry(5), {'score': 'lots'}, [1, 2], entry(3)], f)
+        stats = {}
+        self.assertEqual([row['score'] for row in read_scores(self.path('bad.json'), stats)], [5, 3])
+        self.assertEqual(stats['skipped'], 2)
+
+    def test_top_scores_keeps_best_distinct_per_mode(self):
+        best = TopScores(top=3)
+        for score in [5, 9, 9, 1, 7, 9, 8, 2]:
+            best.add(entry(score))
+        best.add(entry(4, mode='daily'))
+        self.assertEqual([(row['mode'], row['score']) for row in best.scores()],
+                         [('random', 9), ('random', 8), ('random', 7), ('daily', 4)])
+        self.assertEqual(best.duplicates, 2)
+
+    def test_external_sort_matches_sorted(self):
+        rows = [entry(i * 37 % 101, moves=i % 5, mode='ab'[i % 2]) for i in range(500)] * 2
+        keys = list(external_sort(iter(rows), self.dir.name, run_rows=16, fan_in=3))
+        self.assertEqual(keys, sorted(set(map(rank_key, rows))))
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_merge_with_ranking(self):
+        with open(self.path('one.json'), 'w') as f:
+            json.dump([entry(10), entry(30), entry(20, mode='daily')], f)
+        with open(self.path('two.json'), 'w') as f:
+            json.dump([entry(30), entry(40)], f)
+        paths = [self.path('one.json'), self.path('two.json')]
+        stats = merge_scores(paths, top=2, ranked_path=self.path('ranked.jsonl'), run_rows=2)
+        self.assertEqual(stats['rows'], 5)
+        self.assertEqual(stats['duplicates'], 1)
+        self.assertEqual([row['score'] for row in stats['scores']], [40, 30, 20])
+        with open(self.path('ranked.jsonl')) as f:
+            ranked = [json.loads(line) for line in f]
+        self.assertEqual([(row['mode'], row['score']) for row in ranked],
+                         [('daily', 20), ('random', 40), ('random', 30), ('random', 10)])
+        self.assertEqual(merge_scores(paths, top=2)['scores'], stats['scores'])
+
+if __name__ == '__main__':
+    unittest.main()
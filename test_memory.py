@@ -0,0 +1,109 @@
+import gc
+import tracemalloc
+import unittest
+from unittest import mock
+from game_logic import SolitaireGame
+from memory import MemoryMonitor, deep_size, peak_rss
+
+def play_draws(game, count):
+    for _ in range(count):
+        game.draw_from_stock()
+
+class TestHistoryCompaction(unittest.TestCase):
+    def test_undo_through_packed_snapshots(self):
+        game = SolitaireGame(7)
+        keys = []
+        for _ in range(30):
+            keys.append(game.state_key())
+            game.draw_from_stock()
+
+        self.assertEqual(game.compact_history(keep_recent=5), 25)
+        self.assertEqual(game.compact_history(keep_recent=5), 0)
+        for key in reversed(keys):
+            self.assertTrue(game.undo())
+            self.assertEqual(game.state_key(), key)
+        self.assertEqual(game.moves, 0)
+
+    def test_packed_history_is_smaller(self):
+        game = SolitaireGame(7)
+        play_draws(game, 20)
+        before = deep_size(game.history)
+        game.compact_history(keep_recent=0)
+        # Snapshots share unchanged piles, but packing still saves most of it
+        self.assertLess(deep_size(game.history) * 3, before)
+
+class TestMemoryMonitor(unittest.TestCase):
+    def setUp(self):
+        self.monitor = MemoryMonitor(soft_cap=0, keep_recent=3)
+        tracemalloc.start() # Only for the allocation tests; the monitor doesn't trace
+        self.addCleanup(tracemalloc.stop)
+
+    def test_soft_cap_compacts_history(self):
+        game = SolitaireGame(3)
+        play_draws(game, 10)
+        self.assertTrue(self.monitor.check(game))
+        self.assertEqual(sum(isinstance(s, dict) for s in game.history), 3)
+        self.assertFalse(self.monitor.check(game))
+        self.assertEqual(self.monitor.compactions, 1)
+
+    def test_soft_cap_counts_only_history(self):
+        monitor = MemoryMonitor(soft_cap=64 * 1024, keep_recent=3)
+        other = bytearray(16 * 1024 * 1024) # As a background search might hold
+        game = SolitaireGame(3)
+        play_draws(game, 10)
+        self.assertFalse(monitor.check(game))
+        self.assertLess(monitor.history_size, 64 * 1024)
+        del other
+
+    def test_report(self):
+        game = SolitaireGame(3)
+        play_draws(game, 4)
+        sizes = self.monitor.breakdown(game)
+        self.assertGreater(sizes['history'], 0)
+        self.assertGreater(sizes['cards'], 0)
+        self.assertTrue(any(line.startswith('history') for line in self.monitor.report(game)))
+        self.assertFalse(any('--trace-memory' in line for line in self.monitor.report(game)))
+        tracemalloc.stop()
+        self.assertIn("  (run with --trace-memory to see them)", self.monitor.report(game))
+
+    def test_peak_rss_in_bytes(self):
+        with mock.patch('resource.getrusage') as getrusage:
+            getrusage.return_value.ru_maxrss = 2048
+            with mock.patch('sys.platform', 'darwin'):
+                self.assertEqual(peak_rss(), 2048)
+            with mock.patch('sys.platform', 'linux'):
+                self.assertEqual(peak_rss(), 2048 * 1024)
+
+    def test_redeal_allocates_almost_nothing(self):
+        game = SolitaireGame(0)
+        game.reset_game(1) # Let the piles reach full capacity
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        for seed in range(100):
+            game.reset_game(seed)
+        current, peak = tracemalloc.get_traced_memory()
+        self.assertLess(current - before, 1024)
+        self.assertLess(peak - before, 4096)
+
+    def test_soak_memory_stays_flat(self):
+        """Thousands of deals in one process must not leave memory behind."""
+        game = SolitaireGame(0)
+        monitor = MemoryMonitor(soft_cap=1024 * 1024)
+
+        def play(seeds):
+            for seed in seeds:
+                game.reset_game(seed)
+                play_draws(game, 2)
+                game.undo()
+                monitor.check(game)
+
+        play(range(100)) # Warm up caches and allocator pools
+        gc.collect() # Undo tree nodes link to each other, so only gc frees them
+        baseline = tracemalloc.get_traced_memory()[0]
+        play(range(100, 5100))
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+        self.assertLess(growth, 64 * 1024)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from game_logic import SolitaireGame
+from parallel_solver import ParallelSolver, SharedTable, fingerprint
+from test_solver import dead_end_game
+
+class TestSharedTable(unittest.TestCase):
+    def setUp(self):
+        self.table = SharedTable(slots=8)
+
+    def tearDown(self):
+        self.table.close(unlink=True)
+
+    def test_add_reports_new_positions(self):
+        self.assertTrue(self.table.add(12345))
+        self.assertFalse(self.table.add(12345))
+        # Same home slot, different position
+        self.assertTrue(self.table.add(12345 + 8))
+        self.assertFalse(self.table.add(12345 + 8))
+
+    def test_full_neighbourhood_forgets_oldest(self):
+        for i in range(SharedTable.PROBES + 1):
+            self.assertTrue(self.table.add(3 + 8 * i))
+        self.assertTrue(self.table.add(3)) # Overwritten, so new again
+
+    def test_fingerprint_ignores_history(self):
+        game = SolitaireGame(3)
+        copy = SolitaireGame.from_notation(game.to_notation())
+        self.assertEqual(fingerprint(game), fingerprint(copy))
+        self.assertNotEqual(fingerprint(game), fingerprint(SolitaireGame(4)))
+
+class TestParallelSolver(unittest.TestCase):
+    def test_winning_line_replays(self):
+        game = SolitaireGame(10)
+        solver = ParallelSolver(workers=2, node_limit=20000)
+        line = solver.solve(game)
+        self.assertIsNotNone(line)
+        self.assertGreater(solver.nodes, 0)
+        for move in line:
+            self.assertTrue(game.apply_move(move))
+        self.assertTrue(game.check_win())
+
+    def test_dead_end_is_unsolvable(self):
+        for workers in (1, 3):
+            self.assertIsNone(ParallelSolver(workers).solve(dead_end_game()))
+
+    def test_node_limit(self):
+        solver = ParallelSolver(workers=2, node_limit=500)
+        self.assertIsNone(solver.solve(SolitaireGame(4)))
+        self.assertLess(solver.nodes, 500 + 2 * 64)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import cProfile
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from freecell import FreeCellGame
+from game_logic import SolitaireGame
+from profiling import SamplingProfiler, cprofile_report, is_tracked
+
+def draw_game(stop, started=None):
+    # Stands in for Renderer.draw_game: tracked by name, and always on the stack
+    if started:
+        started.set()
+    while not stop.is_set():
+        sum(range(1000))
+
+def busy_game(stop, started=None):
+    draw_game(stop, started)
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_samples_other_thread(self):
+        stop, started = threading.Event(), threading.Event()
+        worker = threading.Thread(target=busy_game, args=(stop, started))
+        worker.start()
+        started.wait()
+        profiler = SamplingProfiler(interval=0.001, thread_id=worker.ident)
+        for _ in range(50):
+            profiler.sample()
+        stop.set()
+        worker.join()
+
+        self.assertEqual(profiler.samples, 50)
+        totals = profiler.function_totals()
+        self.assertEqual(totals.get('draw_game'), 50)
+        self.assertNotIn('busy_game', totals)
+
+        path = os.path.join(self.test_dir, 'stacks.folded')
+        profiler.write_collapsed(path)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in lines), 50)
+        self.assertTrue(all('busy_game (test_profiling.py);draw_game (test_profiling.py)' in line for line in lines))
+
+    def test_background_thread(self):
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        stop = threading.Event()
+        threading.Timer(0.05, stop.set).start()
+        busy_game(stop)
+        profiler.stop()
+        self.assertGreater(profiler.samples, 0)
+        self.assertIn('draw_game', profiler.report())
+
+class TestCProfileReport(unittest.TestCase):
+    def test_tracked_functions_only(self):
+        self.assertTrue(is_tracked('/x/game_logic.py', 'move_waste_to_foundation'))
+        self.assertTrue(is_tracked('/x/freecell.py', 'apply_move'))
+        self.assertTrue(is_tracked('/x/spider.py', 'draw_from_stock'))
+        self.assertFalse(is_tracked('/x/solitaire.py', 'move_selection'))
+        self.assertFalse(is_tracked('/x/solver.py', 'apply_move'))
+
+        profile = cProfile.Profile()
+        game = SolitaireGame(1)
+        profile.runcall(game.save_state)
+        report = cprofile_report(profile)
+        self.assertIn('save_state', report)
+        self.assertNotIn('deepcopy', report)
+
+        profile = cProfile.Profile()
+        game = FreeCellGame(1)
+        profile.runcall(game.apply_move, game.legal_moves()[0])
+        self.assertIn('apply_move', cprofile_report(profile))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import random
+import unittest
+from game_logic import SolitaireGame
+from rl_env import (COLUMN_SLOTS, FOUNDATION_OFFSET, HIDDEN, NUM_ACTIONS, OBS_SIZE, STOCK_SIZE, WASTE_OFFSET,
+                    WASTE_SIZE, Buffers, KlondikeEnv, SubprocVectorEnv, VectorEnv, action_of, benchmark,
+                    encode_observation, legal_actions)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def random_actions(seed, mask_rows):
+    """A seeded random legal action for each mask row."""
+    rng = random.Random(seed)
+    return [rng.choice([i for i, legal in enumerate(row) if legal]) for row in mask_rows]
+
+class TestEncoding(unittest.TestCase):
+    def test_every_legal_move_has_its_own_action(self):
+        game = SolitaireGame(3)
+        rng = random.Random(3)
+        for _ in range(300):
+            moves = game.legal_moves()
+            if not moves:
+                break
+            actions = legal_actions(game)
+            self.assertEqual(len(actions), len(moves))
+            self.assertTrue(all(0 <= action < NUM_ACTIONS for action in actions))
+            self.assertEqual(sorted(actions), sorted(map(action_of, moves)))
+            game.apply_move(rng.choice(moves), record_undo=False)
+
+    def test_observation_of_a_deal(self):
+        game = SolitaireGame(0)
+        out = bytearray(OBS_SIZE + 2)
+        encode_observation(game, out, 1)
+        obs = out[1:-1]
+        for col in range(7):
+            column = obs[col * COLUMN_SLOTS:(col + 1) * COLUMN_SLOTS]
+            self.assertEqual(column[:col], bytes([HIDDEN]) * col)
+            self.assertEqual(column[col], game.tableau[col][-1].index + 1)
+            self.assertFalse(any(column[col + 1:]))
+        self.assertFalse(any(obs[FOUNDATION_OFFSET:WASTE_OFFSET + 1]))
+        self.assertEqual((obs[WASTE_SIZE], obs[STOCK_SIZE]), (0, 24))
+        self.assertEqual((out[0], out[-1]), (0, 0)) # Nothing written outside
+
+    def test_play_writes_buffers_without_numpy(self):
+        env = KlondikeEnv(max_steps=200)
+        env.deal(5)
+        with self.assertRaises(ValueError):
+            env.play(next(a for a in range(NUM_ACTIONS) if a not in env.legal))
+        rng = random.Random(5)
+        total = 0
+        terminated = truncated = False
+        while not (terminated or truncated):
+            reward, terminated, truncated = env.play(rng.choice(list(env.legal)))
+            total += reward
+            mask = env.buffers.mask
+            self.assertEqual({a for a in range(NUM_ACTIONS) if mask[a]}, set(env.legal))
+        self.assertEqual(total, sum(map(len, env.game.foundations)))
+        self.assertLessEqual(env.steps, 200)
+        expected = bytearray(OBS_SIZE)
+        encode_observation(env.game, expected)
+        self.assertEqual(bytes(env.buffers.obs), bytes(expected))
+
+    def test_envs_share_buffers_without_numpy(self):
+        buffers = Buffers(2)
+        envs = [KlondikeEnv(max_steps=30, buffers=buffers, slot=slot) for slot in range(2)]
+        legal, moves = envs[1].legal, envs[1].moves
+        rng = random.Random(2)
+        for env in envs:
+            env.deal(env.slot)
+        for _ in range(100):
+            for env in envs:
+                _, terminated, truncated = env.play(rng.choice(env.legal))
+                if terminated or truncated:
+                    env.deal(rng.getrandbits(32))
+            for env in envs:
+                mask = buffers.mask[env.slot * NUM_ACTIONS:(env.slot + 1) * NUM_ACTIONS]
+                self.assertEqual({a for a in range(NUM_ACTIONS) if mask[a]}, set(env.legal))
+                self.assertEqual(dict(zip(env.legal, map(env.moves.__getitem__, env.legal))),
+                                 legal_actions(env.game))
+                self.assertEqual(sum(move is not None for move in env.moves), len(env.legal))
+                expected = bytearray(OBS_SIZE)
+                encode_observation(env.game, expected)
+                self.assertEqual(bytes(buffers.obs[env.slot * OBS_SIZE:(env.slot + 1) * OBS_SIZE]),
+                                 bytes(expected))
+        # Rewritten in place, never replaced
+        self.assertIs(envs[1].legal, legal)
+        self.assertIs(envs[1].moves, moves)
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestEnvironments(unittest.TestCase):
+    def test_single_env(self):
+        env = KlondikeEnv()
+        obs, info = env.reset(0)
+        self.assertEqual((obs.shape, obs.dtype), ((OBS_SIZE,), numpy.uint8))
+        self.assertEqual(info['action_mask'].shape, (NUM_ACTIONS,))
+        action = int(numpy.flatnonzero(info['action_mask'])[0])
+        next_obs, reward, terminated, truncated, next_info = env.step(action)
+        self.assertIs(next_obs, obs) # Rewritten in place
+        self.assertIs(next_info['action_mask'], info['action_mask'])
+        self.assertIsInstance(reward, float)
+        self.assertFalse(terminated or truncated)
+
+    def test_vector_envs_agree(self):
+        # Short episodes, so several environments are dealt new games
+        with VectorEnv(6, max_steps=15) as local, SubprocVectorEnv(6, workers=2, max_steps=15) as remote:
+            obs, info = local.reset(7)
+            remote_obs, remote_info = remote.reset(7)
+            self.assertTrue((obs == remote_obs).all())
+            finished = 0
+            for step in range(40):
+                actions = numpy.array(random_actions(step, info['action_mask']))
+                obs, reward, terminated, truncated, info = local.step(actions)
+                remote_obs, remote_reward, remote_terminated, remote_truncated, remote_info = remote.step(actions)
+                self.assertTrue((obs == remote_obs).all())
+                self.assertTrue((info['action_mask'] == remote_info['action_mask']).all())
+                self.assertTrue((reward == remote_reward).all())
+                self.assertTrue((truncated == remote_truncated).all())
+                finished += int(terminated.sum() + truncated.sum())
+            self.assertGreaterEqual(finished, 6)
+
+    def test_illegal_action_in_a_worker(self):
+        with SubprocVectorEnv(2, workers=2) as vector:
+            _, info = vector.reset(0)
+            actions = [int(numpy.flatnonzero(~row)[0]) for row in info['action_mask']]
+            with self.assertRaises(ValueError):
+                vector.step(numpy.array(actions))
+
+    def test_benchmark(self):
+        rows = benchmark(num_envs=4, steps=40, workers=2)
+        self.assertEqual([row['env'] for row in rows], ['single', 'vector', 'subprocess'])
+        self.assertTrue(all(row['steps'] == 40 and row['time'] > 0 for row in rows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+import curses
+import os
+import re
+import unittest
+from collections import deque
+from game_logic import FreeCellGame, SolitaireGame, SpiderGame
+from layout import MIN_HEIGHT, MIN_WIDTH
+from render_bench import measure, tall_column_game, typical_frames, worst_case_frames
+from screen import BEGIN_SYNC, END_SYNC, AnsiGrid, AnsiScreen, Grid, HeadlessScreen, probe_sync, sgr
+from solitaire import Selection, select_pile
+from ui import Renderer
+
+# Expected frames, one file per test frame. UPDATE_GOLDEN=1 rewrites them.
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+def frame_text(grid: Grid) -> str:
+    """A frame as text: its characters, then its attributes with each
+    distinct value drawn as one letter (listed in the legend), '.' for none."""
+    attrs = sorted({attr for row in grid.attrs for attr in row} - {0})
+    letters = dict(zip(attrs, 'abcdefghijklmnopqrstuvwxyz'))
+    letters[0] = '.'
+    legend = ' '.join(f'{letters[attr]}={attr:#x}' for attr in attrs)
+    lines = [f'size {grid.height}x{grid.width}', f'legend {legend}']
+    lines += [f'|{"".join(row).rstrip()}' for row in grid.chars]
+    lines += [f'|{"".join(letters[attr] for attr in row).rstrip(".")}' for row in grid.attrs]
+    return '\n'.join(lines) + '\n'
+
+def render(game, cursor=(1, 0), selection=None, height=40, width=80):
+    screen = HeadlessScreen(height, width)
+    Renderer(screen, type(game)).draw_game(game, cursor, selection)
+    return screen
+
+class TestGrid(unittest.TestCase):
+    def test_put_clips_to_grid(self):
+        grid = Grid(2, 5)
+        grid.put(0, 3, 'abcd', 7)
+        grid.put(1, -2, 'xyz')
+        grid.put(2, 0, 'off')
+        self.assertEqual(grid.lines(), ['   ab', 'z    '])
+        self.assertEqual(grid.attrs[0], [0, 0, 0, 7, 7])
+
+    def test_paste_and_changed_cells(self):
+        grid = Grid(3, 4)
+        base = grid.copy()
+        grid.put(0, 0, 'abcd', 1)
+        grid.put(2, 0, 'wxyz')
+        self.assertEqual(grid.changed_cells(base), 8)
+        grid.paste(base, 0, 1, 1, 9) # Clipped to the grid
+        self.assertEqual(grid.lines(), ['a   ', '    ', 'wxyz'])
+        self.assertEqual(grid.changed_cells(base), 5)
+
+    def test_headless_frames_match_curses_attributes(self):
+        screen = render(SolitaireGame(0))
+        self.assertEqual(screen.frames, 1)
+        self.assertEqual(screen.color_pair(3), 3 << 8)
+
+class WaitingScreen(HeadlessScreen):
+    """Records the key timeout each getch() waits with."""
+    def __init__(self, height, width):
+        super().__init__(height, width)
+        self.delay, self.waits = -1, []
+
+    def timeout(self, delay):
+        self.delay = delay
+
+    def getch(self):
+        self.waits.append(self.delay)
+        return -1
+
+class TestPages(unittest.TestCase):
+    def test_pages_wait_for_a_key_while_polling(self):
+        screen = WaitingScreen(40, 80)
+        renderer = Renderer(screen)
+        screen.timeout(200) # As while a dead-end search runs
+        renderer.draw_high_scores([])
+        renderer.draw_report("MEMORY", ["line"])
+        self.assertEqual(screen.waits, [-1, -1])
+
+    def test_win_message_is_centred(self):
+        game = SolitaireGame(0)
+        for height, width in ((MIN_HEIGHT, MIN_WIDTH), (40, 80), (50, 120)):
+            screen = render(game, height=height, width=width)
+            Renderer(screen).draw_win(game)
+            lines = screen.lines()
+            [row] = [y for y, line in enumerate(lines) if "YOU WIN!" in line]
+            self.assertEqual(row, (height - 5) // 2 + 1)
+            self.assertEqual(lines[row].index("YOU WIN!"), (width - 8) // 2)
+            self.assertIn("Press Q to Quit", lines[row + 2])
+
+class TestGoldenFrames(unittest.TestCase):
+    def check(self, name, screen):
+        path = os.path.join(GOLDEN_DIR, name + '.txt')
+        text = frame_text(screen)
+        if os.environ.get('UPDATE_GOLDEN'):
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(text)
+        with open(path) as f:
+            self.assertEqual(text, f.read(), f"{name} changed; rerun with UPDATE_GOLDEN=1 if that's intended")
+
+    def test_seeded_deals(self):
+        for seed in (0, 7):
+            self.check(f'klondike_seed{seed}', render(SolitaireGame(seed)))
+
+    def test_mid_game_with_selection(self):
+        frames = list(typical_frames(seed=0, max_moves=25))
+        game, cursor, _ = frames[-1]
+        selection = select_pile(game, 1, 0)
+        self.check('klondike_mid_game', render(game, cursor, selection))
+
+    def test_other_variants(self):
+        self.check('freecell_seed0', render(FreeCellGame(0)))
+        self.check('spider_seed0', render(SpiderGame(0), height=50, width=100))
+
+    def test_tallest_column(self):
+        game = tall_column_game()
+        self.check('klondike_tall_column', render(game, (1, 6), Selection(1, 6, 5, 13)))
+        self.check('klondike_tall_column_compact', render(game, (1, 6), None, height=30, width=60))
+
+class Terminal:
+    """Just enough of a terminal to play back what AnsiGrid writes."""
+    COLORS = {(fg, bg): pair for pair, (fg, bg) in {1: (1, 7), 2: (0, 7), 3: (7, 4), 4: (2, 0), 5: (3, 0)}.items()}
+    FLAGS = {1: curses.A_BOLD, 2: curses.A_DIM, 4: curses.A_UNDERLINE, 5: curses.A_BLINK, 7: curses.A_REVERSE}
+
+    def __init__(self, height, width):
+        self.grid = Grid(height, width)
+        self.y = self.x = 0
+        self.flags, self.fg, self.bg = 0, None, None
+
+    def feed(self, data: str):
+        for token in re.findall(r'\x1b\[[\d;?]*[A-Za-z]|[^\x1b]', data):
+            if len(token) == 1:
+                self.grid.put(self.y, self.x, token, self.flags | (self.COLORS.get((self.fg, self.bg), 0) << 8))
+                self.x += 1
+                continue
+            args, command = token[2:-1], token[-1]
+            if command == 'H':
+                y, x = args.split(';')
+                self.y, self.x = int(y) - 1, int(x) - 1
+            elif command == 'C':
+                self.x += int(args)
+            elif command == 'J':
+                self.grid.erase()
+            elif command == 'm':
+                for code in map(int, args.split(';')):
+                    if code == 0:
+                        self.flags, self.fg, self.bg = 0, None, None
+                    elif code in self.FLAGS:
+                        self.flags |= self.FLAGS[code]
+                    elif 30 <= code <= 39:
+                        self.fg = None if code == 39 else code - 30
+                    elif 40 <= code <= 49:
+                        self.bg = None if code == 49 else code - 40
+
+class TestAnsiOutput(unittest.TestCase):
+    def setUp(self):
+        self.read_fd, self.write_fd = os.pipe()
+        self.addCleanup(os.close, self.read_fd)
+        self.addCleanup(os.close, self.write_fd)
+
+    def draw(self, grid, game, cursor=(1, 0), selection=None):
+        Renderer(grid, type(game)).draw_game(game, cursor, selection)
+        return os.read(self.read_fd, 1 << 20).decode()
+
+    def test_frames_play_back_to_the_grid(self):
+        grid = AnsiGrid(40, 80, self.write_fd)
+        terminal = Terminal(40, 80)
+        frames = list(typical_frames(seed=0, max_moves=10))
+        for game, cursor, selection in [frames[0], frames[-1]]:
+            terminal.feed(self.draw(grid, game, cursor, selection))
+            self.assertEqual(terminal.grid.lines(), grid.lines())
+            self.assertEqual(terminal.grid.attrs, grid.attrs)
+        self.assertEqual(grid.writes, 2)
+
+    def test_second_frame_sends_only_changes(self):
+        grid = AnsiGrid(40, 80, self.write_fd)
+        game = SolitaireGame(0)
+        first = self.draw(grid, game)
+        second = self.draw(grid, game, (1, 1))
+        self.assertLess(len(second), len(first) / 10)
+        self.assertNotIn('\x1b[2J', second)
+        grid.refresh() # Nothing changed: nothing is written
+        self.assertEqual(grid.writes, 2)
+
+    def test_sync_wraps_each_frame(self):
+        grid = AnsiGrid(5, 10, self.write_fd, sync=True)
+        grid.put(1, 1, 'ab', 3 << 8)
+        grid.refresh()
+        data = os.read(self.read_fd, 1024).decode()
+        self.assertTrue(data.startswith(BEGIN_SYNC) and data.endswith(END_SYNC))
+
+    def test_attribute_changes_are_merged(self):
+        grid = AnsiGrid(2, 20, self.write_fd)
+        grid.put(0, 0, 'aaaa', 1 << 8)
+        grid.put(0, 4, 'bbbb', curses.A_BOLD | 1 << 8)
+        grid.put(0, 8, 'cccc', 1 << 8)
+        self.assertEqual(grid.frame(), '\x1b[0m\x1b[2J\x1b[1;1H\x1b[31;47maaaa\x1b[1mbbbb\x1b[0;31;47mcccc\x1b[0m')
+        self.assertEqual(sgr(2 << 8, 1 << 8), '\x1b[30m')
+        self.assertEqual(sgr(0, 3 << 8), '\x1b[39;49m')
+        self.assertEqual(sgr(curses.A_BLINK | 1 << 8, 1 << 8), '\x1b[5m')
+
+    def test_probe_sync(self):
+        query_r, query_w = os.pipe()
+        self.addCleanup(os.close, query_r)
+        self.addCleanup(os.close, query_w)
+        for reply, supported in ((b'\x1b[?2026;2$y\x1b[?62;22c', True), (b'\x1b[?62;22c', False),
+                                 (b'\x1b[?2026;0$y\x1b[?1;2c', False), (b'', None)):
+            os.write(self.write_fd, reply)
+            self.assertEqual(probe_sync(self.read_fd, query_w, timeout=0.2), supported)
+            self.assertEqual(os.read(query_r, 1024), b'\x1b[?2026$p\x1b[c')
+
+class KeyWindow:
+    """Stands in for the curses window AnsiScreen reads keys from."""
+    def __init__(self, text):
+        self.keys = [ord(c) for c in text]
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+    def timeout(self, delay):
+        pass
+
+class TestLateProbeReply(unittest.TestCase):
+    def screen(self, text):
+        screen = AnsiScreen.__new__(AnsiScreen)
+        screen.window = KeyWindow(text)
+        screen.keys = deque()
+        screen.delay = -1
+        screen.reply_pending = True
+        return screen
+
+    def test_reply_is_not_read_as_keys(self):
+        screen = self.screen('\x1b[?2026;2$y\x1b[?62;22cq')
+        self.assertEqual(screen.getch(), ord('q'))
+        self.assertFalse(screen.reply_pending)
+
+    def test_other_escapes_are_kept(self):
+        screen = self.screen('\x1b[Ax')
+        self.assertEqual([screen.getch() for _ in range(5)], [27, ord('['), ord('A'), ord('x'), -1])
+        self.assertTrue(screen.reply_pending)
+
+class TestRenderBenchmark(unittest.TestCase):
+    def test_tall_column_game(self):
+        game = tall_column_game()
+        self.assertEqual(len(game.tableau[6]), 19)
+        self.assertEqual(sum(map(len, game.tableau)) + len(game.stock), 52)
+
+    def test_measure_counts_frames_and_changes(self):
+        result = measure(worst_case_frames(rounds=1))
+        self.assertEqual(result['frames'], 26)
+        self.assertGreater(result['cells_per_frame'], 0)
+        self.assertGreater(result['fps'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
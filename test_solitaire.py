@@ -0,0 +1,126 @@
+import unittest
+from game_logic import Card, FreeCellGame, SolitaireGame, SpiderGame, Suit, Rank
+from solitaire import select_pile, move_selection, activate, report_turn, step_cursor, try_auto_move
+from telemetry import EventStream, MemorySink
+
+class TestSelection(unittest.TestCase):
+    def setUp(self):
+        self.game = SolitaireGame()
+        self.game.tableau = [[] for _ in range(7)]
+        hidden = Card(Suit.CLUBS, Rank.TWO)
+        # Column 0: face-down card under 9♠ 8♥ 7♣
+        self.game.tableau[0] = [hidden, Card(Suit.SPADES, Rank.NINE),
+                                Card(Suit.HEARTS, Rank.EIGHT), Card(Suit.CLUBS, Rank.SEVEN)]
+        self.game.tableau[1] = [Card(Suit.CLUBS, Rank.NINE)]
+        self.game.face_down = [1, 0, 0, 0, 0, 0, 0]
+
+    def test_select_substack_by_card(self):
+        selection = select_pile(self.game, 1, 0, 2)
+        self.assertEqual(selection.num_cards, 2)
+        # Face-down cards can't start a substack
+        self.assertIsNone(select_pile(self.game, 1, 0, 0).num_cards)
+        self.assertIsNone(select_pile(self.game, 1, 2))
+
+    def test_move_substack(self):
+        selection = select_pile(self.game, 1, 0, 2)
+        self.assertTrue(move_selection(self.game, selection, 1, 1))
+        self.assertEqual(len(self.game.tableau[0]), 2)
+        self.assertEqual(len(self.game.tableau[1]), 3)
+
+    def test_targets_precomputed_per_depth(self):
+        # 10♥ on column 2 takes the 9♠ run (3 cards), 9♣ on column 1 takes 8♥ 7♣
+        self.game.tableau[2] = [Card(Suit.HEARTS, Rank.TEN)]
+        selection = select_pile(self.game, 1, 0)
+        self.assertEqual(selection.run_length, 3)
+        self.assertEqual(selection.targets[(1, 1)], 2)
+        self.assertEqual(selection.targets[(1, 2)], 3)
+        self.assertEqual(sorted(selection.target_piles()), [(1, 1), (1, 2)])
+
+        # Stepping the depth narrows the highlighted targets
+        self.assertTrue(selection.shallower())
+        self.assertEqual(selection.target_piles(), [(1, 1)])
+        self.assertTrue(selection.shallower())
+        self.assertEqual(selection.target_piles(), [])
+        self.assertFalse(selection.shallower())
+        self.assertTrue(selection.deeper())
+        self.assertTrue(selection.deeper())
+        self.assertFalse(selection.deeper())
+
+    def test_pinned_depth_must_fit(self):
+        selection = select_pile(self.game, 1, 0)
+        selection.num_cards = 1
+        self.assertFalse(move_selection(self.game, selection, 1, 1))
+        self.assertEqual(len(self.game.tableau[1]), 1)
+
+    def test_activate_deals_from_stock(self):
+        self.assertIsNone(activate(self.game, 0, 0, None))
+        self.assertEqual(len(self.game.waste), 1)
+
+class TestVariantControls(unittest.TestCase):
+    def test_free_cell_round_trip(self):
+        game = FreeCellGame(seed=1)
+        top = game.tableau[0][-1]
+        selection = select_pile(game, 1, 0)
+        self.assertIn((0, 2), selection.targets) # Any empty free cell
+        self.assertTrue(move_selection(game, selection, 0, 2))
+        self.assertEqual(game.cells[2], [top])
+        self.assertIsNotNone(select_pile(game, 0, 2))
+        self.assertIsNone(select_pile(game, 0, 3))
+
+    def test_pinned_depth_into_empty_column(self):
+        game = FreeCellGame(seed=1)
+        for col in range(8):
+            game._pop(col, len(game.tableau[col]))
+        for value in (9, 8, 7):
+            game._push(0, Card(Suit.SPADES if value % 2 else Suit.HEARTS, Rank(value)))
+        selection = select_pile(game, 1, 0, 1) # 8♥ 7♠
+        self.assertTrue(move_selection(game, selection, 1, 3))
+        self.assertEqual(len(game.tableau[3]), 2)
+
+    def test_spider_deal_and_auto_move(self):
+        game = SpiderGame(seed=1)
+        self.assertIsNone(activate(game, 0, 0, None))
+        self.assertEqual(len(game.stock), 40)
+        self.assertFalse(try_auto_move(game, 0, 0))
+
+    def test_cursor_skips_gaps(self):
+        game = SolitaireGame()
+        self.assertEqual(step_cursor(game, 0, 1, 1), 3)
+        self.assertEqual(step_cursor(game, 0, 3, -1), 1)
+        self.assertEqual(step_cursor(game, 1, 6, 1), 6)
+        self.assertEqual(step_cursor(SpiderGame(), 0, 0, 1), 2)
+        self.assertEqual(step_cursor(SpiderGame(), 1, 8, 1), 9)
+
+class TestReportTurn(unittest.TestCase):
+    def setUp(self):
+        self.sink = MemorySink()
+        self.events = EventStream(self.sink)
+
+    def report(self, game, turn, selection, cursor):
+        report_turn(self.events, game, turn, selection, cursor)
+        self.events.close()
+        return list(self.sink.events)
+
+    def test_successful_move(self):
+        game = SolitaireGame()
+        turn = (ord(' '), game.moves, game.last_move, None)
+        game.draw_from_stock()
+        [event] = self.report(game, turn, None, (0, 0))
+        self.assertEqual(event['type'], 'draw')
+        self.assertTrue(event['ok'])
+
+    def test_rejected_move(self):
+        game = SolitaireGame()
+        selection = select_pile(game, 1, 6)
+        turn = (ord(' '), game.moves, game.last_move, selection)
+        [event] = self.report(game, turn, None, (0, 3))
+        self.assertFalse(event['ok'])
+        self.assertEqual(event['source'], [1, 6])
+
+    def test_selection_is_not_a_move(self):
+        game = SolitaireGame()
+        turn = (ord(' '), game.moves, game.last_move, None)
+        self.assertEqual(self.report(game, turn, select_pile(game, 1, 6), (1, 6)), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from game_logic import Card, SolitaireGame, Suit, Rank
+from solver import find_progress, ordered_moves, solve
+
+def card(suit, value):
+    return Card(suit, Rank(value))
+
+def dead_end_game():
+    """Aces and Twos buried under Kings and Fives, and a stock that fits nowhere."""
+    game = SolitaireGame()
+    game.tableau = [[] for _ in range(7)]
+    game.face_down = [1] * 7 # Each Ace and Two is face down
+    game.foundations = [[] for _ in range(4)]
+    suits = list(Suit)
+    for i in range(4):
+        game.tableau[i] = [card(suits[i], 1), card(suits[i], 13)]
+    for i in range(4, 7):
+        game.tableau[i] = [card(suits[i - 4], 2), card(suits[i - 4], 5)]
+    game.stock = [card(Suit.HEARTS, 9), card(Suit.CLUBS, 3)]
+    game.waste = []
+    return game
+
+class TestFindProgress(unittest.TestCase):
+    def test_fresh_deal_can_progress(self):
+        game = SolitaireGame()
+        game.tableau[0][-1] = card(Suit.HEARTS, 1)
+        self.assertTrue(find_progress(game))
+
+    def test_dead_end(self):
+        game = dead_end_game()
+        self.assertFalse(find_progress(game))
+        # Search runs on copies
+        self.assertEqual(len(game.stock), 2)
+        self.assertEqual(len(game.waste), 0)
+
+    def test_node_limit(self):
+        game = dead_end_game()
+        # Fits on a black King, which gets nowhere but takes a position to find out
+        game.stock.append(card(Suit.HEARTS, 12))
+        self.assertIsNone(find_progress(game, node_limit=1))
+        self.assertFalse(find_progress(game))
+
+    def test_freeing_a_column(self):
+        game = dead_end_game()
+        # A lone red Queen fits on a black King; only then can a King move
+        # into its column and turn over the Ace under it
+        game.tableau[6] = [card(Suit.HEARTS, 12)]
+        game.face_down[6] = 0
+        self.assertTrue(find_progress(game))
+        self.assertIn(('tableau', 6, 'tableau', 3, 1), ordered_moves(game))
+
+class TestSolve(unittest.TestCase):
+    def test_winning_line_replays(self):
+        game = SolitaireGame(739908000) # First daily candidate for 2026-10-19
+        line = solve(game)
+        self.assertIsNotNone(line)
+        for move in line:
+            game.apply_move(move)
+        self.assertTrue(game.check_win())
+
+    def test_dead_end_is_unsolvable(self):
+        self.assertIsNone(solve(dead_end_game()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import json
+import os
+import selectors
+import socket
+import tempfile
+import time
+import unittest
+from animation import slide_position
+from game_logic import SolitaireGame
+from screen import Grid, HeadlessScreen, row_spans
+from spectate import MAX_QUEUED_FRAMES, Broadcaster, FrameRecorder
+from ui import Renderer
+
+class FakeBroadcaster:
+    def __init__(self):
+        self.frames = []
+
+    def publish(self, size, changed, rows):
+        self.frames.append((size, [json.loads(row) for row in changed], rows))
+
+class TestFrameRecorder(unittest.TestCase):
+    def test_row_spans(self):
+        self.assertEqual(row_spans("ab  cd  ", [1, 1, 0, 0, 2, 2, 0, 0]),
+                         [("ab", 1), ("  ", 0), ("cd", 2)])
+        self.assertEqual(row_spans("    ", [0] * 4), [])
+
+    def test_only_changed_rows_are_published(self):
+        broadcaster = FakeBroadcaster()
+        recorder = FrameRecorder(broadcaster)
+        grid = Grid(3, 10)
+        grid.put(0, 2, "K♠", 5)
+        grid.put(2, 0, "hi", 0)
+        recorder.commit(grid)
+        size, changed, rows = broadcaster.frames[-1]
+        self.assertEqual(size, (3, 10))
+        self.assertEqual(changed, [[0, [["  ", 0], ["K♠", 5]]], [1, []], [2, [["hi", 0]]]])
+        self.assertEqual(len(rows), 3)
+
+        # Redrawing the same frame sends nothing; a change sends its row only
+        grid.erase()
+        grid.put(0, 2, "K♠", 5)
+        grid.put(2, 0, "hi", 0)
+        recorder.commit(grid)
+        self.assertEqual(broadcaster.frames[-1][1], [])
+        grid.erase()
+        grid.put(0, 2, "Q♠", 5)
+        grid.put(2, 0, "hi", 0)
+        recorder.commit(grid)
+        self.assertEqual([row[0] for row in broadcaster.frames[-1][1]], [0])
+
+    def test_animation_frames_are_published(self):
+        broadcaster = FakeBroadcaster()
+        renderer = Renderer(HeadlessScreen(40, 80), recorder=FrameRecorder(broadcaster))
+        game = SolitaireGame(0)
+        game.draw_from_stock()
+        cards, start, end = renderer.begin_animation(game, (0, 1), None)
+        for progress in (0.0, 0.5):
+            renderer.draw_animation_frame(cards, *slide_position(start, end, progress))
+        self.assertEqual(len(broadcaster.frames), 2)
+        # Only the rows the card moved over
+        self.assertLess(len(broadcaster.frames[1][1]), renderer.layout.card_height + 1)
+
+class TestBroadcaster(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'game.sock')
+        self.broadcaster = Broadcaster(self.path)
+        self.recorder = FrameRecorder(self.broadcaster)
+        self.grid = Grid(4, 20)
+
+    def tearDown(self):
+        self.broadcaster.close()
+        os.rmdir(self.dir)
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        sock.settimeout(2)
+        return sock
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 2
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def frame(self, text):
+        self.grid.erase()
+        self.grid.put(1, 0, text, 0)
+        self.recorder.commit(self.grid)
+
+    def read_frames(self, sock, count):
+        data = b''
+        while data.count(b'\n') < count:
+            data += sock.recv(1 << 16)
+        return [json.loads(line) for line in data.splitlines()]
+
+    def test_full_frame_then_diffs(self):
+        self.frame("first")
+        viewer = self.connect()
+        [frame] = self.read_frames(viewer, 1)
+        self.assertTrue(frame['key'])
+        self.assertEqual(frame['size'], [4, 20])
+        self.assertEqual(len(frame['rows']), 4)
+
+        self.frame("second")
+        [frame] = self.read_frames(viewer, 1)
+        self.assertFalse(frame['key'])
+        self.assertEqual(frame['rows'], [[1, [["second", 0]]]])
+        viewer.close()
+
+    def test_dropping_a_viewer_twice(self):
+        self.frame("first")
+        viewer = self.connect()
+        self.read_frames(viewer, 1)
+        spectator = next(iter(self.broadcaster.spectators.values()))
+        viewer.close()
+        self.broadcaster._drop(spectator)
+        self.broadcaster._drop(spectator) # As when a send and a read both fail
+        # The broadcast thread still serves new viewers
+        other = self.connect()
+        [frame] = self.read_frames(other, 1)
+        self.assertTrue(frame['key'])
+        other.close()
+
+    def test_queue_is_bounded(self):
+        self.broadcaster._selector.unregister(self.broadcaster._wake_r) # The thread never wakes
+        for i in range(MAX_QUEUED_FRAMES * 2):
+            self.frame(str(i))
+        self.assertEqual(len(self.broadcaster.frames), MAX_QUEUED_FRAMES)
+        self.assertTrue(self.broadcaster._skipped)
+        self.broadcaster._selector.register(self.broadcaster._wake_r, selectors.EVENT_READ)
+
+    def test_stalled_viewer_drops_frames(self):
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        stalled.connect(self.path)
+        viewer = self.connect()
+        self.wait_for(lambda: self.broadcaster.stats()[0] == 2)
+
+        # Frames big enough to fill the stalled viewer's socket buffer
+        self.grid.resize(40, 200)
+        for i in range(200):
+            self.grid.erase()
+            for y in range(40):
+                self.grid.put(y, 0, f"{i:>4} {y:>3} " * 20, i % 2)
+            self.recorder.commit(self.grid)
+            if i % 20 == 0:
+                viewer.setblocking(False)
+                try:
+                    while viewer.recv(1 << 20):
+                        pass
+                except BlockingIOError:
+                    pass
+        self.wait_for(lambda: self.broadcaster.stats()[2] > 0)
+        stalled_state = next(s for s in self.broadcaster.spectators.values() if s.dropped)
+        self.assertLess(stalled_state.sent, 200)
+
+        # Once it reads again, it is brought back with a full frame
+        stalled.setblocking(False)
+        data = b''
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            try:
+                data += stalled.recv(1 << 20)
+            except BlockingIOError:
+                time.sleep(0.01)
+        last = json.loads(data.splitlines()[-1])
+        self.assertTrue(last['key'])
+        self.assertEqual(last['rows'][0][1][0][0].split()[0], "199")
+        stalled.close()
+        viewer.close()
+
+if __name__ == '__main__':
+    unittest.main()
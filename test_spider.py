@@ -0,0 +1,84 @@
+import unittest
+from game_logic import Card, Rank, Suit
+from spider import SpiderGame, spider_cards
+
+def card(suit, value):
+    return Card(suit, Rank(value))
+
+class TestSpiderGame(unittest.TestCase):
+    def setUp(self):
+        self.game = SpiderGame(seed=1)
+
+    def clear(self):
+        """Empties the table so tests can lay out their own columns."""
+        for col in range(10):
+            self.game.tableau[col].clear()
+            self.game.runs[col].clear()
+            self.game.face_down[col] = 0
+        self.game.empty_columns = 10
+
+    def test_deal(self):
+        self.assertEqual([len(column) for column in self.game.tableau], [6] * 4 + [5] * 6)
+        self.assertEqual(self.game.face_down, [5] * 4 + [4] * 6)
+        self.assertEqual(len(self.game.stock), 50)
+        self.assertEqual(SpiderGame(seed=1).tableau, self.game.tableau)
+
+    def test_suits(self):
+        self.assertEqual(len(set(spider_cards(1))), 13)
+        self.assertEqual(len(set(spider_cards(2))), 26)
+        self.assertEqual(len(spider_cards(4)), 104)
+
+    def test_only_same_suit_runs_move(self):
+        self.clear()
+        for c in (card(Suit.SPADES, 9), card(Suit.HEARTS, 8), card(Suit.HEARTS, 7)):
+            self.game._push(0, c)
+        self.game._push(1, card(Suit.CLUBS, 9))
+        self.game.empty_columns = 8
+        self.assertEqual(self.game.runs[0], [1, 1, 2])
+        # Any suit can be built on: 8♥ 7♥ goes onto 9♣, but 9♠ stays behind
+        self.assertEqual(self.game.tableau_move_depths(0)[1], 2)
+        self.assertFalse(self.game.apply_move(('tableau', 0, 'tableau', 1, 3)))
+        self.assertTrue(self.game.apply_move(('tableau', 0, 'tableau', 1, 2)))
+        self.assertEqual(self.game.runs[1], [1, 1, 2])
+
+    def test_completed_suit_leaves(self):
+        self.clear()
+        self.game._push(0, card(Suit.CLUBS, 5))
+        for value in range(13, 1, -1):
+            self.game._push(0, card(Suit.SPADES, value))
+        self.game.face_down[0] = 1
+        self.game.runs[0][0] = 0
+        self.game._push(1, card(Suit.SPADES, 1))
+        self.game.empty_columns = 8
+        self.assertTrue(self.game.apply_move(('tableau', 1, 'tableau', 0, 1)))
+        self.assertEqual(len(self.game.foundations[0]), 13)
+        self.assertEqual(self.game.foundations[0][-1], card(Suit.SPADES, 13))
+        self.assertEqual(self.game.last_removed, 13)
+        # The card underneath turns over
+        self.assertEqual(self.game.face_down[0], 0)
+        self.assertEqual(self.game.runs[0], [1])
+        self.assertEqual(self.game.score, 500 - 1 + 100)
+
+    def test_deal_needs_every_column_filled(self):
+        self.assertTrue(self.game.draw_from_stock())
+        self.assertEqual(len(self.game.stock), 40)
+        self.assertEqual([len(column) for column in self.game.tableau], [7] * 4 + [6] * 6)
+        self.game.tableau[3].clear()
+        self.game.runs[3].clear()
+        self.game.empty_columns = 1
+        self.assertNotIn(('stock', 0, 'tableau', 0, 10), self.game.legal_moves())
+        self.assertFalse(self.game.draw_from_stock())
+
+    def test_undo(self):
+        before = self.game.state_key()
+        self.game.draw_from_stock()
+        dealt = self.game.clone()
+        self.assertTrue(self.game.undo())
+        self.assertEqual(self.game.state_key(), before)
+        self.assertEqual(len(self.game.stock), 50)
+        self.assertTrue(self.game.redo())
+        self.assertEqual(self.game.state_key(), dealt.state_key())
+        self.assertEqual(self.game.runs, dealt.runs)
+
+if __name__ == '__main__':
+    unittest.main()
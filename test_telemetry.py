@@ -0,0 +1,112 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+from telemetry import EventStream, JsonlSink, MemorySink, SocketSink, move_type, open_sink
+
+class TestEventStream(unittest.TestCase):
+    def test_events_in_order_with_timestamps(self):
+        sink = MemorySink()
+        stream = EventStream(sink)
+        for i in range(100):
+            stream.emit('key', key=str(i))
+        stream.emit('win', score=10, moves=5)
+        stream.close()
+
+        events = list(sink.events)
+        self.assertEqual(len(events), 101)
+        self.assertEqual([e['key'] for e in events[:100]], [str(i) for i in range(100)])
+        self.assertEqual(events[-1]['event'], 'win')
+        times = [e['t'] for e in events]
+        self.assertEqual(times, sorted(times))
+
+    def test_ring_buffer_keeps_latest(self):
+        sink = MemorySink(capacity=3)
+        stream = EventStream(sink)
+        for i in range(10):
+            stream.emit('frame', n=i)
+        stream.close()
+        self.assertEqual([e['n'] for e in sink.events], [7, 8, 9])
+
+    def test_move_type(self):
+        self.assertEqual(move_type(('stock', 0, 'waste', 0, 1)), 'draw')
+        self.assertEqual(move_type(('waste', 0, 'stock', 0, 20)), 'recycle')
+        self.assertEqual(move_type(('tableau', 2, 'foundation', 1, 1)), 'tableau_to_foundation')
+        self.assertIsNone(move_type(None))
+
+class TestSinks(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_jsonl_file(self):
+        path = os.path.join(self.test_dir, 'events.jsonl')
+        stream = EventStream(open_sink(path))
+        self.assertIsInstance(stream.sink, JsonlSink)
+        stream.emit('undo', ok=True)
+        stream.emit('redeal', seed=3)
+        stream.close()
+
+        with open(path) as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual([e['event'] for e in events], ['undo', 'redeal'])
+        self.assertEqual(events[1]['seed'], 3)
+
+    def test_unix_socket(self):
+        path = os.path.join(self.test_dir, 'events.sock')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+
+        stream = EventStream(open_sink('unix:' + path))
+        self.assertIsInstance(stream.sink, SocketSink)
+        conn, _ = server.accept()
+        stream.emit('key', key='q')
+        stream.close()
+
+        data = b''
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        conn.close()
+        server.close()
+        self.assertEqual(json.loads(data.decode())['key'], 'q')
+
+    def test_unopenable_sinks(self):
+        missing = os.path.join(self.test_dir, 'missing')
+        for spec in ('unix:' + missing, os.path.join(missing, 'events.jsonl')):
+            with self.assertRaises(OSError):
+                open_sink(spec)
+            # The game exits with a one-line message before starting curses
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solitaire.py')
+            result = subprocess.run([sys.executable, script, '--events', spec],
+                                    capture_output=True, text=True, timeout=30)
+            self.assertEqual(result.returncode, 1)
+            self.assertEqual(result.stderr.strip().splitlines(),
+                             [f"Can't write events to {spec}: No such file or directory"])
+
+    def test_socket_listener_gone(self):
+        path = os.path.join(self.test_dir, 'events.sock')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        sink = SocketSink(path)
+        conn, _ = server.accept()
+        conn.close()
+        server.close()
+
+        # Writes after the listener left are dropped, not raised
+        for _ in range(100):
+            sink.write({'event': 'frame'})
+        self.assertIsNone(sink.sock)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from game_logic import SolitaireGame
+from watch import BotWorker
+
+class TestBotWorker(unittest.TestCase):
+    def test_streamed_moves_replay_the_bot_game(self):
+        worker = BotWorker('greedy', seed=5, speed=0)
+        worker.start()
+        worker.join(timeout=30)
+
+        replay = SolitaireGame(seed=5)
+        while True:
+            move = worker.moves.get_nowait()
+            if move is None:
+                break
+            self.assertTrue(replay.apply_move(move, record_undo=False))
+        self.assertEqual(replay.state_key(), worker.game.state_key())
+
+    def test_stop(self):
+        worker = BotWorker('greedy', seed=5, speed=0.5)
+        worker.start()
+        worker.stopped.set()
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,42 +1,66 @@
 import curses
 from game_logic import Card, Suit, Rank, SolitaireGame
-
-CARD_WIDTH = 7
-CARD_HEIGHT = 5
+from layout import HitIndex, Layout
 
 class Renderer:
-    def __init__(self, stdscr):
-        self.stdscr = stdscr
-        curses.curs_set(0)  # Hide cursor
-        curses.start_color()
-        curses.use_default_colors()
-        curses.mousemask(curses.ALL_MOUSE_EVENTS | curses.REPORT_MOUSE_POSITION)
-        
-        # Initialize colors
-        curses.init_pair(1, curses.COLOR_RED, curses.COLOR_WHITE)   # Red cards
-        curses.init_pair(2, curses.COLOR_BLACK, curses.COLOR_WHITE) # Black cards
-        curses.init_pair(3, curses.COLOR_WHITE, curses.COLOR_BLUE)  # Back of card / Empty slot
-        curses.init_pair(4, curses.COLOR_GREEN, curses.COLOR_BLACK) # Background / Selection
-        curses.init_pair(5, curses.COLOR_YELLOW, curses.COLOR_BLACK) # Selected Cursor
-
-        self.RED_PAIR = curses.color_pair(1)
-        self.BLACK_PAIR = curses.color_pair(2)
-        self.BACK_PAIR = curses.color_pair(3)
-        self.BG_PAIR = curses.color_pair(4)
-        self.CURSOR_PAIR = curses.color_pair(5)
-
-    def draw_card(self, y, x, card: Card, selected=False):
+    """Draws the game into a screen: a screen.CursesScreen to play, or a
+    screen.HeadlessScreen for tests and benchmarks."""
+    def __init__(self, screen, variant=SolitaireGame, recorder=None):
+        self.screen = screen
+        self.variant = variant # Game class, for its table layout
+        # Gets every finished frame, e.g. a spectate.FrameRecorder
+        self.recorder = recorder
+
+        self.RED_PAIR = screen.color_pair(1)
+        self.BLACK_PAIR = screen.color_pair(2)
+        self.BACK_PAIR = screen.color_pair(3)
+        self.BG_PAIR = screen.color_pair(4)
+        self.CURSOR_PAIR = screen.color_pair(5)
+
+        self.resize()
+
+    def resize(self):
+        """Recomputes the shared geometry for the current terminal size."""
+        self.screen.sync_size()
+        h, w = self.screen.getmaxyx()
+        self.layout = Layout(h, w, self.variant.NUM_COLUMNS, self.variant.TOP_ROW)
+        self.hit_index = None
+        self._hit_key = None
+
+    def erase(self, clear=False):
+        """Blanks the screen before a full redraw; clear also repaints every cell."""
+        if clear:
+            self.screen.clear()
+        else:
+            self.screen.erase()
+
+    def refresh(self):
+        """Shows the finished frame, and passes it on to the recorder."""
+        self.screen.refresh()
+        if self.recorder:
+            self.recorder.commit(self.screen)
+
+    def hit_test(self, y, x):
+        """(row, col, card_idx) of the card drawn at a screen cell, or None."""
+        return self.hit_index.lookup(y, x) if self.hit_index else None
+
+    def put(self, y, x, text, attr=0):
+        """Writes text clipped to the screen, so small terminals never raise."""
+        self.screen.put(y, x, text, attr)
+
+    def draw_card(self, y, x, card: Card, selected=False, face_up=True):
+        width, height = self.layout.card_width, self.layout.card_height
         if card is None:
             # Draw empty slot
-            for i in range(CARD_HEIGHT):
-                self.stdscr.addstr(y + i, x, " " * CARD_WIDTH, self.BACK_PAIR)
-            self.stdscr.addstr(y + 2, x + 2, "[]", self.BACK_PAIR)
+            for i in range(height):
+                self.put(y + i, x, " " * width, self.BACK_PAIR)
+            self.put(y + height // 2, x + (width - 2) // 2, "[]", self.BACK_PAIR)
             return
 
-        if not card.face_up:
+        if not face_up:
             # Draw card back
-            for i in range(CARD_HEIGHT):
-                self.stdscr.addstr(y + i, x, "░" * CARD_WIDTH, self.BACK_PAIR)
+            for i in range(height):
+                self.put(y + i, x, "░" * width, self.BACK_PAIR)
             return
 
         # Draw face up card
@@ -45,147 +69,240 @@ class Renderer:
             pair = pair | curses.A_REVERSE
 
         # Background of card
-        for i in range(CARD_HEIGHT):
-            self.stdscr.addstr(y + i, x, " " * CARD_WIDTH, pair)
+        for i in range(height):
+            self.put(y + i, x, " " * width, pair)
 
         # Rank and Suit
         rank_str = str(card.rank)
         suit_str = card.suit.value
-        
-        self.stdscr.addstr(y, x, rank_str, pair)
-        self.stdscr.addstr(y, x + CARD_WIDTH - len(suit_str), suit_str, pair)
+
+        if width < 5:
+            # Compact cards only have room for a corner index
+            self.put(y, x, rank_str + suit_str, pair)
+            return
+
+        self.put(y, x, rank_str, pair)
+        self.put(y, x + width - len(suit_str), suit_str, pair)
         
         # Center suit
-        self.stdscr.addstr(y + 2, x + 3, suit_str, pair)
+        self.put(y + height // 2, x + width // 2, suit_str, pair)
         
         # Bottom right rank (inverted)
-        self.stdscr.addstr(y + CARD_HEIGHT - 1, x + CARD_WIDTH - len(rank_str), rank_str, pair)
-        self.stdscr.addstr(y + CARD_HEIGHT - 1, x, suit_str, pair)
+        self.put(y + height - 1, x + width - len(rank_str), rank_str, pair)
+        self.put(y + height - 1, x, suit_str, pair)
 
-    def draw_high_scores(self, scores):
-        self.stdscr.clear()
-        h, w = self.stdscr.getmaxyx()
+    def draw_label(self, y, x, label):
+        """Marks an empty pile with a single character in its center."""
+        self.put(y + self.layout.card_height // 2, x + self.layout.card_width // 2, label, self.BACK_PAIR)
+
+    def draw_high_scores(self, scores, title="HIGH SCORES"):
+        self.erase(clear=True)
+        h, w = self.screen.getmaxyx()
 
         # Draw Title
-        title = "HIGH SCORES"
         # Center vertically around the top third
         start_y = max(1, h // 2 - 8)
-        self.stdscr.addstr(start_y, (w - len(title)) // 2, title, curses.A_BOLD | curses.A_UNDERLINE)
+        self.put(start_y, (w - len(title)) // 2, title, curses.A_BOLD | curses.A_UNDERLINE)
 
         # Draw Header
         header = f"{'Rank':<4} {'Score':<8} {'Moves':<8} {'Date':<20}"
         start_x = max(0, (w - len(header)) // 2)
-        self.stdscr.addstr(start_y + 2, start_x, header, curses.A_BOLD)
+        self.put(start_y + 2, start_x, header, curses.A_BOLD)
 
         # Draw Scores
         if not scores:
             no_scores = "No high scores yet!"
-            self.stdscr.addstr(start_y + 4, (w - len(no_scores)) // 2, no_scores)
+            self.put(start_y + 4, (w - len(no_scores)) // 2, no_scores)
         else:
             for i, entry in enumerate(scores):
                 # Format: 1.   100      50       2023-10-01...
                 line = f"{str(i+1) + '.':<4} {str(entry['score']):<8} {str(entry['moves']):<8} {entry['date']:<20}"
-                self.stdscr.addstr(start_y + 4 + i, start_x, line)
+                self.put(start_y + 4 + i, start_x, line)
 
         # Draw Return Prompt
         prompt = "Press any key to return"
-        self.stdscr.addstr(h - 2, (w - len(prompt)) // 2, prompt, curses.A_BLINK)
+        self.put(h - 2, (w - len(prompt)) // 2, prompt, curses.A_BLINK)
+
+        self.refresh()
+        self.screen.timeout(-1) # The game may be polling; run_game sets it back
+        self.screen.getch() # Wait for input
+
+    def draw_win(self, game: SolitaireGame):
+        """The win message on a panel centred over the finished board."""
+        h, w = self.screen.getmaxyx()
+        lines = [("", self.BLACK_PAIR),
+                 ("YOU WIN!", self.RED_PAIR | curses.A_BOLD),
+                 (f"Score: {game.score}  Moves: {game.moves}", self.BLACK_PAIR | curses.A_BOLD),
+                 ("Press Q to Quit", self.BLACK_PAIR | curses.A_BOLD),
+                 ("", self.BLACK_PAIR)]
+        width = min(w, max(len(text) for text, _ in lines) + 4)
+        top, left = max(0, (h - len(lines)) // 2), max(0, (w - width) // 2)
+        for i, (text, attr) in enumerate(lines):
+            self.put(top + i, left, text.center(width), attr)
+        self.refresh()
+
+    def draw_report(self, title, lines):
+        """Full-screen page of text lines, shown until a key is pressed."""
+        self.erase(clear=True)
+        h, w = self.screen.getmaxyx()
+
+        start_y = max(1, h // 2 - len(lines) // 2 - 2)
+        self.put(start_y, (w - len(title)) // 2, title, curses.A_BOLD | curses.A_UNDERLINE)
+        start_x = max(0, (w - max(map(len, lines), default=0)) // 2)
+        for i, line in enumerate(lines):
+            self.put(start_y + 2 + i, start_x, line)
+
+        prompt = "Press any key to return"
+        self.put(h - 2, (w - len(prompt)) // 2, prompt, curses.A_BLINK)
 
-        self.stdscr.refresh()
-        self.stdscr.getch() # Wait for input
+        self.refresh()
+        self.screen.timeout(-1)
+        self.screen.getch() # Wait for input
 
-    def draw_game(self, game: SolitaireGame, cursor_pos, selection):
-        self.stdscr.clear()
+    def card_position(self, game: SolitaireGame, pile: str, idx: int, card_idx: int = 0):
+        """Screen cell (y, x) where card number card_idx of a pile is drawn."""
+        if pile != 'tableau':
+            return self.layout.card_position(pile, idx)
+        column = game.tableau[idx]
+        return self.layout.card_position(pile, idx, card_idx, len(column), game.face_down[idx])
 
-        # Draw Stock (0, 0)
-        stock_y, stock_x = 1, 2
-        if game.stock:
-            self.draw_card(stock_y, stock_x, game.stock[-1]) # Should be face down usually, but logic handles face_up property
+    def marker_position(self, game: SolitaireGame, row, col):
+        """Screen cell just below the top card of the pile at cursor (row, col)."""
+        if row == 0:
+            y, x = self.layout.top_y, self.layout.columns[col]
         else:
-            self.draw_card(stock_y, stock_x, None) # Empty placeholder
-            self.stdscr.addstr(stock_y + 2, stock_x + 2, "O", self.BACK_PAIR) # O for refresh?
+            # Tableau: the bottom card of the column
+            col_len = len(game.tableau[col])
+            y, x = self.card_position(game, 'tableau', col, max(0, col_len - 1))
+        return y + self.layout.card_height, x
+
+    def begin_animation(self, game: SolitaireGame, cursor_pos, selection):
+        """Prepares a slide for game.last_move.
+
+        Draws the board without the moved cards and keeps a copy of it, so
+        each frame only restores and redraws the small region the cards
+        cover. Returns (cards, start, end) or None if there is nothing to
+        animate.
+        """
+        if game.last_move is None:
+            return None
+        src_pile, src_idx, dst_pile, dst_idx, num_cards = game.last_move
+        if dst_pile == 'stock' or src_pile == 'stock' and dst_pile == 'tableau' or game.last_removed:
+            return None # Recycling the waste, dealing a Spider row and completing a suit just jump
 
-        # Draw Waste (0, 1)
-        waste_y, waste_x = 1, 10
-        if game.waste:
-            self.draw_card(waste_y, waste_x, game.waste[-1])
+        dst = game.pile(dst_pile, dst_idx)
+        cards = dst[-num_cards:]
+        if src_pile == 'tableau':
+            start = self.card_position(game, src_pile, src_idx, len(game.tableau[src_idx]))
         else:
-            self.draw_card(waste_y, waste_x, None)
+            start = self.card_position(game, src_pile, src_idx)
+        end = self.card_position(game, dst_pile, dst_idx, len(dst) - num_cards)
+
+        self.draw_game(game, cursor_pos, selection, hidden=(dst_pile, dst_idx, num_cards), refresh=False)
+        self.base = self.screen.copy()
+        self.sprite_rect = None
+        return cards, start, end
+
+    def draw_animation_frame(self, cards, y, x):
+        """Moves the animated cards to (y, x), repainting only the regions they touch."""
+        if self.sprite_rect:
+            # Restore what was under the cards on the previous frame
+            self.screen.paste(self.base, *self.sprite_rect)
+
+        for j, card in enumerate(cards):
+            self.draw_card(y + j, x, card)
+        self.sprite_rect = (y, x, y + len(cards) - 1 + self.layout.card_height - 1,
+                            x + self.layout.card_width - 1)
+        self.refresh() # Spectators see the slide too; only the rows it touched are sent
+
+    def draw_game(self, game: SolitaireGame, cursor_pos, selection, hidden=None, refresh=True, message=None):
+        # erase() rather than clear() so refresh only sends the cells that changed
+        self.erase()
+        layout = self.layout
+
+        # Cards still in flight are left out: (pile, idx, num_cards)
+        def visible(pile_name, idx, pile):
+            if hidden and hidden[0] == pile_name and hidden[1] == idx:
+                return pile[:len(pile) - hidden[2]]
+            return pile
 
-        # Draw Foundations (0, 3-6)
-        for i in range(4):
-            f_y, f_x = 1, 26 + (i * 8)
-            if game.foundations[i]:
-                self.draw_card(f_y, f_x, game.foundations[i][-1])
+        def is_selected(row, col):
+            return selection is not None and selection.row == row and selection.col == col
+
+        # Draw the top row: stock, waste, free cells and foundations (row 0)
+        for col, top_pile in enumerate(layout.top_row):
+            if top_pile is None:
+                continue # Gap
+            y, x = layout.origins[top_pile]
+            pile = visible(*top_pile, game.pile(*top_pile))
+            if pile and top_pile[0] == 'stock':
+                self.draw_card(y, x, pile[-1], face_up=False)
+            elif pile:
+                self.draw_card(y, x, pile[-1], selected=is_selected(0, col))
             else:
-                self.draw_card(f_y, f_x, None)
-                self.stdscr.addstr(f_y + 2, f_x + 3, "F", self.BACK_PAIR)
+                self.draw_card(y, x, None) # Empty placeholder
+                if top_pile[0] == 'foundation':
+                    self.draw_label(y, x, "F")
+                elif top_pile[0] == 'stock' and ('waste', 0) in layout.top_row:
+                    self.draw_label(y, x, "O") # O for refresh?
 
-        # Draw Tableau (1, 0-6)
-        for i in range(7):
-            t_x = 2 + (i * 8)
-            t_y = 7
+        # Draw Tableau (row 1)
+        max_y = layout.tableau_y + layout.card_height
+        for i in range(len(game.tableau)):
+            t_y, t_x = layout.origins[('tableau', i)]
             
-            if not game.tableau[i]:
+            column = visible('tableau', i, game.tableau[i])
+            if not column:
                 self.draw_card(t_y, t_x, None)
             else:
-                for j, card in enumerate(game.tableau[i]):
-                    self.draw_card(t_y + j, t_x, card)
-
-        # Draw Cursor
-        c_row, c_col = cursor_pos
-        cx, cy = 0, 0
-
-        if c_row == 0:
-            if c_col == 0: # Stock
-                cx, cy = stock_x, stock_y
-            elif c_col == 1: # Waste
-                cx, cy = waste_x, waste_y
-            elif c_col >= 3: # Foundations
-                f_idx = c_col - 3
-                cx, cy = 26 + (f_idx * 8), 1
-        else:
-            # Tableau
-            t_idx = c_col
-            cx = 2 + (t_idx * 8)
-            # cy should be at the bottom card of the column
-            col_len = len(game.tableau[t_idx])
-            if col_len > 0:
-                cy = 7 + col_len - 1
-            else:
-                cy = 7
+                num_face_down = min(game.face_down[i], len(column))
+                offsets = layout.card_offsets(len(column), num_face_down)
+                # Picked-up cards are drawn reversed
+                first_selected = len(column) - selection.depth if is_selected(1, i) else len(column)
+                for j, card in enumerate(column):
+                    self.draw_card(t_y + offsets[j], t_x, card, selected=j >= first_selected,
+                                   face_up=j >= num_face_down)
+                # Cursor highlight sits just below the last card
+                max_y = max(max_y, t_y + offsets[-1] + layout.card_height)
+
+        # Mark where the selection may go (worked out when it was picked up)
+        if selection:
+            for row, col in selection.target_piles():
+                y, x = self.marker_position(game, row, col)
+                self.put(y, x, "+" * layout.card_width, self.BG_PAIR | curses.A_BOLD)
 
         # Draw cursor highlight
-        self.stdscr.addstr(cy + CARD_HEIGHT, cx, "^^^^^^^", self.CURSOR_PAIR)
-
-        # Calculate bottom-most line used by Tableau + Cursor
-        max_y = 15 # Minimum height
-        for i in range(7):
-            col_len = len(game.tableau[i])
-            # Last card starts at: 7 + max(0, col_len - 1)
-            # Ends at: start + CARD_HEIGHT - 1
-            # Cursor highlight is at: start + CARD_HEIGHT
-            last_card_y = 7 + max(0, col_len - 1)
-            cursor_y = last_card_y + CARD_HEIGHT
-            if cursor_y > max_y:
-                max_y = cursor_y
-
-        # Add padding
-        info_y = max_y + 2
-
-        # Draw Selection Info
+        cy, cx = self.marker_position(game, *cursor_pos)
+        self.put(cy, cx, "^" * layout.card_width, self.CURSOR_PAIR)
+
+        # Status line goes below the tallest column, but never into the help text
+        info_y = min(max_y + 2, layout.info_y)
+
+        # Draw Selection Info (own line, so it never runs into the score)
         if selection:
-            self.stdscr.addstr(info_y, 2, f"Selected: {selection}", curses.A_BOLD)
+            self.put(info_y + 1, 2, f"Selected: {selection}", curses.A_BOLD)
+
+        # Non-intrusive notices (e.g. the dead-end warning) share that line
+        if message:
+            self.put(info_y + 1, 2 if selection is None else 25, message, self.CURSOR_PAIR | curses.A_BOLD)
 
         # Draw Score and Moves
-        self.stdscr.addstr(info_y, 15, f"Score: {game.score}", curses.A_BOLD)
-        self.stdscr.addstr(info_y, 35, f"Moves: {game.moves}", curses.A_BOLD)
+        self.put(info_y, 15, f"Score: {game.score}", curses.A_BOLD)
+        self.put(info_y, 35, f"Moves: {game.moves}", curses.A_BOLD)
 
         # Draw Help Text
         help_y = info_y + 2
-        self.stdscr.addstr(help_y, 2, "Controls:", curses.A_BOLD | curses.A_UNDERLINE)
-        self.stdscr.addstr(help_y + 1, 3, "Arrows: Move Cursor  Space/Enter: Select/Move/Deal")
-        self.stdscr.addstr(help_y + 2, 3, "Double-Tap Space/Enter or Double-Click: Auto-Move Card")
-        self.stdscr.addstr(help_y + 3, 3, "S: Auto-Stack  U: Undo  R: Re-deal  H: High Scores  Q: Quit")
+        self.put(help_y, 2, "Controls:", curses.A_BOLD | curses.A_UNDERLINE)
+        self.put(help_y + 1, 3, "Arrows: Move Cursor  Space/Enter: Select/Move/Deal  U/Y: Undo/Redo")
+        self.put(help_y + 2, 3, "Double-Tap Space/Enter or Double-Click: Auto-Move Card")
+        self.put(help_y + 3, 3, "S: Auto-Stack  B: Branch  R: Re-deal  H: High Scores  M: Memory  Q: Quit")
+
+        # Rebuild the mouse hit-test index only when the geometry or a pile changed
+        hit_key = (self.layout, tuple(len(game.pile(*pile)) for pile in layout.top_row if pile),
+                   tuple(len(c) for c in game.tableau), tuple(game.face_down))
+        if hit_key != self._hit_key:
+            self.hit_index = HitIndex(self.layout, game)
+            self._hit_key = hit_key
 
-        self.stdscr.refresh()
+        if refresh:
+            self.refresh()
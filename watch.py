@@ -0,0 +1,99 @@
+import curses
+import queue
+import threading
+from bots import BOTS
+from game_logic import SolitaireGame
+from screen import CursesScreen
+from ui import Renderer
+
+# Where the cursor sits after a move, by destination pile
+CURSOR_FOR_PILE = {'stock': lambda i: (0, 0), 'waste': lambda i: (0, 1),
+                   'foundation': lambda i: (0, 3 + i), 'tableau': lambda i: (1, i)}
+
+class BotWorker(threading.Thread):
+    """Plays a deal with a bot on its own copy of the game.
+
+    Moves are streamed to the UI through a queue, followed by None when the
+    bot wins or gives up, so a slow search never blocks the display.
+    """
+    def __init__(self, bot_name: str, seed: int, speed: float, max_decisions: int = 1000):
+        super().__init__(daemon=True)
+        self.player = BOTS[bot_name](seed)
+        self.game = SolitaireGame(seed)
+        self.delay = 1.0 / speed if speed > 0 else 0.0
+        self.max_decisions = max_decisions
+        self.moves = queue.Queue()
+        self.stopped = threading.Event()
+
+    def run(self):
+        game = self.game
+        self.player.new_game(game)
+        cycles = set()
+        for _ in range(self.max_decisions):
+            if self.stopped.is_set() or game.check_win():
+                break
+            move = self.player.choose_move(game)
+            if move is None:
+                break
+            game.apply_move(move, record_undo=False)
+            self.moves.put(move)
+
+            if move[2] == 'stock':
+                # Stop once a full stock cycle changes nothing
+                fingerprint = hash(game.state_key())
+                if fingerprint in cycles:
+                    break
+                cycles.add(fingerprint)
+            if self.delay:
+                self.stopped.wait(self.delay)
+        self.moves.put(None)
+
+def watch_game(stdscr, bot_name: str, speed: float, seed: int, fps: int = 30):
+    """Renders a bot playing in real time, at most fps frames per second.
+
+    Every move that arrived since the last frame is applied before drawing,
+    so intermediate states are skipped when the bot outpaces the display.
+    """
+    game = SolitaireGame(seed)
+    renderer = Renderer(CursesScreen(stdscr))
+    worker = BotWorker(bot_name, seed, speed)
+    worker.start()
+
+    frame_ms = max(1, int(1000 / fps))
+    cursor = (1, 0)
+    finished = False
+    dirty = True
+    try:
+        while True:
+            if dirty:
+                if finished:
+                    outcome = "won" if game.check_win() else "gave up"
+                    status = f"{bot_name} {outcome} - Q to quit"
+                else:
+                    status = f"Watching {bot_name} ({speed:g} moves/s) - Q to quit"
+                renderer.draw_game(game, cursor, None, message=status)
+                dirty = False
+
+            # The getch timeout paces frames; moves pile up in the queue meanwhile
+            stdscr.timeout(-1 if finished else frame_ms)
+            key = stdscr.getch()
+            if key in (ord('q'), ord('Q')):
+                break
+            if key == curses.KEY_RESIZE:
+                renderer.resize()
+                renderer.erase(clear=True)
+                dirty = True
+
+            while not finished:
+                try:
+                    move = worker.moves.get_nowait()
+                except queue.Empty:
+                    break
+                if move is None:
+                    finished = True
+                else:
+                    game.apply_move(move, record_undo=False)
+                    cursor = CURSOR_FOR_PILE[move[2]](move[3])
+                dirty = True
+    finally:
+        worker.stopped.set()